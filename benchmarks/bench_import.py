@@ -0,0 +1,69 @@
+"""
+Cold import time of the SDK modules, every sample is a fresh interpreter.
+
+    python benchmarks/bench_import.py [--runs 10] [--module ultimate_sol.sol] [--max-ms 150] [--output import.json]
+
+Also reports which heavy dependencies were loaded by the import (none of them should be).
+Exits with status 1 if the median import time is above ``--max-ms`` or a heavy dependency was imported.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ('httpx', 'solana', 'solders', 'construct', 'websockets', 'h2')
+
+_PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+'''
+
+
+def sample(module: str) -> dict:
+    env = dict(os.environ)
+    src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+    env['PYTHONPATH'] = src + os.pathsep + env.get('PYTHONPATH', '')
+    code = _PROBE.format(module=module, heavy=HEAVY_MODULES)
+    output = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--module', action='append', default=[])
+    parser.add_argument('--max-ms', type=float, default=None, help='fail if the median import time is above it')
+    parser.add_argument('--output', help='write results to this JSON file')
+    args = parser.parse_args()
+    modules = args.module or ['ultimate_sol.sol', 'ultimate_sol.jupiter', 'ultimate_sol.metadata']
+
+    results = {}
+    failed = False
+    for module in modules:
+        samples = [sample(module) for _ in range(args.runs)]
+        times = [s['seconds'] * 1000 for s in samples]
+        loaded = sorted({m for s in samples for m in s['loaded']})
+        results[module] = {
+            "median_ms": statistics.median(times),
+            "min_ms": min(times),
+            "max_ms": max(times),
+            "heavy_modules_loaded": loaded,
+        }
+        print(f'{module:<28} median {results[module]["median_ms"]:7.1f} ms  min {min(times):7.1f} ms  '
+              f'heavy modules: {", ".join(loaded) or "-"}')
+        if loaded or (args.max_ms is not None and results[module]["median_ms"] > args.max_ms):
+            failed = True
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"python": sys.version.split()[0], "runs": args.runs, "results": results}, f, indent=2)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,313 @@
+"""
+Benchmark of the public SDK entry points against local stand-ins of the upstream APIs (see ``upstreams.py``).
+
+    python benchmarks/bench_sdk.py [--iterations 200] [--concurrency 8] [--latency 0.002] [--tokens 200]
+                                   [--only sol.] [--output results.json] [--compare baseline.json]
+
+Every case reports throughput, p50/p99/mean latency and memory allocated per call (tracemalloc), plus CPU-only
+microbenchmarks of the metadata codec. ``--output`` writes the results as JSON, ``--compare`` prints the change
+against an earlier JSON file and exits with status 1 if a case got slower than ``--threshold``.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from importlib import metadata as importlib_metadata
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_metadata import make_fixture  # noqa: E402
+from upstreams import RPC_ENDPOINT, WSOL, Upstreams  # noqa: E402
+
+from ultimate_sol import dexscreener, jupiter, ratelimit, solana_fm  # noqa: E402
+from ultimate_sol.cache import set_token_cache  # noqa: E402
+from ultimate_sol.http_client import rpc_client  # noqa: E402
+from ultimate_sol.metadata import _get_data_buffer, get_metadata, unpack_metadata_account  # noqa: E402
+from ultimate_sol.sol import AsyncSolClient, SolClient  # noqa: E402
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    index = min(int(round(q * (len(values) - 1))), len(values) - 1)
+    return values[index]
+
+
+def summarize(latencies: list[float], wall: float) -> dict:
+    return {
+        "calls": len(latencies),
+        "throughput": len(latencies) / wall if wall else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+    }
+
+
+def measure_allocations(call, iterations: int) -> dict:
+    # Allocations are measured sequentially, so that concurrent calls don't mix up their peaks.
+    tracemalloc.start()
+    try:
+        peaks = []
+        allocated = []
+        for i in range(iterations):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            call(i)
+            after, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+            allocated.append(after - before)
+    finally:
+        tracemalloc.stop()
+    return {"peak_kib": max(peaks) / 1024, "retained_kib_per_call": statistics.fmean(allocated) / 1024}
+
+
+def run_sync(call, iterations: int, concurrency: int, alloc_iterations: int) -> dict:
+    for i in range(min(5, iterations)):
+        call(i)
+
+    def timed(i):
+        start = time.perf_counter()
+        call(i)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(timed, range(iterations)))
+    result = summarize(latencies, time.perf_counter() - start)
+    result.update(measure_allocations(call, alloc_iterations))
+    return result
+
+
+async def run_async(call, iterations: int, concurrency: int, alloc_iterations: int) -> dict:
+    for i in range(min(5, iterations)):
+        await call(i)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def timed(i):
+        async with semaphore:
+            start = time.perf_counter()
+            await call(i)
+            return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*[timed(i) for i in range(iterations)])
+    result = summarize(list(latencies), time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        peaks = []
+        allocated = []
+        for i in range(alloc_iterations):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            await call(i)
+            after, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+            allocated.append(after - before)
+    finally:
+        tracemalloc.stop()
+    result.update({"peak_kib": max(peaks) / 1024, "retained_kib_per_call": statistics.fmean(allocated) / 1024})
+    return result
+
+
+def run_micro(func, items: list, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        timings.append((time.perf_counter() - start) / len(items))
+    best = min(timings)
+    return {"calls": len(items) * repeat, "ns_per_call": best * 1e9, "calls_per_s": 1 / best}
+
+
+def sync_cases(upstreams: Upstreams) -> dict:
+    client = SolClient(RPC_ENDPOINT)
+    solana_client = rpc_client(RPC_ENDPOINT)
+    jup = jupiter.Jupiter(upstreams.payer)
+    mints = upstreams.mints
+    owner = upstreams.owner
+
+    def mint(i):
+        return mints[i % len(mints)]
+
+    return {
+        "sol.get_sol_balance": lambda i: client.get_sol_balance(owner),
+        "sol.get_sol_balances": lambda i: client.get_sol_balances(mints),
+        "sol.get_token_balance": lambda i: client.get_token_balance(owner, mint(i)),
+        "sol.get_token_balances": lambda i: client.get_token_balances(owner, mints),
+        "sol.get_token_decimals": lambda i: client.get_token_decimals(mint(i)),
+        "sol.get_token_symbol": lambda i: client.get_token_symbol(mint(i)),
+        "sol.get_token_portfolio": lambda i: client.get_token_portfolio(owner),
+        "sol.get_token_portfolio[solana_fm]": lambda i: client.get_token_portfolio(owner, source='solana_fm'),
+        "sol.get_token_accounts": lambda i: client.get_token_accounts(owner),
+        "sol.send_tx": lambda i: client.send_tx(upstreams.swap_transaction, upstreams.payer),
+        "sol.send_many": lambda i: client.send_many(
+            [partial(jup.swap, WSOL, mint(i + k), 10 ** 9) for k in range(20)], upstreams.payer
+        ),
+        "metadata.get_metadata": lambda i: get_metadata(solana_client, mint(i)),
+        "jupiter.quote": lambda i: jup.quote(WSOL, mint(i), 10 ** 9),
+        "jupiter.swap": lambda i: jup.swap(WSOL, mint(i), 10 ** 9),
+        "jupiter.quote_ladder": lambda i: jup.quote_ladder(WSOL, mint(i), [10 ** 6 * 2 ** k for k in range(16)]),
+        "jupiter.get_token_price": lambda i: jupiter.get_token_price(mint(i)),
+        "jupiter.get_token_prices": lambda i: jupiter.get_token_prices(mints),
+        "jupiter.get_tokens_list": lambda i: jupiter.get_tokens_list(),
+        "jupiter.get_all_tickers": lambda i: jupiter.get_all_tickers(),
+        "jupiter.iter_tokens_list": lambda i: sum(1 for _ in jupiter.iter_tokens_list()),
+        "jupiter.iter_all_tickers": lambda i: sum(1 for _ in jupiter.iter_all_tickers()),
+        "jupiter.get_token_info": lambda i: jupiter.get_token_info(mint(i)),
+        "dexscreener.get_token_profile": lambda i: dexscreener.get_token_profile(mint(i)),
+        "dexscreener.get_token_profiles": lambda i: dexscreener.get_token_profiles(mints),
+        "solana_fm.get_owner_token_accounts": lambda i: solana_fm.get_owner_token_accounts(owner),
+    }
+
+
+def async_cases(upstreams: Upstreams) -> dict:
+    client = AsyncSolClient(RPC_ENDPOINT)
+    jup = jupiter.AsyncJupiter(upstreams.payer)
+    mints = upstreams.mints
+    owner = upstreams.owner
+
+    def mint(i):
+        return mints[i % len(mints)]
+
+    return {
+        "async.sol.get_sol_balance": lambda i: client.get_sol_balance(owner),
+        "async.sol.get_token_portfolio": lambda i: client.get_token_portfolio(owner),
+        "async.sol.get_token_accounts": lambda i: client.get_token_accounts(owner),
+        "async.sol.send_tx": lambda i: client.send_tx(upstreams.swap_transaction, upstreams.payer),
+        "async.sol.send_many": lambda i: client.send_many(
+            [partial(jup.swap, WSOL, mint(i + k), 10 ** 9) for k in range(20)], upstreams.payer
+        ),
+        "async.jupiter.quote": lambda i: jup.quote(WSOL, mint(i), 10 ** 9),
+        "async.jupiter.swap": lambda i: jup.swap(WSOL, mint(i), 10 ** 9),
+        "async.jupiter.quote_ladder": lambda i: jup.quote_ladder(WSOL, mint(i), [10 ** 6 * 2 ** k for k in range(16)]),
+        "async.jupiter.get_token_prices": lambda i: jupiter.get_token_prices_async(mints),
+        "async.dexscreener.get_token_profile": lambda i: dexscreener.get_token_profile_async(mint(i)),
+        "async.dexscreener.get_token_profiles": lambda i: dexscreener.get_token_profiles_async(mints),
+    }
+
+
+def micro_cases() -> dict:
+    rnd = random.Random(0)
+    fixtures = [make_fixture(rnd) for _ in range(1000)]
+    buffers = [
+        ('Token name', 'TKN', 'https://arweave.net/abc', 500, [], None, None),
+        ('Token name', 'TKN', 'https://arweave.net/abc', 500,
+         ['9xQeWvG816bUx9EPjHmaT23yvVM2ZWbrrpZb9PusVFin'] * 3, [1, 0, 0], [50, 25, 25]),
+    ] * 500
+    return {
+        "micro.unpack_metadata_account": (unpack_metadata_account, fixtures),
+        "micro._get_data_buffer": (lambda args: _get_data_buffer(*args), buffers),
+    }
+
+
+def selected(cases: dict, only: list[str]) -> dict:
+    if not only:
+        return cases
+    return {name: case for name, case in cases.items() if any(name.startswith(prefix) for prefix in only)}
+
+
+def print_result(name: str, result: dict) -> None:
+    if "ns_per_call" in result:
+        print(f'{name:<40} {result["ns_per_call"]:12.0f} ns/call {result["calls_per_s"]:14.0f} calls/s')
+        return
+    print(
+        f'{name:<40} {result["throughput"]:9.1f} calls/s  p50 {result["p50_ms"]:8.2f} ms  '
+        f'p99 {result["p99_ms"]:8.2f} ms  peak {result["peak_kib"]:9.1f} KiB'
+    )
+
+
+def compare(results: dict, baseline_path: str, threshold: float) -> int:
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+    regressions = 0
+    print(f'\nchange against {baseline_path} (positive = slower):')
+    for name, result in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        key = "ns_per_call" if "ns_per_call" in result else "p50_ms"
+        change = result[key] / old[key] - 1 if old[key] else 0.0
+        flag = ''
+        if change > threshold:
+            regressions += 1
+            flag = '  REGRESSION'
+        print(f'{name:<40} {key:<12} {change * 100:+8.1f}%{flag}')
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--alloc-iterations', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.002, help='seconds added to every upstream response')
+    parser.add_argument('--tokens', type=int, default=200, help='tokens held by the benchmark wallet')
+    parser.add_argument('--list-size', type=int, default=1000, help='size of the token list and tickers')
+    parser.add_argument('--tx-size', type=int, default=1000, help='size of swap transactions in bytes')
+    parser.add_argument('--micro-repeat', type=int, default=5)
+    parser.add_argument('--cache', action='store_true', help='keep the token cache enabled')
+    parser.add_argument('--only', action='append', default=[], help='run only cases starting with this prefix')
+    parser.add_argument('--output', help='write results to this JSON file')
+    parser.add_argument('--compare', help='JSON file with earlier results')
+    parser.add_argument('--threshold', type=float, default=0.10, help='slowdown reported as a regression')
+    args = parser.parse_args()
+
+    if not args.cache:
+        set_token_cache(None)
+    # The stand-ins answer instantly, published API rate limits would only measure the limiter.
+    ratelimit.set_rate_limit(dexscreener.DEXSCREENER_HOST, None)
+    upstreams = Upstreams(
+        latency=args.latency, tokens=args.tokens, list_size=args.list_size, tx_size=args.tx_size
+    )
+    upstreams.install()
+
+    results = {}
+    for name, call in selected(sync_cases(upstreams), args.only).items():
+        results[name] = run_sync(call, args.iterations, args.concurrency, args.alloc_iterations)
+        print_result(name, results[name])
+
+    async def run_async_cases():
+        await upstreams.install_async()
+        for name, call in selected(async_cases(upstreams), args.only).items():
+            results[name] = await run_async(call, args.iterations, args.concurrency, args.alloc_iterations)
+            print_result(name, results[name])
+
+    asyncio.run(run_async_cases())
+
+    for name, (func, items) in selected(micro_cases(), args.only).items():
+        results[name] = run_micro(func, items, args.micro_repeat)
+        print_result(name, results[name])
+
+    try:
+        version = importlib_metadata.version('ultimate_sol')
+    except importlib_metadata.PackageNotFoundError:
+        version = None
+    report = {
+        "meta": {
+            "sdk_version": version,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.time(),
+            "args": vars(args),
+            "upstream_requests": dict(upstreams.requests),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        sys.exit(compare(results, args.compare, args.threshold))
+
+
+if __name__ == '__main__':
+    main()
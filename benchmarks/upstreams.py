@@ -0,0 +1,273 @@
+"""
+Local stand-ins for every upstream the SDK talks to (Solana JSON-RPC, Jupiter quote/swap/price/token APIs,
+DexScreener and SolanaFM), served in-process through ``httpx.MockTransport``.
+
+    upstreams = Upstreams(latency=0.002, tokens=200)
+    upstreams.install()              # sync calls
+    await upstreams.install_async()  # async calls, from inside the running event loop
+"""
+import asyncio
+import base64
+import json
+import random
+import time
+from collections import Counter
+
+import base58
+import httpx
+from solders.hash import Hash
+from solders.instruction import Instruction
+from solders.keypair import Keypair
+from solders.message import MessageV0
+from solders.pubkey import Pubkey
+from solders.transaction import VersionedTransaction
+
+from ultimate_sol import http_client
+from ultimate_sol.transport import AsyncSchedulingTransport, SchedulingTransport
+from ultimate_sol.metadata import _get_data_buffer, get_metadata_account
+
+RPC_ENDPOINT = 'http://rpc.bench/'
+
+TOKEN_PROGRAM_ID = 'TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA'
+SYSTEM_PROGRAM_ID = '11111111111111111111111111111111'
+MEMO_PROGRAM_ID = Pubkey.from_string('MemoSq4gqABAXKb96qnH8TysNcWxMyWCqXgDLGmfcHr')
+WSOL = 'So11111111111111111111111111111111111111112'
+
+
+def _pad(value: str, length: int) -> str:
+    return value + '\x00' * (length - len(value.encode()))
+
+
+def _b64(data: bytes) -> list:
+    return [base64.b64encode(data).decode(), 'base64']
+
+
+def _metadata_account(rnd: random.Random, mint: str, index: int) -> bytes:
+    creators = [str(Pubkey(rnd.randbytes(32))) for _ in range(rnd.randint(0, 3))]
+    buffer = _get_data_buffer(
+        _pad(f'Token {index}', 32), _pad(f'T{index}', 10), _pad(f'https://arweave.net/{index}', 200),
+        rnd.randint(0, 1000), creators, [1] * len(creators), [100 // max(len(creators), 1)] * len(creators),
+    )
+    return bytes([4]) + rnd.randbytes(32) + bytes(Pubkey.from_string(mint)) + buffer + bytes([0, 1])
+
+
+def _token_account(mint: str, owner: str, amount: int) -> bytes:
+    # SPL Token account layout: mint, owner, amount, then 93 bytes of options and state.
+    data = bytes(Pubkey.from_string(mint)) + bytes(Pubkey.from_string(owner)) + amount.to_bytes(8, 'little')
+    return data + bytes([0] * 4 + [0] * 32 + [1] + [0] * 56)
+
+
+def _unsigned_tx(payer: Keypair, size: int) -> str:
+    # A transaction of roughly ``size`` bytes, padded with a memo instruction.
+    memo = Instruction(MEMO_PROGRAM_ID, bytes(max(size - 200, 1)), [])
+    msg = MessageV0.try_compile(payer.pubkey(), [memo], [], Hash.default())
+    return base64.b64encode(bytes(VersionedTransaction(msg, [payer]))).decode()
+
+
+class Upstreams:
+    """
+    Deterministic fake upstream APIs.
+
+    :param latency: seconds every response is delayed by
+    :param tokens: number of tokens held by ``owner`` (portfolio and token list size scale with it)
+    :param list_size: number of tokens in the Jupiter token list and tickers
+    :param tx_size: approximate size in bytes of swap transactions
+    :param pairs: number of DexScreener pairs per token
+    """
+
+    def __init__(
+            self,
+            latency: float = 0.0,
+            tokens: int = 200,
+            list_size: int = 1000,
+            tx_size: int = 1000,
+            pairs: int = 10,
+            seed: int = 0,
+    ):
+        rnd = random.Random(seed)
+        self.latency = latency
+        self.requests = Counter()
+        self.payer = Keypair.from_seed(bytes(rnd.randbytes(32)))
+        self.owner = str(Pubkey(rnd.randbytes(32)))
+        self.mints = [str(Pubkey(rnd.randbytes(32))) for _ in range(tokens)]
+        self.balances = {mint: rnd.randint(1, 10 ** 9) for mint in self.mints}
+        self.metadata = {
+            str(get_metadata_account(mint)): _metadata_account(rnd, mint, i) for i, mint in enumerate(self.mints)
+        }
+        self.token_accounts = {
+            mint: (str(Pubkey(rnd.randbytes(32))), _token_account(mint, self.owner, amount))
+            for mint, amount in self.balances.items()
+        }
+        self.token_list = [
+            {
+                "address": self.mints[i] if i < tokens else str(Pubkey(rnd.randbytes(32))),
+                "symbol": f'T{i}', "name": f'Token {i}', "decimals": 6,
+                "logoURI": f'https://arweave.net/{i}', "tags": ["verified"],
+            }
+            for i in range(max(list_size, tokens))
+        ]
+        self.tickers = [
+            {"ticker_id": f'{token["address"]}_{WSOL}', "base_currency": token["address"], "target_currency": WSOL,
+             "last_price": str(rnd.random()), "base_volume": str(rnd.random() * 1e6)}
+            for token in self.token_list
+        ]
+        self.swap_transaction = _unsigned_tx(self.payer, tx_size)
+        self.pairs = pairs
+
+    # -- routing -------------------------------------------------------------------------------------------------
+
+    def respond(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        self.requests[host] += 1
+        if host == 'rpc.bench':
+            body = json.loads(request.content)
+            result = [self._rpc(call) for call in body] if isinstance(body, list) else self._rpc(body)
+            return httpx.Response(200, json=result)
+        if host == 'quote-api.jup.ag':
+            if request.url.path.endswith('/swap'):
+                return httpx.Response(200, json={"swapTransaction": self.swap_transaction})
+            return httpx.Response(200, json=self._quote(request.url.params))
+        if host == 'price.jup.ag':
+            ids = request.url.params['ids'].split(',')
+            return httpx.Response(200, json={"data": {
+                mint: {"id": mint, "mintSymbol": "T", "vsToken": WSOL, "price": 1.5} for mint in ids
+            }})
+        if host == 'token.jup.ag':
+            return httpx.Response(200, json=self.token_list)
+        if host == 'tokens.jup.ag':
+            mint = request.url.path.rsplit('/', 1)[-1]
+            return httpx.Response(200, json={"address": mint, "symbol": "T", "name": "Token", "decimals": 6})
+        if host == 'stats.jup.ag':
+            return httpx.Response(200, json=self.tickers)
+        if host == 'api.dexscreener.com':
+            tokens = request.url.path.rsplit('/', 1)[-1].split(',')
+            return httpx.Response(200, json={"pairs": [pair for token in tokens for pair in self._pairs(token)]})
+        if host == 'api.solana.fm':
+            return httpx.Response(200, json={"tokens": {
+                mint: {"balance": balance / 10 ** 6, "decimals": 6} for mint, balance in self.balances.items()
+            }})
+        return httpx.Response(404, json={"error": f'unknown host {host}'})
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        if self.latency:
+            time.sleep(self.latency)
+        return self.respond(request)
+
+    async def async_handler(self, request: httpx.Request) -> httpx.Response:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self.respond(request)
+
+    def install(self) -> None:
+        """
+        Route all synchronous SDK calls to the stand-ins, through the SDK's rate limiter.
+        """
+        http_client.set_client(httpx.Client(transport=SchedulingTransport(httpx.MockTransport(self.handler))))
+
+    async def install_async(self) -> None:
+        """
+        Route all asynchronous SDK calls made in the running event loop to the stand-ins.
+        """
+        http_client.set_async_client(
+            httpx.AsyncClient(transport=AsyncSchedulingTransport(httpx.MockTransport(self.async_handler)))
+        )
+
+    # -- payloads ------------------------------------------------------------------------------------------------
+
+    def _quote(self, params) -> dict:
+        amount = int(params.get('amount', 0))
+        return {
+            "inputMint": params.get('inputMint'), "outputMint": params.get('outputMint'),
+            "inAmount": str(amount), "outAmount": str(amount * 2), "otherAmountThreshold": str(amount * 2),
+            "swapMode": params.get('swapMode', 'ExactIn'), "slippageBps": int(params.get('slippageBps') or 50),
+            "priceImpactPct": "0.001", "contextSlot": 1, "timeTaken": 0.01,
+            "routePlan": [{"swapInfo": {"ammKey": str(Pubkey.default()), "label": "Bench", "feeAmount": "0"},
+                           "percent": 100}],
+        }
+
+    def _pairs(self, token: str) -> list:
+        return [
+            {"chainId": "solana", "pairAddress": f'pair{i}', "priceUsd": "1.0",
+             "baseToken": {"address": token, "symbol": "T"},
+             "quoteToken": {"address": WSOL if i == self.pairs - 1 else f'quote{i}', "symbol": "Q"},
+             "volume": {"h24": 1000.0}, "liquidity": {"usd": 5000.0}}
+            for i in range(self.pairs)
+        ]
+
+    def _account(self, data: bytes, owner: str, lamports: int = 2039280) -> dict:
+        return {"data": _b64(data), "executable": False, "lamports": lamports, "owner": owner,
+                "rentEpoch": 0, "space": len(data)}
+
+    def _rpc(self, call: dict) -> dict:
+        method, params = call['method'], call.get('params') or []
+        context = {"slot": 1}
+        if method == 'getBalance':
+            result = {"context": context, "value": 1500000000}
+        elif method == 'getAccountInfo':
+            result = {"context": context, "value": self._account_info(params[0], (params[1:] or [{}])[0])}
+        elif method == 'getMultipleAccounts':
+            config = (params[1:] or [{}])[0]
+            result = {"context": context, "value": [self._account_info(key, config) for key in params[0]]}
+        elif method == 'getTokenAccountsByOwner':
+            if 'programId' in params[1]:
+                mints = list(self.token_accounts) if params[1]['programId'] == TOKEN_PROGRAM_ID else []
+            else:
+                mints = [params[1]['mint']] if params[1]['mint'] in self.token_accounts else []
+            config = (params[2:] or [{}])[0]
+            data_slice = config.get('dataSlice') or {"offset": 0, "length": 165}
+            result = {"context": context, "value": [
+                {"pubkey": self.token_accounts[mint][0], "account":
+                    self._parsed_token_account(mint) if config.get('encoding') == 'jsonParsed' else
+                    self._account(self.token_accounts[mint][1][data_slice['offset']:][:data_slice['length']],
+                                  TOKEN_PROGRAM_ID)}
+                for mint in mints
+            ]}
+        elif method == 'getTokenAccountBalance':
+            result = {"context": context, "value": {
+                "amount": "1000000", "decimals": 6, "uiAmount": 1.0, "uiAmountString": "1"
+            }}
+        elif method == 'sendTransaction':
+            tx = VersionedTransaction.from_bytes(base64.b64decode(params[0]))
+            result = str(tx.signatures[0])
+        elif method == 'getSignatureStatuses':
+            result = {"context": context, "value": [
+                {"slot": 1, "confirmations": None, "err": None, "confirmationStatus": "finalized"} for _ in params[0]
+            ]}
+        elif method in ('getBlockHeight', 'getSlot'):
+            result = 1
+        elif method == 'getHealth':
+            result = 'ok'
+        else:
+            return {"jsonrpc": "2.0", "id": call['id'], "error": {"code": -32601, "message": "Method not found"}}
+        return {"jsonrpc": "2.0", "id": call['id'], "result": result}
+
+    def _parsed_token_account(self, mint: str) -> dict:
+        amount = self.balances[mint]
+        info = {
+            "mint": mint, "owner": self.owner, "state": "initialized", "isNative": False,
+            "tokenAmount": {"amount": str(amount), "decimals": 6, "uiAmount": amount / 10 ** 6,
+                            "uiAmountString": str(amount / 10 ** 6)},
+        }
+        return {"data": {"program": "spl-token", "space": 165, "parsed": {"type": "account", "info": info}},
+                "executable": False, "lamports": 2039280, "owner": TOKEN_PROGRAM_ID, "rentEpoch": 0, "space": 165}
+
+    def _account_info(self, key: str, config: dict) -> dict | None:
+        if key in self.metadata:
+            return self._account(self.metadata[key], 'metaqbxxUerdq28cj1RbAWkYQm3ybzjb6a8bt518x1s', 5616720)
+        if key in self.balances:
+            if config.get('encoding') == 'jsonParsed':
+                return {"data": {"program": "spl-token", "space": 82, "parsed": {"type": "mint", "info": {
+                    "decimals": 6, "supply": "1000000000", "isInitialized": True,
+                    "freezeAuthority": None, "mintAuthority": None,
+                }}}, "executable": False, "lamports": 1461600, "owner": TOKEN_PROGRAM_ID, "rentEpoch": 0, "space": 82}
+            data = bytes(36) + (10 ** 9).to_bytes(8, 'little') + bytes([6, 1]) + bytes(36)
+            data_slice = config.get('dataSlice')
+            if data_slice:
+                data = data[data_slice['offset']:data_slice['offset'] + data_slice['length']]
+            return self._account(data, TOKEN_PROGRAM_ID, 1461600)
+        try:
+            base58.b58decode(key)
+        except ValueError:
+            return None
+        return {"data": _b64(b''), "executable": False, "lamports": 1500000000, "owner": SYSTEM_PROGRAM_ID,
+                "rentEpoch": 0, "space": 0}
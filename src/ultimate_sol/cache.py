@@ -0,0 +1,254 @@
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+from . import metrics
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Thread-safe bounded mapping which evicts the least recently used key and counts hits and misses.
+    """
+
+    def __init__(self, maxsize: int = 65536):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key) -> bool:
+        return key in self._data
+
+
+def cluster_id(endpoint: str) -> str:
+    """
+    Identifies the cluster behind an RPC endpoint in cache and mint store keys: host and path of the URL,
+    without the query (API keys).
+    """
+    url = urlsplit(endpoint)
+    return (url.netloc + url.path).rstrip('/')
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache for token facts with a TTL per kind of value (``None`` - never expires).
+    ``None`` values (unknown tokens) are cached for ``negative_ttl`` seconds.
+
+    Facts read from a cluster are stored under its ``scope`` (``SolClient.cluster``), so that clients
+    of different clusters (e.g. devnet and mainnet) don't share them.
+    """
+    DEFAULT_TTLS = {
+        "decimals": None,
+        "symbol": 3600,
+        "metadata": 3600,
+        "token_info": 600,
+        "dexscreener_profile": 30,
+    }
+
+    def __init__(
+            self,
+            maxsize: int = 10000,
+            ttls: dict = None,
+            default_ttl: float = 300,
+            negative_ttl: float = 60,
+            clock=time.monotonic,
+    ):
+        self.maxsize = maxsize
+        self.ttls = {**self.DEFAULT_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self.negative_ttl = negative_ttl
+        self._clock = clock
+        self._data = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def _count(self, kind: str, hit: bool) -> None:
+        counter = self._counters.setdefault(kind, [0, 0])
+        counter[0 if hit else 1] += 1
+
+    def lookup(self, kind: str, key, scope: str = None) -> tuple[bool, object]:
+        """
+        Returns ``(True, value)`` for a fresh entry and ``(False, None)`` otherwise.
+        """
+        with self._lock:
+            entry = self._data.get((kind, scope, key))
+            hit = False
+            if entry is not None:
+                expires_at, value = entry
+                hit = expires_at is None or expires_at > self._clock()
+                if hit:
+                    self._data.move_to_end((kind, scope, key))
+                else:
+                    del self._data[(kind, scope, key)]
+            self._count(kind, hit)
+        # Metrics sinks run outside the lock, so a slow one doesn't hold up other lookups.
+        if hit:
+            metrics.record_cache_hit(kind)
+            return True, value
+        return False, None
+
+    def store(self, kind: str, key, value, scope: str = None) -> None:
+        ttl = self.negative_ttl if value is None else self.ttls.get(kind, self.default_ttl)
+        expires_at = None if ttl is None else self._clock() + ttl
+        with self._lock:
+            self._data[(kind, scope, key)] = (expires_at, value)
+            self._data.move_to_end((kind, scope, key))
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_load(self, kind: str, key, loader, scope: str = None):
+        """
+        Returns cached value or calls ``loader()`` and caches its result. Exceptions are not cached.
+        """
+        hit, value = self.lookup(kind, key, scope)
+        if hit:
+            return value
+        value = loader()
+        self.store(kind, key, value, scope)
+        return value
+
+    async def get_or_load_async(self, kind: str, key, loader, scope: str = None):
+        """
+        Async version of ``get_or_load``, ``loader()`` must return an awaitable.
+        """
+        hit, value = self.lookup(kind, key, scope)
+        if hit:
+            return value
+        value = await loader()
+        self.store(kind, key, value, scope)
+        return value
+
+    def invalidate(self, kind: str = None, key=None, scope: str = None) -> None:
+        """
+        Drop the entries matching ``kind``, ``key`` and ``scope`` (every scope if None),
+        or (without arguments) everything.
+        """
+        with self._lock:
+            for k in list(self._data):
+                if (kind is None or k[0] == kind) and (scope is None or k[1] == scope) and \
+                        (key is None or k[2] == key):
+                    del self._data[k]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._counters.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            kinds = {}
+            for kind, (hits, misses) in self._counters.items():
+                total = hits + misses
+                kinds[kind] = {"hits": hits, "misses": misses, "hit_rate": hits / total if total else 0.0}
+            hits = sum(k["hits"] for k in kinds.values())
+            misses = sum(k["misses"] for k in kinds.values())
+            return {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "kinds": kinds,
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class _NoCache:
+    def lookup(self, kind: str, key, scope: str = None) -> tuple[bool, object]:
+        return False, None
+
+    def store(self, kind: str, key, value, scope: str = None) -> None:
+        pass
+
+    def get_or_load(self, kind: str, key, loader, scope: str = None):
+        return loader()
+
+    async def get_or_load_async(self, kind: str, key, loader, scope: str = None):
+        return await loader()
+
+    def invalidate(self, kind: str = None, key=None, scope: str = None) -> None:
+        pass
+
+
+_token_cache = TTLCache()
+
+
+def get_token_cache():
+    """
+    Returns the cache used for token decimals, symbols, metadata and token info.
+    """
+    return _token_cache
+
+
+def set_token_cache(cache) -> None:
+    """
+    Replace the token cache (any object with the ``TTLCache`` methods ``lookup``, ``store``, ``get_or_load``,
+    ``get_or_load_async`` and ``invalidate``, all taking ``scope``). ``None`` disables caching.
+    """
+    global _token_cache
+    _token_cache = _NoCache() if cache is None else cache
+
+
+_mint_store = None
+
+
+def get_mint_store():
+    """
+    Returns the persistent store of immutable mint facts or None if it is not enabled.
+    """
+    return _mint_store
+
+
+def set_mint_store(store) -> None:
+    """
+    Use ``store`` (e.g. ``mint_store.MintStore(path)``) for decimals and immutable metadata, ``None`` disables it.
+    """
+    global _mint_store
+    _mint_store = store
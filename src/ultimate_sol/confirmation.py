@@ -0,0 +1,219 @@
+import asyncio
+import logging
+import time
+
+from .rpc import rpc_request_async
+
+logger = logging.getLogger(__name__)
+
+COMMITMENT_LEVELS = {"processed": 0, "confirmed": 1, "finalized": 2}
+
+# getSignatureStatuses accepts at most 256 signatures per call.
+SIGNATURE_STATUSES_LIMIT = 256
+
+
+class Confirmation:
+    """
+    Final state of a tracked transaction: ``status`` is "confirmed" (reached the target commitment),
+    "failed" (landed with an error) or "expired" (blockhash expired / timed out before landing).
+    """
+    __slots__ = ('signature', 'status', 'commitment', 'slot', 'err')
+
+    def __init__(self, signature: str, status: str, commitment: str = None, slot: int = None, err=None):
+        self.signature = signature
+        self.status = status
+        self.commitment = commitment
+        self.slot = slot
+        self.err = err
+
+    def __repr__(self) -> str:
+        return f'Confirmation({self.signature!r}, {self.status!r}, commitment={self.commitment!r}, slot={self.slot})'
+
+
+class _Pending:
+    __slots__ = ('future', 'commitment', 'last_valid_block_height', 'deadline', 'callbacks', 'landed')
+
+    def __init__(self, future, commitment, last_valid_block_height, deadline):
+        self.future = future
+        self.commitment = commitment
+        self.last_valid_block_height = last_valid_block_height
+        self.deadline = deadline
+        self.callbacks = []
+        # Seen by the cluster in the last successful poll (below the target commitment), so not expired.
+        self.landed = False
+
+    def expired(self, block_height: int | None, now: float) -> bool:
+        if self.landed:
+            return False
+        if self.last_valid_block_height is None:
+            return now > self.deadline
+        return block_height is not None and block_height > self.last_valid_block_height
+
+
+class ConfirmationTracker:
+    """
+    Tracks many transactions at once with batched ``getSignatureStatuses`` calls (256 signatures per call).
+    Polling runs every ``min_interval`` seconds while transactions keep resolving and slows down
+    to ``max_interval`` when nothing changes.
+    """
+
+    def __init__(
+            self,
+            endpoint: str = 'https://api.mainnet-beta.solana.com/',
+            commitment: str = "confirmed",
+            min_interval: float = 0.4,
+            max_interval: float = 2.0,
+            timeout: float = 90,
+            clock=time.monotonic,
+    ):
+        """
+        :param timeout: seconds after which a transaction tracked without ``last_valid_block_height`` is expired
+            (also while the RPC calls fail)
+        """
+        self.endpoint = endpoint
+        self.commitment = commitment
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.timeout = timeout
+        self.rpc_calls = 0
+        self._clock = clock
+        self._block_height = None
+        self._interval = min_interval
+        self._pending = {}
+        self._wakeup = None
+        self._runner = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def track(
+            self,
+            signature: str,
+            commitment: str = None,
+            last_valid_block_height: int = None,
+            callback=None,
+    ) -> asyncio.Future:
+        """
+        Start tracking a transaction. Returns a future resolved with ``Confirmation``,
+        ``callback(confirmation)`` is called at the same time. Tracking a signature which is already tracked
+        returns the same future (the original ``commitment`` and ``last_valid_block_height`` are kept)
+        and adds ``callback`` to the ones called on resolution.
+        """
+        commitment = commitment or self.commitment
+        if commitment not in COMMITMENT_LEVELS:
+            raise ValueError(f'commitment must be one of {tuple(COMMITMENT_LEVELS)}')
+        pending = self._pending.get(signature)
+        if pending is not None:
+            if callback is not None:
+                pending.callbacks.append(callback)
+            return pending.future
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        deadline = None if last_valid_block_height is not None else self._clock() + self.timeout
+        pending = self._pending[signature] = _Pending(future, commitment, last_valid_block_height, deadline)
+        if callback is not None:
+            pending.callbacks.append(callback)
+
+        self._interval = self.min_interval
+        if self._runner is None or self._runner.done():
+            self._wakeup = asyncio.Event()
+            self._runner = asyncio.ensure_future(self._run())
+        else:
+            self._wakeup.set()
+        return future
+
+    async def wait(self, signature: str, commitment: str = None, last_valid_block_height: int = None) -> Confirmation:
+        """
+        Track a transaction and wait for its ``Confirmation``.
+        """
+        return await self.track(signature, commitment, last_valid_block_height)
+
+    async def close(self) -> None:
+        """
+        Stop polling, unresolved futures are cancelled.
+        """
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+        for pending in self._pending.values():
+            pending.future.cancel()
+        self._pending.clear()
+
+    def _resolve(self, signature: str, confirmation: Confirmation) -> None:
+        pending = self._pending.pop(signature)
+        if not pending.future.done():
+            pending.future.set_result(confirmation)
+        for callback in pending.callbacks:
+            try:
+                callback(confirmation)
+            except Exception:
+                logger.exception('Confirmation callback for %s failed', signature)
+
+    def _expire(self) -> int:
+        # Runs after every poll, failed ones included, with the last block height the cluster reported.
+        now = self._clock()
+        expired = [signature for signature, pending in self._pending.items()
+                   if pending.expired(self._block_height, now)]
+        for signature in expired:
+            self._resolve(signature, Confirmation(signature, 'expired'))
+        return len(expired)
+
+    async def _run(self) -> None:
+        while self._pending:
+            try:
+                resolved = await self._poll()
+            except Exception as e:
+                logger.warning('Confirmation polling failed: %r', e)
+                resolved = 0
+            resolved += self._expire()
+            if resolved:
+                self._interval = self.min_interval
+            else:
+                self._interval = min(self._interval * 1.5, self.max_interval)
+            if not self._pending:
+                break
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _poll(self) -> int:
+        signatures = list(self._pending)
+        chunks = [
+            signatures[i:i + SIGNATURE_STATUSES_LIMIT] for i in range(0, len(signatures), SIGNATURE_STATUSES_LIMIT)
+        ]
+        requests = [rpc_request_async(self.endpoint, 'getSignatureStatuses', [chunk]) for chunk in chunks]
+        check_height = any(p.last_valid_block_height is not None for p in self._pending.values())
+        if check_height:
+            requests.append(rpc_request_async(self.endpoint, 'getBlockHeight', [{"commitment": "confirmed"}]))
+        responses = await asyncio.gather(*requests)
+        self.rpc_calls += len(requests)
+        if check_height:
+            self._block_height = responses.pop()['result']
+
+        resolved = 0
+        for chunk, response in zip(chunks, responses):
+            for signature, status in zip(chunk, response['result']['value']):
+                pending = self._pending.get(signature)
+                if pending is None:
+                    continue
+                pending.landed = status is not None
+                if status is None:
+                    continue
+                if status.get('err') is not None:
+                    self._resolve(signature, Confirmation(
+                        signature, 'failed', status.get('confirmationStatus'), status.get('slot'), status['err']
+                    ))
+                    resolved += 1
+                    continue
+                reached = status.get('confirmationStatus') or 'processed'
+                if COMMITMENT_LEVELS[reached] >= COMMITMENT_LEVELS[pending.commitment]:
+                    self._resolve(signature, Confirmation(signature, 'confirmed', reached, status.get('slot')))
+                    resolved += 1
+        return resolved
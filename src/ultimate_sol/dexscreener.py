@@ -1,20 +1,149 @@
-import httpx
+import asyncio
+import copy
+from concurrent.futures import ThreadPoolExecutor
 
+from .cache import get_token_cache
+from .http_client import get_async_client, get_client
 
-def get_token_profile(token_address: str) -> dict | None:
-    """
-    Returns token profile (if exist) from dexscreener with name, symbol, price, volume, etc.\n
-    Docs: https://docs.dexscreener.com/api/reference
-    """
-    url = f'https://api.dexscreener.com/latest/dex/tokens/{token_address}'
-    response = httpx.get(url)
+DEXSCREENER_HOST = 'api.dexscreener.com'
+SOL_ADDRESS = 'So11111111111111111111111111111111111111112'
+
+# The tokens endpoint accepts up to 30 comma-separated addresses.
+TOKENS_LIMIT = 30
+
+
+def _parse_token_profile(response) -> dict | None:
     if response.status_code == 200:
         response = response.json()
         if response.get('pairs'):
             for pair in response['pairs']:
-                if pair['quoteToken']['address'] == 'So11111111111111111111111111111111111111112':
+                if pair['quoteToken']['address'] == SOL_ADDRESS:
                     return pair
         else:
             return None
     else:
         raise Exception(f'dexscreener.get_token_profile() error: {response.json()}')
+
+
+def get_token_profile(token_address: str) -> dict | None:
+    """
+    Returns token profile (if exist) from dexscreener with name, symbol, price, volume, etc.\n
+    Docs: https://docs.dexscreener.com/api/reference
+    """
+    url = f'https://api.dexscreener.com/latest/dex/tokens/{token_address}'
+    response = get_client().get(url)
+    return _parse_token_profile(response)
+
+
+async def get_token_profile_async(token_address: str) -> dict | None:
+    """
+    Async version of ``get_token_profile``.
+    """
+    url = f'https://api.dexscreener.com/latest/dex/tokens/{token_address}'
+    response = await get_async_client().get(url)
+    return _parse_token_profile(response)
+
+
+def _tokens_url(addresses: list[str]) -> str:
+    return f'https://{DEXSCREENER_HOST}/latest/dex/tokens/{",".join(addresses)}'
+
+
+def _index_pairs(pairs: list) -> tuple[dict, dict]:
+    # First SOL-quoted pair of every base token and first SOL-based pair of every quote token.
+    by_base = {}
+    by_quote = {}
+    for pair in pairs:
+        base = pair['baseToken']['address']
+        quote = pair['quoteToken']['address']
+        if quote == SOL_ADDRESS:
+            by_base.setdefault(base, pair)
+        if base == SOL_ADDRESS:
+            by_quote.setdefault(quote, pair)
+    return by_base, by_quote
+
+
+def _parse_token_profiles(addresses: list[str], response) -> dict:
+    try:
+        response.raise_for_status()
+        pairs = response.json().get('pairs') or []
+        by_base, by_quote = _index_pairs(pairs)
+    except Exception as e:
+        error = Exception(f'dexscreener.get_token_profiles error: {e!r}')
+        return {address: error for address in addresses}
+    return {address: by_base.get(address) or by_quote.get(address) for address in addresses}
+
+
+def _profile_chunks(addresses: list[str], cache) -> tuple[dict, list[list[str]]]:
+    cached = {}
+    missing = []
+    for address in dict.fromkeys(addresses):
+        hit, profile = cache.lookup('dexscreener_profile', address)
+        if hit:
+            cached[address] = profile
+        else:
+            missing.append(address)
+    return cached, [missing[i:i + TOKENS_LIMIT] for i in range(0, len(missing), TOKENS_LIMIT)]
+
+
+def _store_profiles(profiles: dict, cache) -> None:
+    for address, profile in profiles.items():
+        if not isinstance(profile, Exception):
+            cache.store('dexscreener_profile', address, profile)
+
+
+def _profiles_result(addresses: list[str], result: dict) -> dict:
+    # Cached pairs are shared by later calls (and one pair may serve two addresses), so every address gets a copy.
+    profiles = {}
+    for address in dict.fromkeys(addresses):
+        profile = result[address]
+        profiles[address] = profile if isinstance(profile, Exception) else copy.deepcopy(profile)
+    return profiles
+
+
+def _fetch_token_profiles(addresses: list[str]) -> dict:
+    try:
+        response = get_client().get(_tokens_url(addresses))
+    except Exception as e:
+        error = Exception(f'dexscreener.get_token_profiles error: {e!r}')
+        return {address: error for address in addresses}
+    return _parse_token_profiles(addresses, response)
+
+
+async def _fetch_token_profiles_async(addresses: list[str]) -> dict:
+    try:
+        response = await get_async_client().get(_tokens_url(addresses))
+    except Exception as e:
+        error = Exception(f'dexscreener.get_token_profiles error: {e!r}')
+        return {address: error for address in addresses}
+    return _parse_token_profiles(addresses, response)
+
+
+def get_token_profiles(addresses: list[str], max_workers: int = 4) -> dict:
+    """
+    Returns SOL pair profiles of many tokens, requested 30 addresses at a time. Requests are sent
+    concurrently within the DexScreener rate limit (see ``ratelimit``) and profiles
+    are cached for a short time (``dexscreener_profile`` kind of the token cache).
+
+    :return: {<address>: <pair or None>, ...}, addresses which failed are mapped to an Exception
+    """
+    cache = get_token_cache()
+    result, chunks = _profile_chunks(addresses, cache)
+    if not chunks:
+        return _profiles_result(addresses, result)
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+        for profiles in executor.map(_fetch_token_profiles, chunks):
+            _store_profiles(profiles, cache)
+            result.update(profiles)
+    return _profiles_result(addresses, result)
+
+
+async def get_token_profiles_async(addresses: list[str]) -> dict:
+    """
+    Async version of ``get_token_profiles``.
+    """
+    cache = get_token_cache()
+    result, chunks = _profile_chunks(addresses, cache)
+    for profiles in await asyncio.gather(*[_fetch_token_profiles_async(chunk) for chunk in chunks]):
+        _store_profiles(profiles, cache)
+        result.update(profiles)
+    return _profiles_result(addresses, result)
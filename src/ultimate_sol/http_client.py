@@ -0,0 +1,229 @@
+import asyncio
+import weakref
+from typing import TYPE_CHECKING
+
+# httpx and solana are imported on first use, so that importing the SDK stays cheap.
+if TYPE_CHECKING:
+    import httpx
+    from solana.rpc.api import Client
+    from solana.rpc.async_api import AsyncClient
+
+DEFAULT_TIMEOUT = 10
+DEFAULT_LIMITS_KWARGS = {"max_connections": 100, "max_keepalive_connections": 20, "keepalive_expiry": 30}
+
+_settings = {
+    "limits": None,
+    "timeout": DEFAULT_TIMEOUT,
+    "http2": True,
+}
+_client = None
+# Shared async clients by event loop: an ``httpx.AsyncClient`` can only be used on the loop it connected on.
+_async_clients = weakref.WeakKeyDictionary()
+# Client created or set outside an event loop, the first loop that makes a call adopts it.
+_unbound_async_client = None
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def __getattr__(name: str):
+    if name == 'DEFAULT_LIMITS':
+        import httpx
+        return httpx.Limits(**DEFAULT_LIMITS_KWARGS)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def configure(
+        limits: 'httpx.Limits' = None,
+        timeout: float = None,
+        http2: bool = None,
+) -> None:
+    """
+    Configure the shared connection pools. Clients that were already created are closed
+    and rebuilt with the new settings on next use. Async clients are closed on their event loops
+    if those are running, otherwise ``await aclose()`` before calling ``configure``.
+    """
+    global _client, _unbound_async_client
+
+    if limits is not None:
+        _settings["limits"] = limits
+    if timeout is not None:
+        _settings["timeout"] = timeout
+    if http2 is not None:
+        _settings["http2"] = http2
+
+    if _client is not None:
+        _client.close()
+    for loop, (client, closer) in list(_async_clients.items()):
+        if loop.is_running():
+            asyncio.run_coroutine_threadsafe(_aclose_gen(closer), loop)
+    _client = None
+    _async_clients.clear()
+    _unbound_async_client = None
+
+
+def _transport_kwargs() -> dict:
+    import httpx
+    return {
+        "limits": _settings["limits"] or httpx.Limits(**DEFAULT_LIMITS_KWARGS),
+        "http2": _settings["http2"] and _http2_available(),
+    }
+
+
+def get_client() -> 'httpx.Client':
+    """
+    Returns the shared keep-alive ``httpx.Client`` used by all synchronous calls.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        import httpx
+
+        from .transport import InstrumentedTransport, SchedulingTransport
+        _client = httpx.Client(
+            timeout=_settings["timeout"],
+            transport=SchedulingTransport(InstrumentedTransport(httpx.HTTPTransport(**_transport_kwargs()))),
+        )
+    return _client
+
+
+def _running_loop() -> asyncio.AbstractEventLoop | None:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _new_async_client() -> 'httpx.AsyncClient':
+    import httpx
+
+    from .transport import AsyncInstrumentedTransport, AsyncSchedulingTransport
+    return httpx.AsyncClient(
+        timeout=_settings["timeout"],
+        transport=AsyncSchedulingTransport(AsyncInstrumentedTransport(
+            httpx.AsyncHTTPTransport(**_transport_kwargs()))),
+    )
+
+
+async def _close_on_shutdown(client: 'httpx.AsyncClient'):
+    # Async generator registered with the event loop: ``asyncio.run`` finalizes it (``loop.shutdown_asyncgens``)
+    # before closing the loop, so the client's connections are closed while the loop can still do it.
+    try:
+        yield
+    finally:
+        for loop, (bound, _) in list(_async_clients.items()):
+            if bound is client:
+                del _async_clients[loop]
+        await client.aclose()
+
+
+async def _aclose_gen(closer) -> None:
+    await closer.aclose()
+
+
+def _bind(loop: asyncio.AbstractEventLoop, client: 'httpx.AsyncClient') -> None:
+    # Drop clients of loops which were closed without finalizing them.
+    for other in [other for other in _async_clients if other.is_closed()]:
+        del _async_clients[other]
+    closer = _close_on_shutdown(client)
+    try:
+        # The first step registers the generator with the running loop and stops at ``yield``.
+        closer.asend(None).send(None)
+    except StopIteration:
+        pass
+    _async_clients[loop] = (client, closer)
+
+
+def get_async_client() -> 'httpx.AsyncClient':
+    """
+    Returns the shared keep-alive ``httpx.AsyncClient`` of the running event loop used by all asynchronous calls.
+    Every event loop gets its own client, which is closed when the loop is shut down by ``asyncio.run``.
+    """
+    global _unbound_async_client
+    loop = _running_loop()
+    entry = _async_clients.get(loop) if loop is not None else None
+    if entry is not None and not entry[0].is_closed:
+        return entry[0]
+    client = _unbound_async_client
+    if client is None or client.is_closed:
+        client = _new_async_client()
+    if loop is None:
+        _unbound_async_client = client
+    else:
+        _unbound_async_client = None
+        _bind(loop, client)
+    return client
+
+
+def set_client(client: 'httpx.Client') -> None:
+    """
+    Use your own ``httpx.Client`` (e.g. with custom transport or proxies) for all synchronous calls.
+    Wrap its transport in ``transport.SchedulingTransport`` to keep rate limits and retries.
+    """
+    global _client
+    _client = client
+
+
+def set_async_client(client: 'httpx.AsyncClient') -> None:
+    """
+    Use your own ``httpx.AsyncClient`` for the asynchronous calls on the running event loop (called outside
+    an event loop - on the first loop which makes a call). Calls on other event loops keep getting shared clients,
+    since one client can't be used on several loops. The client is closed when its loop is shut down.
+    """
+    global _unbound_async_client
+    loop = _running_loop()
+    if loop is None:
+        _unbound_async_client = client
+    else:
+        _bind(loop, client)
+
+
+def close() -> None:
+    """
+    Close the shared synchronous client.
+    """
+    global _client
+    if _client is not None:
+        _client.close()
+    _client = None
+
+
+async def aclose() -> None:
+    """
+    Close the shared asynchronous client of the running event loop.
+    """
+    global _unbound_async_client
+    entry = _async_clients.get(asyncio.get_running_loop())
+    if entry is not None:
+        await entry[1].aclose()
+    if _unbound_async_client is not None:
+        await _unbound_async_client.aclose()
+    _unbound_async_client = None
+
+
+def rpc_client(endpoint: str) -> 'Client':
+    """
+    Returns ``solana.rpc.api.Client`` which uses the shared connection pool.
+    """
+    from solana.rpc.api import Client
+
+    from .providers import PooledHTTPProvider
+    client = Client(endpoint)
+    client._provider = PooledHTTPProvider(endpoint)
+    return client
+
+
+def async_rpc_client(endpoint: str) -> 'AsyncClient':
+    """
+    Returns ``solana.rpc.async_api.AsyncClient`` which uses the shared connection pool.
+    """
+    from solana.rpc.async_api import AsyncClient
+
+    from .providers import AsyncPooledHTTPProvider
+    client = AsyncClient(endpoint)
+    client._provider = AsyncPooledHTTPProvider(endpoint)
+    return client
@@ -0,0 +1,143 @@
+import codecs
+import json
+import re
+
+_WHITESPACE = ' \t\n\r'
+_DELIMITERS = _WHITESPACE + ',]'
+_NUMBER_START = '-0123456789'
+_SPACE = re.compile(r'[ \t\n\r]*')
+
+# What the array parser expects next: the first element or "]", an element, or "," / "]".
+_FIRST, _ELEMENT, _DELIMITER = range(3)
+
+
+class ArrayParser:
+    """
+    Incremental parser of a top-level JSON array: ``feed`` it chunks of the body as they arrive and it
+    returns the elements completed so far. Only the element being downloaded is kept in memory.
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._pos = 0
+        self._pending = []
+        self._pending_size = 0
+        self._started = False
+        self._finished = False
+        self._expect = _FIRST
+
+    def _append(self, text: str, final: bool = False) -> bool:
+        # Returns False while the chunks are only collected: an unfinished element is parsed again (and copied)
+        # once at least as much text as it already has arrived, so a large element costs linear time.
+        self._pending.append(text)
+        self._pending_size += len(text)
+        if not final and self._pending_size < len(self._buffer) - self._pos:
+            return False
+        # Consumed text is dropped, so only the unfinished element is copied.
+        self._buffer = self._buffer[self._pos:] + ''.join(self._pending)
+        self._pos = 0
+        self._pending = []
+        self._pending_size = 0
+        return True
+
+    def feed(self, chunk: bytes) -> list:
+        if not self._append(self._text.decode(chunk)):
+            return []
+        return self._items(final=False)
+
+    def close(self) -> list:
+        self._append(self._text.decode(b'', final=True), final=True)
+        items = self._items(final=True)
+        if not self._finished:
+            raise ValueError(f'unexpected end of JSON array: {self._buffer[self._pos:self._pos + 100]!r}')
+        return items
+
+    def _skip(self, pattern: re.Pattern) -> None:
+        self._pos = pattern.match(self._buffer, self._pos).end()
+
+    def _items(self, final: bool) -> list:
+        items = []
+        if self._finished:
+            self._skip(_SPACE)
+            if self._pos < len(self._buffer):
+                raise ValueError(f'extra data after JSON array: {self._buffer[self._pos:self._pos + 100]!r}')
+            return items
+        if not self._started:
+            self._skip(_SPACE)
+            if self._pos == len(self._buffer):
+                return items
+            if self._buffer[self._pos] != '[':
+                # Not an array (usually an error object): hand back the rest of the body in the error.
+                if not final:
+                    return items
+                raise ValueError(f'expected a JSON array, got: {self._buffer[self._pos:self._pos + 500]}')
+            self._started = True
+            self._pos += 1
+
+        while True:
+            self._skip(_SPACE)
+            if self._pos == len(self._buffer):
+                break
+            char = self._buffer[self._pos]
+            if self._expect == _DELIMITER or (self._expect == _FIRST and char == ']'):
+                if char == ',':
+                    self._expect = _ELEMENT
+                    self._pos += 1
+                    continue
+                if char == ']':
+                    self._finished = True
+                    self._pos += 1
+                    break
+                raise ValueError(f'expected "," or "]" in JSON array: {self._buffer[self._pos:self._pos + 100]!r}')
+            if char in ',]':
+                raise ValueError(f'expected an element in JSON array: {self._buffer[self._pos:self._pos + 100]!r}')
+            try:
+                item, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if final:
+                    raise
+                # The element is not complete yet.
+                break
+            if not final and self._buffer[self._pos] in _NUMBER_START and (
+                    end == len(self._buffer) or self._buffer[end] not in _DELIMITERS):
+                # A number is complete only once a delimiter follows, "12." may continue as "12.5".
+                break
+            items.append(item)
+            self._pos = end
+            self._expect = _DELIMITER
+        return items
+
+
+def _select(items: list, fields: tuple | None, where) -> list:
+    if where is not None:
+        items = [item for item in items if where(item)]
+    if fields is not None:
+        items = [{field: item.get(field) for field in fields} for item in items]
+    return items
+
+
+def iter_array(chunks, fields: tuple | None = None, where=None):
+    """
+    Yields elements of the JSON array read from an iterable of ``bytes`` chunks.
+
+    :param fields: keep only these keys of every element (missing keys are None)
+    :param where: predicate called with the full element, elements for which it is falsy are skipped
+    """
+    parser = ArrayParser()
+    for chunk in chunks:
+        yield from _select(parser.feed(chunk), fields, where)
+    yield from _select(parser.close(), fields, where)
+
+
+async def iter_array_async(chunks, fields: tuple | None = None, where=None):
+    """
+    Async version of ``iter_array`` reading from an async iterable of ``bytes`` chunks.
+    """
+    parser = ArrayParser()
+    async for chunk in chunks:
+        for item in _select(parser.feed(chunk), fields, where):
+            yield item
+    for item in _select(parser.close(), fields, where):
+        yield item
@@ -1,9 +1,114 @@
+import asyncio
 import base64
+import copy
+import math
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
 
-import httpx
-from solders import message
-from solders.keypair import Keypair
-from solders.transaction import VersionedTransaction
+from .cache import get_token_cache
+from .http_client import get_async_client, get_client
+from .json_stream import iter_array, iter_array_async
+from .singleflight import AsyncSingleFlight, SingleFlight
+
+# solders is imported by the functions signing transactions.
+if TYPE_CHECKING:
+    from solders.keypair import Keypair
+
+# The Price API accepts up to 100 comma-separated ids per request.
+PRICE_IDS_LIMIT = 100
+
+TICKERS_URL = "https://stats.jup.ag/coingecko/tickers"
+
+# Identical quotes requested at the same time (by any Jupiter instance) share one request.
+_quotes = SingleFlight()
+_quotes_async = AsyncSingleFlight()
+
+# Local token index consulted by ``get_token_info`` before the API, see ``set_token_registry``.
+_token_registry = None
+
+SWAP_HEADERS = {
+    'Content-Type': 'application/json',
+    'Accept': 'application/json'
+}
+
+
+class QuoteLadder:
+    """
+    Quotes of one pair at increasing amounts, kept column-wise in arrays: ``amounts``, ``out_amounts``
+    (raw units), ``prices`` (``outAmount / inAmount`` in raw units), ``price_impacts`` (``priceImpactPct``)
+    and ``routes`` (AMM labels, e.g. ``"Raydium > Orca"``). Failed quotes have NaN price and impact,
+    their exceptions are kept in ``errors`` by amount. ``stopped`` is True if the ladder was cut short
+    by ``max_price_impact``.
+    """
+    __slots__ = ('input_mint', 'output_mint', 'amounts', 'out_amounts', 'prices', 'price_impacts', 'routes',
+                 'errors', 'stopped')
+
+    def __init__(self, input_mint: str, output_mint: str):
+        self.input_mint = input_mint
+        self.output_mint = output_mint
+        self.amounts = array('Q')
+        self.out_amounts = array('Q')
+        self.prices = array('d')
+        self.price_impacts = array('d')
+        self.routes = []
+        self.errors = {}
+        self.stopped = False
+
+    def add(self, amount: int, quote) -> float:
+        """
+        Append the quote (or the exception) for ``amount`` and return its price impact.
+        """
+        try:
+            if isinstance(quote, Exception):
+                raise quote
+            in_amount = int(quote['inAmount'])
+            out_amount = int(quote['outAmount'])
+            price_impact = float(quote.get('priceImpactPct') or 0)
+            route = ' > '.join(step['swapInfo'].get('label', '?') for step in quote.get('routePlan') or [])
+        except Exception as e:
+            error = e if isinstance(quote, Exception) else Exception(f'jupiter.quote_ladder error: {quote}')
+            self.errors[amount] = error
+            in_amount, out_amount, price_impact, route = 0, 0, math.nan, None
+        self.amounts.append(amount)
+        self.out_amounts.append(out_amount)
+        self.prices.append(out_amount / in_amount if in_amount else math.nan)
+        self.price_impacts.append(price_impact)
+        self.routes.append(route)
+        return price_impact
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    def __getitem__(self, i: int) -> tuple:
+        return self.amounts[i], self.out_amounts[i], self.prices[i], self.price_impacts[i], self.routes[i]
+
+    def __iter__(self):
+        return zip(self.amounts, self.out_amounts, self.prices, self.price_impacts, self.routes)
+
+    def to_dict(self) -> dict:
+        return {
+            "input_mint": self.input_mint,
+            "output_mint": self.output_mint,
+            "amounts": self.amounts.tolist(),
+            "out_amounts": self.out_amounts.tolist(),
+            "prices": self.prices.tolist(),
+            "price_impacts": self.price_impacts.tolist(),
+            "routes": self.routes,
+            "stopped": self.stopped,
+        }
+
+    def __repr__(self) -> str:
+        return f'QuoteLadder({self.input_mint} -> {self.output_mint}, {len(self)} amounts)'
+
+
+def _check_concurrency(concurrency: int) -> None:
+    if concurrency < 1:
+        raise ValueError(f'jupiter.quote_ladder error: concurrency must be at least 1, got {concurrency}')
+
+
+def _impact_exceeded(price_impact: float, max_price_impact: float | None) -> bool:
+    return max_price_impact is not None and price_impact > max_price_impact
 
 
 class Jupiter:
@@ -19,7 +124,7 @@ class Jupiter:
 
     def __init__(
             self,
-            keypair: Keypair,
+            keypair: 'Keypair',
             quote_api_url: str = "https://quote-api.jup.ag/v6/quote?",
             swap_api_url: str = "https://quote-api.jup.ag/v6/swap",
             open_order_api_url: str = "https://jup.ag/api/limit/v1/createOrder",
@@ -27,8 +132,17 @@ class Jupiter:
             query_open_orders_api_url: str = "https://jup.ag/api/limit/v1/openOrders?wallet=",
             query_order_history_api_url: str = "https://jup.ag/api/limit/v1/orderHistory",
             query_trade_history_api_url: str = "https://jup.ag/api/limit/v1/tradeHistory",
+            coalesce_quotes: bool = True,
+            quote_ttl: float = 0.0,
     ):
+        """
+        :param coalesce_quotes: concurrent ``quote`` calls with the same parameters share one request
+            (every caller gets its own copy of the quote)
+        :param quote_ttl: seconds for which a coalesced quote may be reused by later calls (0 - no reuse)
+        """
         self.keypair = keypair
+        self.coalesce_quotes = coalesce_quotes
+        self.quote_ttl = quote_ttl
 
         self.ENDPOINT_APIS_URL["QUOTE"] = quote_api_url
         self.ENDPOINT_APIS_URL["SWAP"] = swap_api_url
@@ -38,6 +152,79 @@ class Jupiter:
         self.ENDPOINT_APIS_URL["QUERY_ORDER_HISTORY"] = query_order_history_api_url
         self.ENDPOINT_APIS_URL["QUERY_TRADE_HISTORY"] = query_trade_history_api_url
 
+    def _quote_params(
+            self,
+            input_mint: str,
+            output_mint: str,
+            amount: int,
+            slippage_bps: int = None,
+            swap_mode: str = "ExactIn",
+            only_direct_routes: bool = False,
+            as_legacy_transaction: bool = False,
+            exclude_dexes: list = None,
+            max_accounts: int = None,
+            platform_fee_bps: int = None
+    ) -> dict:
+        params = {
+            "inputMint": input_mint,
+            "outputMint": output_mint,
+            "amount": str(amount),
+            "swapMode": swap_mode,
+            "onlyDirectRoutes": str(only_direct_routes).lower(),
+            "asLegacyTransaction": str(as_legacy_transaction).lower(),
+        }
+        if slippage_bps:
+            params["slippageBps"] = str(slippage_bps)
+        if exclude_dexes:
+            params["excludeDexes"] = ','.join(sorted(exclude_dexes))
+        if max_accounts:
+            params["maxAccounts"] = str(max_accounts)
+        if platform_fee_bps:
+            params["platformFeeBps"] = str(platform_fee_bps)
+        return params
+
+    def _quote_request(self, *args) -> tuple[str, dict, tuple]:
+        # URL, query parameters and the key under which identical quotes are coalesced.
+        url = self.ENDPOINT_APIS_URL['QUOTE'].rstrip('?')
+        params = self._quote_params(*args)
+        return url, params, (url,) + tuple(params.items())
+
+    def _swap_parameters(
+            self,
+            quote_response: dict,
+            wrap_unwrap_sol: bool = True,
+            prioritization_fee_lamports: int = None,
+    ) -> dict:
+        transaction_parameters = {
+            "userPublicKey": self.keypair.pubkey().__str__(),
+            "wrapAndUnwrapSol": wrap_unwrap_sol,
+            "quoteResponse": quote_response,
+        }
+        if prioritization_fee_lamports:
+            transaction_parameters.update({"prioritizationFeeLamports": prioritization_fee_lamports})
+        return transaction_parameters
+
+    def _open_order_parameters(
+            self,
+            base: 'Keypair',
+            input_mint: str,
+            output_mint: str,
+            in_amount: int = 0,
+            out_amount: int = 0,
+            expired_at: int = None
+    ) -> dict:
+        transaction_parameters = {
+            "owner": self.keypair.pubkey().__str__(),
+            "inputMint": input_mint,
+            "outputMint": output_mint,
+            "outAmount": out_amount,
+            "inAmount": in_amount,
+            "base": base.pubkey().__str__()
+        }
+        if expired_at:
+            transaction_parameters['expiredAt'] = expired_at
+        return transaction_parameters
+
     def quote(
             self,
             input_mint: str,
@@ -56,22 +243,56 @@ class Jupiter:
         https://quote-api.jup.ag/v6/quote. Docs: https://station.jup.ag/api-v6/get-quote.
         """
 
-        quote_url = self.ENDPOINT_APIS_URL[
-                        'QUOTE'] + "inputMint=" + input_mint + "&outputMint=" + output_mint + "&amount=" + str(
-            amount) + "&swapMode=" + swap_mode + "&onlyDirectRoutes=" + str(
-            only_direct_routes).lower() + "&asLegacyTransaction=" + str(as_legacy_transaction).lower()
-        if slippage_bps:
-            quote_url += "&slippageBps=" + str(slippage_bps)
-        if exclude_dexes:
-            quote_url += "&excludeDexes=" + ','.join(exclude_dexes)
-        if max_accounts:
-            quote_url += "&maxAccounts=" + str(max_accounts)
-        if platform_fee_bps:
-            quote_url += "&plateformFeeBps=" + str(platform_fee_bps)
+        url, params, key = self._quote_request(
+            input_mint, output_mint, amount, slippage_bps, swap_mode, only_direct_routes,
+            as_legacy_transaction, exclude_dexes, max_accounts, platform_fee_bps
+        )
+        if self.coalesce_quotes:
+            return copy.deepcopy(_quotes.do(key, lambda: _fetch_quote(url, params), self.quote_ttl))
+        return _fetch_quote(url, params)
 
-        quote_response = httpx.get(url=quote_url)
-        quote_response = quote_response.json()
-        return quote_response
+    def quote_ladder(
+            self,
+            input_mint: str,
+            output_mint: str,
+            amounts: list[int],
+            max_price_impact: float = None,
+            concurrency: int = 4,
+            slippage_bps: int = None,
+            swap_mode: str = "ExactIn",
+            only_direct_routes: bool = False,
+            exclude_dexes: list = None,
+            max_accounts: int = None,
+    ) -> QuoteLadder:
+        """
+        Quote one pair at every amount of ``amounts`` (sorted ascending) with up to ``concurrency``
+        requests in flight, e.g. to map price impact before sizing a trade.
+
+        :param max_price_impact: stop once an amount's ``priceImpactPct`` exceeds it, quotes of larger
+            amounts which haven't started yet are cancelled (the exceeding amount is kept)
+        """
+        _check_concurrency(concurrency)
+        amounts = sorted(set(amounts))
+        ladder = QuoteLadder(input_mint, output_mint)
+        if not amounts:
+            return ladder
+
+        def fetch(amount: int):
+            try:
+                return self.quote(input_mint, output_mint, amount, slippage_bps, swap_mode, only_direct_routes,
+                                  False, exclude_dexes, max_accounts)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(amounts))) as executor:
+            futures = [executor.submit(fetch, amount) for amount in amounts]
+            for amount, future in zip(amounts, futures):
+                if _impact_exceeded(ladder.add(amount, future.result()), max_price_impact):
+                    ladder.stopped = True
+                    for pending in futures:
+                        pending.cancel()
+                    break
+        return ladder
 
     def swap(
             self,
@@ -107,20 +328,12 @@ class Jupiter:
                 platform_fee_bps=platform_fee_bps
             )
 
-        transaction_parameters = {
-            "userPublicKey": self.keypair.pubkey().__str__(),
-            "wrapAndUnwrapSol": wrap_unwrap_sol,
-            "quoteResponse": quote_response,
-        }
-        if prioritization_fee_lamports:
-            transaction_parameters.update({"prioritizationFeeLamports": prioritization_fee_lamports})
-
-        headers = {
-            'Content-Type': 'application/json',
-            'Accept': 'application/json'
-        }
-
-        transaction_data = httpx.post(url=self.ENDPOINT_APIS_URL['SWAP'], headers=headers, json=transaction_parameters)
+        transaction_parameters = self._swap_parameters(
+            quote_response, wrap_unwrap_sol, prioritization_fee_lamports
+        )
+        transaction_data = get_client().post(
+            url=self.ENDPOINT_APIS_URL['SWAP'], headers=SWAP_HEADERS, json=transaction_parameters
+        )
         transaction_data = transaction_data.json()
         try:
             return transaction_data['swapTransaction']
@@ -139,26 +352,183 @@ class Jupiter:
         Open an order. Docs: https://station.jup.ag/docs/limit-order/limit-order.
         """
 
+        from solders.keypair import Keypair
+
         keypair = Keypair()
-        transaction_parameters = {
-            "owner": self.keypair.pubkey().__str__(),
-            "inputMint": input_mint,
-            "outputMint": output_mint,
-            "outAmount": out_amount,
-            "inAmount": in_amount,
-            "base": keypair.pubkey().__str__()
-        }
-        if expired_at:
-            transaction_parameters['expiredAt'] = expired_at
+        transaction_parameters = self._open_order_parameters(
+            keypair, input_mint, output_mint, in_amount, out_amount, expired_at
+        )
+        transaction_data = get_client().post(url=self.ENDPOINT_APIS_URL['OPEN_ORDER'], json=transaction_parameters)
+        return _sign_open_order(keypair, transaction_data.json())
+
+
+class AsyncJupiter(Jupiter):
+    """
+    Async version of ``Jupiter``. All requests share one keep-alive ``httpx.AsyncClient``.
+    """
+
+    async def quote(
+            self,
+            input_mint: str,
+            output_mint: str,
+            amount: int,
+            slippage_bps: int = None,
+            swap_mode: str = "ExactIn",
+            only_direct_routes: bool = False,
+            as_legacy_transaction: bool = False,
+            exclude_dexes: list = None,
+            max_accounts: int = None,
+            platform_fee_bps: int = None
+    ) -> dict:
+        """
+        Get the best swap route for a token trade pair sorted by largest output token amount from
+        https://quote-api.jup.ag/v6/quote. Docs: https://station.jup.ag/api-v6/get-quote.
+        """
+
+        url, params, key = self._quote_request(
+            input_mint, output_mint, amount, slippage_bps, swap_mode, only_direct_routes,
+            as_legacy_transaction, exclude_dexes, max_accounts, platform_fee_bps
+        )
+        if self.coalesce_quotes:
+            return copy.deepcopy(await _quotes_async.do(key, lambda: _fetch_quote_async(url, params), self.quote_ttl))
+        return await _fetch_quote_async(url, params)
+
+    async def quote_ladder(
+            self,
+            input_mint: str,
+            output_mint: str,
+            amounts: list[int],
+            max_price_impact: float = None,
+            concurrency: int = 4,
+            slippage_bps: int = None,
+            swap_mode: str = "ExactIn",
+            only_direct_routes: bool = False,
+            exclude_dexes: list = None,
+            max_accounts: int = None,
+    ) -> QuoteLadder:
+        """
+        Async version of ``Jupiter.quote_ladder``.
+        """
+        _check_concurrency(concurrency)
+        amounts = sorted(set(amounts))
+        ladder = QuoteLadder(input_mint, output_mint)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(amount: int):
+            async with semaphore:
+                try:
+                    return await self.quote(input_mint, output_mint, amount, slippage_bps, swap_mode,
+                                            only_direct_routes, False, exclude_dexes, max_accounts)
+                except Exception as e:
+                    return e
+
+        tasks = [asyncio.ensure_future(fetch(amount)) for amount in amounts]
+        try:
+            for amount, task in zip(amounts, tasks):
+                if _impact_exceeded(ladder.add(amount, await task), max_price_impact):
+                    ladder.stopped = True
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+        return ladder
+
+    async def swap(
+            self,
+            input_mint: str,
+            output_mint: str,
+            amount: int = 0,
+            quote_response: str = None,
+            wrap_unwrap_sol: bool = True,
+            slippage_bps: int = 1,
+            swap_mode: str = "ExactIn",
+            prioritization_fee_lamports: int = None,
+            only_direct_routes: bool = False,
+            as_legacy_transaction: bool = False,
+            exclude_dexes: list = None,
+            max_accounts: int = None,
+            platform_fee_bps: int = None
+    ) -> str:
+        """
+        Perform a swap. Docs: https://station.jup.ag/api-v6/post-swap.
+        """
 
-        transaction_data = httpx.post(url=self.ENDPOINT_APIS_URL['OPEN_ORDER'], json=transaction_parameters)
+        if quote_response is None:
+            quote_response = await self.quote(
+                input_mint=input_mint,
+                output_mint=output_mint,
+                amount=amount,
+                slippage_bps=slippage_bps,
+                swap_mode=swap_mode,
+                only_direct_routes=only_direct_routes,
+                as_legacy_transaction=as_legacy_transaction,
+                exclude_dexes=exclude_dexes,
+                max_accounts=max_accounts,
+                platform_fee_bps=platform_fee_bps
+            )
+
+        transaction_parameters = self._swap_parameters(
+            quote_response, wrap_unwrap_sol, prioritization_fee_lamports
+        )
+        transaction_data = await get_async_client().post(
+            url=self.ENDPOINT_APIS_URL['SWAP'], headers=SWAP_HEADERS, json=transaction_parameters
+        )
+        transaction_data = transaction_data.json()
         try:
-            transaction_data = transaction_data.json()['tx']
+            return transaction_data['swapTransaction']
         except:
-            raise Exception(transaction_data.json()['error'])
-        raw_transaction = VersionedTransaction.from_bytes(base64.b64decode(transaction_data))
-        signature2 = keypair.sign_message(message.to_bytes_versioned(raw_transaction.message))
-        return {"transaction_data": transaction_data, "signature2": signature2}
+            raise Exception(transaction_data['error'])
+
+    async def open_order(
+            self,
+            input_mint: str,
+            output_mint: str,
+            in_amount: int = 0,
+            out_amount: int = 0,
+            expired_at: int = None
+    ) -> dict:
+        """
+        Open an order. Docs: https://station.jup.ag/docs/limit-order/limit-order.
+        """
+
+        from solders.keypair import Keypair
+
+        keypair = Keypair()
+        transaction_parameters = self._open_order_parameters(
+            keypair, input_mint, output_mint, in_amount, out_amount, expired_at
+        )
+        transaction_data = await get_async_client().post(
+            url=self.ENDPOINT_APIS_URL['OPEN_ORDER'], json=transaction_parameters
+        )
+        return _sign_open_order(keypair, transaction_data.json())
+
+
+def _fetch_quote(url: str, params: dict) -> dict:
+    return get_client().get(url=url, params=params).json()
+
+
+async def _fetch_quote_async(url: str, params: dict) -> dict:
+    return (await get_async_client().get(url=url, params=params)).json()
+
+
+def _sign_open_order(keypair: 'Keypair', response: dict) -> dict:
+    from solders import message
+    from solders.transaction import VersionedTransaction
+
+    try:
+        transaction_data = response['tx']
+    except:
+        raise Exception(response['error'])
+    raw_transaction = VersionedTransaction.from_bytes(base64.b64decode(transaction_data))
+    signature2 = keypair.sign_message(message.to_bytes_versioned(raw_transaction.message))
+    return {"transaction_data": transaction_data, "signature2": signature2}
+
+
+def _tokens_list_url(list_type: str, banned_tokens: bool) -> str:
+    tokens_list_url = "https://token.jup.ag/" + list_type
+    if banned_tokens is True:
+        tokens_list_url += "?includeBanned=true"
+    return tokens_list_url
 
 
 def get_tokens_list(
@@ -170,15 +540,23 @@ def get_tokens_list(
     Docs: https://station.jup.ag/docs/token-list/token-list-api
     """
 
-    tokens_list_url = "https://token.jup.ag/" + list_type
-    if banned_tokens is True:
-        tokens_list_url += "?includeBanned=true"
-
-    tokens_list = httpx.get(tokens_list_url)
+    tokens_list = get_client().get(_tokens_list_url(list_type, banned_tokens))
     tokens_list = tokens_list.json()
     return tokens_list
 
 
+async def get_tokens_list_async(
+        list_type: str = "strict",
+        banned_tokens: bool = False
+) -> dict:
+    """
+    Async version of ``get_tokens_list``.
+    """
+
+    tokens_list = await get_async_client().get(_tokens_list_url(list_type, banned_tokens))
+    return tokens_list.json()
+
+
 def get_all_tickers(
 ) -> dict:
     """
@@ -186,10 +564,95 @@ def get_all_tickers(
     Docs: https://station.jup.ag/docs/additional-topics/displaying-jup-stats
     """
 
-    all_tickers_list = httpx.get("https://stats.jup.ag/coingecko/tickers")
+    all_tickers_list = get_client().get(TICKERS_URL)
+    return all_tickers_list.json()
+
+
+async def get_all_tickers_async(
+) -> dict:
+    """
+    Async version of ``get_all_tickers``.
+    """
+
+    all_tickers_list = await get_async_client().get(TICKERS_URL)
     return all_tickers_list.json()
 
 
+def _stream(name: str, url: str, fields: tuple | None, where):
+    with get_client().stream('GET', url) as response:
+        if response.status_code != 200:
+            raise Exception(f'jupiter.{name} error: {response.status_code} {response.read()[:500]!r}')
+        yield from iter_array(response.iter_bytes(), fields, where)
+
+
+async def _stream_async(name: str, url: str, fields: tuple | None, where):
+    async with get_async_client().stream('GET', url) as response:
+        if response.status_code != 200:
+            raise Exception(f'jupiter.{name} error: {response.status_code} {(await response.aread())[:500]!r}')
+        async for item in iter_array_async(response.aiter_bytes(), fields, where):
+            yield item
+
+
+def iter_tokens_list(
+        list_type: str = "strict",
+        banned_tokens: bool = False,
+        fields: tuple | None = None,
+        where=None,
+):
+    """
+    Streaming version of ``get_tokens_list``: yields tokens one by one while the list is downloading,
+    so memory use doesn't depend on the size of the list.
+
+    :param fields: keep only these keys of every token, e.g. ``("address", "symbol", "decimals")``
+    :param where: predicate called with every token, e.g. ``lambda t: "verified" in t["tags"]``
+    """
+    return _stream('iter_tokens_list', _tokens_list_url(list_type, banned_tokens), fields, where)
+
+
+def iter_tokens_list_async(
+        list_type: str = "strict",
+        banned_tokens: bool = False,
+        fields: tuple | None = None,
+        where=None,
+):
+    """
+    Async version of ``iter_tokens_list``, use with ``async for``.
+    """
+    return _stream_async('iter_tokens_list', _tokens_list_url(list_type, banned_tokens), fields, where)
+
+
+def iter_all_tickers(fields: tuple | None = None, where=None):
+    """
+    Streaming version of ``get_all_tickers``, yields tickers one by one.
+
+    :param fields: keep only these keys of every ticker, e.g. ``("ticker_id", "last_price")``
+    :param where: predicate called with every ticker
+    """
+    return _stream('iter_all_tickers', TICKERS_URL, fields, where)
+
+
+def iter_all_tickers_async(fields: tuple | None = None, where=None):
+    """
+    Async version of ``iter_all_tickers``, use with ``async for``.
+    """
+    return _stream_async('iter_all_tickers', TICKERS_URL, fields, where)
+
+
+def _token_price_url(input_mint: str, output_mint: str = None) -> str:
+    token_prices_url = "https://price.jup.ag/v6/price?ids=" + input_mint
+    if output_mint:
+        token_prices_url += "&vsToken=" + output_mint
+    return token_prices_url
+
+
+def _parse_token_price(input_mint: str, response) -> tuple:
+    try:
+        price = float(response.json()['data'][input_mint]['price'])
+        return input_mint, price
+    except:
+        return input_mint, 0
+
+
 def get_token_price(
         input_mint: str,
         output_mint: str = None,
@@ -200,25 +663,200 @@ def get_token_price(
 
     :return: tuple with input_mint and price in output_mint values (in USDC if None)
     """
-    token_prices_url = "https://price.jup.ag/v6/price?ids=" + input_mint
-    if output_mint:
-        token_prices_url += "&vsToken=" + output_mint
+    token_prices = get_client().get(_token_price_url(input_mint, output_mint))
+    return _parse_token_price(input_mint, token_prices)
+
+
+async def get_token_price_async(
+        input_mint: str,
+        output_mint: str = None,
+) -> tuple:
+    """
+    Async version of ``get_token_price``.
+
+    :return: tuple with input_mint and price in output_mint values (in USDC if None)
+    """
+    token_prices = await get_async_client().get(_token_price_url(input_mint, output_mint))
+    return _parse_token_price(input_mint, token_prices)
+
+
+def _price_batches(mints: list[str], batch_size: int) -> list[list[str]]:
+    mints = list(dict.fromkeys(mints))
+    batch_size = min(batch_size, PRICE_IDS_LIMIT)
+    return [mints[i:i + batch_size] for i in range(0, len(mints), batch_size)]
 
-    token_prices = httpx.get(token_prices_url)
+
+def _parse_token_prices(mints: list[str], response) -> dict:
     try:
-        price = float(token_prices.json()['data'][input_mint]['price'])
-        return input_mint, price
-    except:
-        return input_mint, 0
+        response.raise_for_status()
+        data = response.json()['data']
+    except Exception as e:
+        error = Exception(f'jupiter.get_token_prices error: {e!r}')
+        return {mint: error for mint in mints}
+    result = {}
+    for mint in mints:
+        try:
+            result[mint] = float(data[mint]['price'])
+        except:
+            result[mint] = Exception(f'jupiter.get_token_prices error: no price for {mint}')
+    return result
 
 
-def get_token_info(token_address: str) -> dict | None:
+def _fetch_token_prices(mints: list[str], vs_token: str = None) -> dict:
+    try:
+        response = get_client().get(_token_price_url(','.join(mints), vs_token))
+    except Exception as e:
+        error = Exception(f'jupiter.get_token_prices error: {e!r}')
+        return {mint: error for mint in mints}
+    return _parse_token_prices(mints, response)
+
+
+async def _fetch_token_prices_async(mints: list[str], vs_token: str = None) -> dict:
+    try:
+        response = await get_async_client().get(_token_price_url(','.join(mints), vs_token))
+    except Exception as e:
+        error = Exception(f'jupiter.get_token_prices error: {e!r}')
+        return {mint: error for mint in mints}
+    return _parse_token_prices(mints, response)
+
+
+def get_token_prices(
+        mints: list[str],
+        vs_token: str = None,
+        batch_size: int = PRICE_IDS_LIMIT,
+        max_workers: int = 8,
+) -> dict:
     """
-    Returns info about token, like decimals, symbol, logo and the like (works with pump.fun tokens).\n
-    Docs: https://station.jup.ag/docs/token-list/token-list-api
+    Returns prices of many tokens, requested in batches of up to 100 mints which are sent concurrently.
+    Docs: https://station.jup.ag/docs/apis/price-api
+
+    :return: {<mint>: <price in vs_token (in USDC if None)>, ...}, mints which failed are mapped to an Exception
+    """
+    batches = _price_batches(mints, batch_size)
+    result = {}
+    if not batches:
+        return result
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
+        for prices in executor.map(lambda batch: _fetch_token_prices(batch, vs_token), batches):
+            result.update(prices)
+    return result
+
+
+async def get_token_prices_async(
+        mints: list[str],
+        vs_token: str = None,
+        batch_size: int = PRICE_IDS_LIMIT,
+) -> dict:
+    """
+    Async version of ``get_token_prices``.
+    """
+    batches = _price_batches(mints, batch_size)
+    result = {}
+    for prices in await asyncio.gather(*[_fetch_token_prices_async(batch, vs_token) for batch in batches]):
+        result.update(prices)
+    return result
+
+
+class PriceBatcher:
     """
+    Collects concurrent single-token price requests for ``delay`` seconds and answers them
+    with one Price API call (or as soon as ``batch_size`` different mints are waiting).
+    """
+
+    def __init__(self, vs_token: str = None, delay: float = 0.005, batch_size: int = PRICE_IDS_LIMIT):
+        self.vs_token = vs_token
+        self.delay = delay
+        self.batch_size = min(batch_size, PRICE_IDS_LIMIT)
+        self._pending = {}
+        self._timer = None
+        self._tasks = set()
+
+    async def get_price(self, mint: str) -> float:
+        """
+        Returns token price, raises an Exception if the price couldn't be fetched.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(mint, []).append(future)
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.delay, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, {}
+        if pending:
+            task = asyncio.ensure_future(self._resolve(pending))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _resolve(self, pending: dict) -> None:
+        prices = await _fetch_token_prices_async(list(pending), self.vs_token)
+        for mint, futures in pending.items():
+            price = prices[mint]
+            for future in futures:
+                if future.done():
+                    continue
+                if isinstance(price, Exception):
+                    future.set_exception(price)
+                else:
+                    future.set_result(price)
+
+
+def _load_token_info(token_address: str) -> dict | None:
+    result = get_client().get(f'https://tokens.jup.ag/token/{token_address}').json()
+    if result:
+        return result
+    return None
+
 
-    result = httpx.get(f'https://tokens.jup.ag/token/{token_address}').json()
+async def _load_token_info_async(token_address: str) -> dict | None:
+    result = (await get_async_client().get(f'https://tokens.jup.ag/token/{token_address}')).json()
     if result:
         return result
     return None
+
+
+def set_token_registry(registry) -> None:
+    """
+    Make ``get_token_info`` look tokens up in ``registry`` (``token_registry.TokenRegistry``)
+    before calling the API. ``None`` disables the lookup.
+    """
+    global _token_registry
+    _token_registry = registry
+
+
+def _registry_token_info(token_address: str) -> dict | None:
+    if _token_registry is None:
+        return None
+    return _token_registry.get(token_address)
+
+
+def get_token_info(token_address: str) -> dict | None:
+    """
+    Returns info about token, like decimals, symbol, logo and the like (works with pump.fun tokens).
+    Every call returns a new dict, callers may modify it.\n
+    Docs: https://station.jup.ag/docs/token-list/token-list-api
+    """
+
+    info = _registry_token_info(token_address)
+    if info is None:
+        info = get_token_cache().get_or_load('token_info', token_address, lambda: _load_token_info(token_address))
+    return copy.deepcopy(info)
+
+
+async def get_token_info_async(token_address: str) -> dict | None:
+    """
+    Async version of ``get_token_info``.
+    """
+
+    info = _registry_token_info(token_address)
+    if info is None:
+        info = await get_token_cache().get_or_load_async(
+            'token_info', token_address, lambda: _load_token_info_async(token_address)
+        )
+    return copy.deepcopy(info)
@@ -1,12 +1,19 @@
 import base64
+import copy
 import json
+import os
 import struct
+from concurrent.futures import ProcessPoolExecutor
 from enum import IntEnum
+from typing import TYPE_CHECKING
 
 import base58
-from construct import Bytes, Int8ul
-from construct import Struct as cStruct
-from solders.pubkey import Pubkey
+
+from .cache import LRUCache, cluster_id, get_mint_store, get_token_cache
+
+# solders and construct are imported by the functions using them.
+if TYPE_CHECKING:
+    from solders.pubkey import Pubkey
 
 MAX_NAME_LENGTH = 32
 MAX_SYMBOL_LENGTH = 10
@@ -20,21 +27,86 @@ class InstructionType(IntEnum):
     UPDATE_METADATA = 1
 
 
-METADATA_PROGRAM_ID = Pubkey.from_string('metaqbxxUerdq28cj1RbAWkYQm3ybzjb6a8bt518x1s')
+METADATA_PROGRAM_ADDRESS = 'metaqbxxUerdq28cj1RbAWkYQm3ybzjb6a8bt518x1s'
+_metadata_program_id = None
+
+
+def _program_id() -> 'Pubkey':
+    global _metadata_program_id
+    if _metadata_program_id is None:
+        from solders.pubkey import Pubkey
+        _metadata_program_id = Pubkey.from_string(METADATA_PROGRAM_ADDRESS)
+    return _metadata_program_id
+
+
+def __getattr__(name: str):
+    if name == 'METADATA_PROGRAM_ID':
+        return _program_id()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+# Derived addresses never change, so they are kept in a bounded LRU cache keyed by (mint, seed kind).
+pda_cache = LRUCache(maxsize=65536)
+
+# Batches with at least this many uncached mints are derived in a process pool by ``derive_metadata_accounts``.
+PROCESS_POOL_THRESHOLD = 20000
+
+
+def _find_pda(mint_key: str, kind: str) -> 'Pubkey':
+    from solders.pubkey import Pubkey
+    program_id = _program_id()
+    seeds = [b'metadata', bytes(program_id), bytes(Pubkey.from_string(mint_key))]
+    if kind == 'edition':
+        seeds.append(b"edition")
+    return Pubkey.find_program_address(seeds, program_id)[0]
+
+
+def _cached_pda(mint_key: str, kind: str) -> 'Pubkey':
+    key = (mint_key, kind)
+    pda = pda_cache.get(key)
+    if pda is None:
+        pda = _find_pda(mint_key, kind)
+        pda_cache.set(key, pda)
+    return pda
 
 
 def get_metadata_account(mint_key):
-    return Pubkey.find_program_address(
-        [b'metadata', bytes(METADATA_PROGRAM_ID), bytes(Pubkey.from_string(mint_key))],
-        METADATA_PROGRAM_ID
-    )[0]
+    return _cached_pda(mint_key, 'metadata')
 
 
 def get_edition(mint_key):
-    return Pubkey.find_program_address(
-        [b'metadata', bytes(METADATA_PROGRAM_ID), bytes(Pubkey.from_string(mint_key)), b"edition"],
-        METADATA_PROGRAM_ID
-    )[0]
+    return _cached_pda(mint_key, 'edition')
+
+
+def _find_metadata_accounts(mints: list[str]) -> list['Pubkey']:
+    return [_find_pda(mint, 'metadata') for mint in mints]
+
+
+def derive_metadata_accounts(mints: list[str], processes: int = None) -> list['Pubkey']:
+    """
+    Returns metadata accounts for all ``mints`` (in the same order). Uncached addresses are derived
+    in a process pool when there are at least ``PROCESS_POOL_THRESHOLD`` of them.
+
+    :param processes: number of worker processes (``None`` - CPU count, ``0`` - never use a pool)
+    """
+    result = [pda_cache.get((mint, 'metadata')) for mint in mints]
+    missing = list(dict.fromkeys(mint for mint, pda in zip(mints, result) if pda is None))
+    if not missing:
+        return result
+
+    if processes != 0 and len(missing) >= PROCESS_POOL_THRESHOLD:
+        workers = processes or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            size = -(-len(missing) // (workers * 4))
+            chunks = [missing[i:i + size] for i in range(0, len(missing), size)]
+            derived = [pda for chunk in executor.map(_find_metadata_accounts, chunks) for pda in chunk]
+    else:
+        derived = _find_metadata_accounts(missing)
+
+    derived = dict(zip(missing, derived))
+    for mint, pda in derived.items():
+        pda_cache.set((mint, 'metadata'), pda)
+    return [derived[mint] if pda is None else pda for mint, pda in zip(mints, result)]
 
 
 def _get_data_buffer(name, symbol, uri, fee, creators, verified=None, share=None):
@@ -79,73 +151,171 @@ def _get_data_buffer(name, symbol, uri, fee, creators, verified=None, share=None
     return buffer
 
 
-def unpack_metadata_account(data):
-    assert (data[0] == 4)
-    i = 1
-    source_account = base58.b58encode(bytes(struct.unpack('<' + "B" * 32, data[i:i + 32])))
-    i += 32
-    mint_account = base58.b58encode(bytes(struct.unpack('<' + "B" * 32, data[i:i + 32])))
-    i += 32
-    name_len = struct.unpack('<I', data[i:i + 4])[0]
-    i += 4
-    name = struct.unpack('<' + "B" * name_len, data[i:i + name_len])
-    i += name_len
-    symbol_len = struct.unpack('<I', data[i:i + 4])[0]
-    i += 4
-    symbol = struct.unpack('<' + "B" * symbol_len, data[i:i + symbol_len])
-    i += symbol_len
-    uri_len = struct.unpack('<I', data[i:i + 4])[0]
+_U32 = struct.Struct('<I')
+_I16 = struct.Struct('<h')
+
+
+def _b58(raw: bytes) -> str:
+    # solders' native encoder is several times faster than the pure-Python ``base58`` package.
+    from solders.pubkey import Pubkey
+    return str(Pubkey.from_bytes(raw))
+
+
+class Metadata:
+    """
+    Decoded Metaplex metadata account. Public keys are kept as raw bytes and
+    encoded to base58 only when accessed.
+    """
+    __slots__ = (
+        '_update_authority', '_mint', 'name', 'symbol', 'uri', 'seller_fee_basis_points',
+        '_creators', 'verified', 'share', 'primary_sale_happened', 'is_mutable',
+    )
+
+    def __init__(self, update_authority, mint, name, symbol, uri, seller_fee_basis_points,
+                 creators, verified, share, primary_sale_happened, is_mutable):
+        self._update_authority = update_authority
+        self._mint = mint
+        self.name = name
+        self.symbol = symbol
+        self.uri = uri
+        self.seller_fee_basis_points = seller_fee_basis_points
+        self._creators = creators
+        self.verified = verified
+        self.share = share
+        self.primary_sale_happened = primary_sale_happened
+        self.is_mutable = is_mutable
+
+    @property
+    def update_authority(self) -> str:
+        return _b58(self._update_authority)
+
+    @property
+    def mint(self) -> str:
+        return _b58(self._mint)
+
+    @property
+    def creators(self) -> list[str]:
+        return [_b58(creator) for creator in self._creators]
+
+    def to_dict(self) -> dict:
+        """
+        Returns metadata in the ``unpack_metadata_account`` format.
+        """
+        return {
+            "update_authority": _b58(self._update_authority).encode(),
+            "mint": _b58(self._mint).encode(),
+            "data": {
+                "name": self.name,
+                "symbol": self.symbol,
+                "uri": self.uri,
+                "seller_fee_basis_points": self.seller_fee_basis_points,
+                "creators": [_b58(creator).encode() for creator in self._creators],
+                "verified": self.verified,
+                "share": self.share,
+            },
+            "primary_sale_happened": self.primary_sale_happened,
+            "is_mutable": self.is_mutable,
+        }
+
+    def __repr__(self) -> str:
+        return f'Metadata(mint={self.mint!r}, name={self.name!r}, symbol={self.symbol!r})'
+
+
+def _read_string(view: memoryview, i: int) -> tuple[str, int]:
+    length = _U32.unpack_from(view, i)[0]
     i += 4
-    uri = struct.unpack('<' + "B" * uri_len, data[i:i + uri_len])
-    i += uri_len
-    fee = struct.unpack('<h', data[i:i + 2])[0]
+    return str(view[i:i + length], 'utf-8').strip('\x00'), i + length
+
+
+def decode_metadata(data) -> Metadata:
+    """
+    Decode raw metadata account data (``bytes``, ``bytearray`` or ``memoryview``) without copying it field by field.
+    """
+    view = memoryview(data)
+    assert (view[0] == 4)
+    update_authority = bytes(view[1:33])
+    mint = bytes(view[33:65])
+    name, i = _read_string(view, 65)
+    symbol, i = _read_string(view, i)
+    uri, i = _read_string(view, i)
+    fee = _I16.unpack_from(view, i)[0]
     i += 2
-    has_creator = data[i]
+    has_creator = view[i]
     i += 1
     creators = []
     verified = []
     share = []
     if has_creator:
-        creator_len = struct.unpack('<I', data[i:i + 4])[0]
+        creator_len = _U32.unpack_from(view, i)[0]
         i += 4
         for _ in range(creator_len):
-            creator = base58.b58encode(bytes(struct.unpack('<' + "B" * 32, data[i:i + 32])))
-            creators.append(creator)
-            i += 32
-            verified.append(data[i])
-            i += 1
-            share.append(data[i])
-            i += 1
-    primary_sale_happened = bool(data[i])
-    i += 1
-    is_mutable = bool(data[i])
-    metadata = {
-        "update_authority": source_account,
-        "mint": mint_account,
-        "data": {
-            "name": bytes(name).decode("utf-8").strip("\x00"),
-            "symbol": bytes(symbol).decode("utf-8").strip("\x00"),
-            "uri": bytes(uri).decode("utf-8").strip("\x00"),
-            "seller_fee_basis_points": fee,
-            "creators": creators,
-            "verified": verified,
-            "share": share,
-        },
-        "primary_sale_happened": primary_sale_happened,
-        "is_mutable": is_mutable,
-    }
-    return metadata
+            creators.append(bytes(view[i:i + 32]))
+            verified.append(view[i + 32])
+            share.append(view[i + 33])
+            i += 34
+    primary_sale_happened = bool(view[i])
+    is_mutable = bool(view[i + 1])
+    return Metadata(update_authority, mint, name, symbol, uri, fee, creators, verified, share,
+                    primary_sale_happened, is_mutable)
 
 
-def get_metadata(client, mint_key) -> dict:
+def decode_metadata_many(buffers: list) -> list[Metadata | None]:
+    """
+    Decode a list of raw metadata accounts. ``None`` items (missing accounts) are kept as ``None``.
+    """
+    return [None if data is None else decode_metadata(data) for data in buffers]
+
+
+def unpack_metadata_account(data):
+    """
+    Decode raw metadata account data into the legacy dict format (base58 keys as ``bytes``).
+    Prefer ``decode_metadata``, which skips base58 encoding of keys that are never read.
+    """
+    return decode_metadata(data).to_dict()
+
+
+def _load_metadata(client, mint_key, cluster: str) -> dict | None:
+    store = get_mint_store()
+    if store is not None:
+        data = store.get_metadata(str(mint_key), cluster)
+        if data is not None:
+            return unpack_metadata_account(data)
     metadata_account = get_metadata_account(mint_key)
-    data = json.loads(client.get_account_info(metadata_account).to_json())['result']['value']['data'][0]
-    data = base64.b64decode(data)
-    metadata = unpack_metadata_account(data)
-    return metadata
+    value = json.loads(client.get_account_info(metadata_account).to_json())['result']['value']
+    if value is None:
+        return None
+    data = base64.b64decode(value['data'][0])
+    metadata = decode_metadata(data)
+    trusted = value['owner'] == METADATA_PROGRAM_ADDRESS and metadata.mint == str(mint_key)
+    if store is not None and trusted and not metadata.is_mutable:
+        # Immutable metadata never changes, so it is kept across restarts.
+        store.put_metadata(str(mint_key), data, cluster)
+    return metadata.to_dict()
+
+
+def _client_cluster(client) -> str:
+    cluster = getattr(client, 'cluster', None)
+    return cluster if cluster is not None else cluster_id(client._provider.endpoint_uri)
+
+
+def get_metadata(client, mint_key) -> dict:
+    """
+    Returns decoded metadata of ``mint_key``, read with ``client`` (``solana.rpc.api.Client``).
+    Every call returns a new dict, callers may modify it.
+    """
+    cluster = _client_cluster(client)
+    metadata = get_token_cache().get_or_load(
+        'metadata', mint_key, lambda: _load_metadata(client, mint_key, cluster), cluster
+    )
+    if metadata is None:
+        raise Exception(f'metadata.get_metadata error: no metadata account for {mint_key}')
+    return copy.deepcopy(metadata)
 
 
 def update_metadata_instruction_data(name, symbol, uri, fee, creators, verified, share):
+    from construct import Bytes, Int8ul
+    from construct import Struct as cStruct
+
     _data = bytes([1]) + _get_data_buffer(name, symbol, uri, fee, creators, verified, share) + bytes([0, 0])
     instruction_layout = cStruct(
         "instruction_type" / Int8ul,
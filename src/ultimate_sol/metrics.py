@@ -0,0 +1,306 @@
+import contextvars
+import threading
+
+# Sinks receiving a ``CallRecord`` for every outbound call. Nothing is measured while it is empty.
+_sinks = ()
+_sinks_lock = threading.Lock()
+
+# Attempt number of the call in flight, set by ``EndpointPool`` when it retries on another endpoint.
+_retries = contextvars.ContextVar('ultimate_sol_retries', default=0)
+
+
+class CallRecord:
+    """
+    One outbound call (or cache hit, with ``cache_hit=True`` and ``upstream="cache"``).
+
+    ``endpoint`` is ``scheme://host[:port]`` only, so API keys in paths or queries never reach sinks.
+    ``method`` is the JSON-RPC method for RPC calls and ``"<HTTP method> <path>"`` for other APIs.
+    ``duration`` is in seconds, until the response body was read, ``status`` is None for transport errors.
+    """
+    __slots__ = ('upstream', 'endpoint', 'method', 'duration', 'bytes_sent', 'bytes_received', 'status',
+                 'retries', 'cache_hit', 'error')
+
+    def __init__(
+            self,
+            upstream: str,
+            endpoint: str | None,
+            method: str,
+            duration: float = 0.0,
+            bytes_sent: int = 0,
+            bytes_received: int = 0,
+            status: int | None = None,
+            retries: int = 0,
+            cache_hit: bool = False,
+            error: str | None = None,
+    ):
+        self.upstream = upstream
+        self.endpoint = endpoint
+        self.method = method
+        self.duration = duration
+        self.bytes_sent = bytes_sent
+        self.bytes_received = bytes_received
+        self.status = status
+        self.retries = retries
+        self.cache_hit = cache_hit
+        self.error = error
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        return f'CallRecord({self.upstream}, {self.method}, {self.duration * 1000:.2f} ms, status={self.status})'
+
+
+def add_sink(sink) -> None:
+    """
+    Start sending records to ``sink`` - any callable taking a ``CallRecord``
+    (e.g. ``HistogramSink()``, ``PrometheusSink()`` or your own function).
+    """
+    global _sinks
+    with _sinks_lock:
+        _sinks = _sinks + (sink,)
+
+
+def remove_sink(sink) -> None:
+    global _sinks
+    with _sinks_lock:
+        # Equality, not identity: every ``obj.method`` lookup creates a new bound method.
+        _sinks = tuple(s for s in _sinks if s != sink)
+
+
+def clear_sinks() -> None:
+    global _sinks
+    with _sinks_lock:
+        _sinks = ()
+
+
+def enabled() -> bool:
+    return bool(_sinks)
+
+
+def emit(record: CallRecord) -> None:
+    for sink in _sinks:
+        try:
+            sink(record)
+        except Exception:
+            # A broken sink must never break the call it measures.
+            pass
+
+
+def record_cache_hit(kind: str) -> None:
+    if _sinks:
+        emit(CallRecord('cache', None, kind, cache_hit=True))
+
+
+def get_retries() -> int:
+    return _retries.get()
+
+
+def set_retries(retries: int) -> contextvars.Token:
+    return _retries.set(retries)
+
+
+def reset_retries(token: contextvars.Token) -> None:
+    _retries.reset(token)
+
+
+def __getattr__(name: str):
+    # The transports need httpx, which is imported only when they are used.
+    if name in ('InstrumentedTransport', 'AsyncInstrumentedTransport'):
+        from . import transport
+        return getattr(transport, name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+class Histogram:
+    """
+    HDR-style log-linear histogram of durations: values are kept in microsecond buckets whose width grows
+    with the value, so percentiles have a relative error below ``2 ** -precision`` in constant memory.
+    """
+
+    def __init__(self, precision: int = 7):
+        self.precision = precision
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self._buckets = {}
+
+    def _bucket(self, micros: int) -> int:
+        shift = max(micros.bit_length() - self.precision, 0)
+        return (micros >> shift) << shift
+
+    def record(self, seconds: float) -> None:
+        bucket = self._bucket(int(seconds * 1e6))
+        self._buckets[bucket] = self._buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if self.max is None or seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q: float) -> float | None:
+        """
+        Returns the ``q`` (0-1) quantile in seconds.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bucket in sorted(self._buckets):
+            seen += self._buckets[bucket]
+            if seen >= rank:
+                width = 1 << max(bucket.bit_length() - self.precision, 0)
+                return min(max((bucket + width / 2) / 1e6, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float | None:
+        return self.total / self.count if self.count else None
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99),
+            "p999": self.percentile(0.999),
+        }
+
+
+class HistogramSink:
+    """
+    Aggregates records into a latency ``Histogram`` and byte/error counters per (upstream, method).
+    """
+
+    def __init__(self, precision: int = 7):
+        self.precision = precision
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, record: CallRecord) -> None:
+        key = (record.upstream, record.method)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {
+                    "histogram": Histogram(self.precision),
+                    "errors": 0, "retries": 0, "cache_hits": 0, "bytes_sent": 0, "bytes_received": 0,
+                }
+            if record.cache_hit:
+                series["cache_hits"] += 1
+                return
+            series["histogram"].record(record.duration)
+            series["bytes_sent"] += record.bytes_sent
+            series["bytes_received"] += record.bytes_received
+            series["retries"] += record.retries
+            if record.status is None or record.status >= 400:
+                series["errors"] += 1
+
+    def histogram(self, upstream: str, method: str) -> Histogram | None:
+        series = self._series.get((upstream, method))
+        return series["histogram"] if series else None
+
+    def summary(self) -> dict:
+        """
+        Returns ``{"<upstream> <method>": {count, mean, p50, p99, ..., errors, bytes_received, ...}}``.
+        """
+        with self._lock:
+            res = {}
+            for (upstream, method), series in sorted(self._series.items()):
+                row = series["histogram"].to_dict()
+                row.update({k: v for k, v in series.items() if k != "histogram"})
+                res[f'{upstream} {method}'] = row
+            return res
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+def _label_value(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(**labels) -> str:
+    return '{' + ','.join(f'{k}="{_label_value(v)}"' for k, v in labels.items()) + '}'
+
+
+class PrometheusSink:
+    """
+    Keeps Prometheus counters and a duration histogram, ``exposition()`` returns them in the text format.
+    """
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, prefix: str = 'ultimate_sol', buckets: tuple = DEFAULT_BUCKETS):
+        self.prefix = prefix
+        self.buckets = tuple(sorted(buckets))
+        self._requests = {}
+        self._durations = {}
+        self._bytes = {}
+        self._retries = {}
+        self._cache_hits = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, record: CallRecord) -> None:
+        with self._lock:
+            if record.cache_hit:
+                self._cache_hits[record.method] = self._cache_hits.get(record.method, 0) + 1
+                return
+            key = (record.upstream, record.method)
+            status = record.status if record.status is not None else (record.error or 'error')
+            self._requests[key + (status,)] = self._requests.get(key + (status,), 0) + 1
+            histogram = self._durations.get(key)
+            if histogram is None:
+                histogram = self._durations[key] = [[0] * len(self.buckets), 0, 0.0]
+            for i, bound in enumerate(self.buckets):
+                if record.duration <= bound:
+                    histogram[0][i] += 1
+            histogram[1] += 1
+            histogram[2] += record.duration
+            sent, received = self._bytes.get(key, (0, 0))
+            self._bytes[key] = (sent + record.bytes_sent, received + record.bytes_received)
+            if record.retries:
+                self._retries[key] = self._retries.get(key, 0) + 1
+
+    def exposition(self) -> str:
+        p = self.prefix
+        lines = []
+        with self._lock:
+            lines.append(f'# HELP {p}_requests_total Outbound requests by upstream, method and status.')
+            lines.append(f'# TYPE {p}_requests_total counter')
+            for (upstream, method, status), value in sorted(self._requests.items(), key=str):
+                lines.append(f'{p}_requests_total{_labels(upstream=upstream, method=method, status=status)} {value}')
+
+            lines.append(f'# HELP {p}_request_duration_seconds Outbound request duration.')
+            lines.append(f'# TYPE {p}_request_duration_seconds histogram')
+            for (upstream, method), (counts, count, total) in sorted(self._durations.items()):
+                for bound, value in zip(self.buckets, counts):
+                    labels = _labels(upstream=upstream, method=method, le=bound)
+                    lines.append(f'{p}_request_duration_seconds_bucket{labels} {value}')
+                labels = _labels(upstream=upstream, method=method, le='+Inf')
+                lines.append(f'{p}_request_duration_seconds_bucket{labels} {count}')
+                labels = _labels(upstream=upstream, method=method)
+                lines.append(f'{p}_request_duration_seconds_sum{labels} {total}')
+                lines.append(f'{p}_request_duration_seconds_count{labels} {count}')
+
+            for name, index in (('sent', 0), ('received', 1)):
+                lines.append(f'# HELP {p}_bytes_{name}_total Bytes {name} by upstream and method.')
+                lines.append(f'# TYPE {p}_bytes_{name}_total counter')
+                for (upstream, method), values in sorted(self._bytes.items()):
+                    lines.append(f'{p}_bytes_{name}_total{_labels(upstream=upstream, method=method)} {values[index]}')
+
+            lines.append(f'# HELP {p}_retries_total Requests sent to another endpoint after a failure.')
+            lines.append(f'# TYPE {p}_retries_total counter')
+            for (upstream, method), value in sorted(self._retries.items()):
+                lines.append(f'{p}_retries_total{_labels(upstream=upstream, method=method)} {value}')
+
+            lines.append(f'# HELP {p}_cache_hits_total Token cache hits by kind.')
+            lines.append(f'# TYPE {p}_cache_hits_total counter')
+            for kind, value in sorted(self._cache_hits.items()):
+                lines.append(f'{p}_cache_hits_total{_labels(kind=kind)} {value}')
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,182 @@
+import os
+import sqlite3
+import threading
+
+from .cache import get_token_cache
+
+# Facts are kept per cluster (``SolClient.cluster``): one mint address can hold different accounts on each.
+# Version 0 keyed them by mint only and could hold bytes of accounts which aren't mints, it is dropped.
+SCHEMA_VERSION = 1
+
+# Marks files created by the store ("MINT"), only those are ever migrated.
+APPLICATION_ID = 0x4d494e54
+
+# Columns of the tables written before files were marked with ``APPLICATION_ID``, by schema version.
+# An unmarked file is adopted only if it holds nothing else.
+_UNMARKED_LAYOUTS = {
+    0: {'decimals': ['mint', 'decimals'], 'metadata': ['mint', 'data']},
+    1: {'decimals': ['cluster', 'mint', 'decimals'], 'metadata': ['cluster', 'mint', 'data']},
+}
+_TABLES = (
+    'CREATE TABLE IF NOT EXISTS decimals (cluster TEXT NOT NULL, mint TEXT NOT NULL, decimals INTEGER NOT NULL, '
+    'PRIMARY KEY (cluster, mint)) WITHOUT ROWID',
+    'CREATE TABLE IF NOT EXISTS metadata (cluster TEXT NOT NULL, mint TEXT NOT NULL, data BLOB NOT NULL, '
+    'PRIMARY KEY (cluster, mint)) WITHOUT ROWID',
+)
+
+# Mints per ``IN (...)`` query, below the default SQLite limit of bound parameters.
+_QUERY_SIZE = 500
+
+
+class MintStore:
+    """
+    On-disk store of facts about mints which never change: decimals and raw Metaplex metadata accounts
+    with ``is_mutable == False``. Enable it with ``cache.set_mint_store(MintStore(path))`` and
+    ``SolClient.get_token_decimals`` / ``metadata.get_metadata`` will read it before calling the RPC
+    and record what they fetch, under the ``cluster`` of the client.
+
+    The database is in WAL mode, so several processes on one host can read it while one of them writes;
+    facts are inserted with ``INSERT OR IGNORE`` since every writer stores the same values.
+    """
+
+    def __init__(self, path: str, timeout: float = 30):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        connection = self._connection()
+        try:
+            with connection:
+                connection.execute('BEGIN IMMEDIATE')
+                self._migrate(connection)
+        except Exception:
+            self.close()
+            raise
+        connection.execute('PRAGMA journal_mode=WAL')
+
+    def _migrate(self, connection: sqlite3.Connection) -> None:
+        version = connection.execute('PRAGMA user_version').fetchone()[0]
+        if connection.execute('PRAGMA application_id').fetchone()[0] != APPLICATION_ID:
+            objects = connection.execute("SELECT name, type FROM sqlite_master WHERE name NOT LIKE 'sqlite_%'")
+            objects = objects.fetchall()
+            layout = _UNMARKED_LAYOUTS.get(version, {})
+            if any(kind != 'table' or layout.get(name) != self._columns(connection, name) for name, kind in objects):
+                raise Exception(f'mint_store.MintStore error: {self.path} is not a mint store database')
+            connection.execute(f'PRAGMA application_id = {APPLICATION_ID}')
+        if version < SCHEMA_VERSION:
+            connection.execute('DROP TABLE IF EXISTS decimals')
+            connection.execute('DROP TABLE IF EXISTS metadata')
+            connection.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        for table in _TABLES:
+            connection.execute(table)
+
+    @staticmethod
+    def _columns(connection: sqlite3.Connection, table: str) -> list[str]:
+        return [row[1] for row in connection.execute('SELECT * FROM pragma_table_info(?)', (table,))]
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread, and a new one in a forked child.
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.timeout)
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _select_many(self, table: str, column: str, mints: list[str], cluster: str) -> dict:
+        connection = self._connection()
+        result = {}
+        mints = list(dict.fromkeys(mints))
+        for i in range(0, len(mints), _QUERY_SIZE):
+            chunk = mints[i:i + _QUERY_SIZE]
+            rows = connection.execute(
+                f'SELECT mint, {column} FROM {table} WHERE cluster = ? AND mint IN ({",".join("?" * len(chunk))})',
+                [cluster, *chunk],
+            )
+            result.update(rows)
+        return result
+
+    def get_decimals(self, mint: str, cluster: str) -> int | None:
+        row = self._connection().execute(
+            'SELECT decimals FROM decimals WHERE cluster = ? AND mint = ?', (cluster, mint)
+        ).fetchone()
+        return row[0] if row else None
+
+    def get_decimals_many(self, mints: list[str], cluster: str) -> dict:
+        """
+        Returns ``{<mint>: <decimals>}`` for the mints stored for ``cluster``.
+        """
+        return self._select_many('decimals', 'decimals', mints, cluster)
+
+    def put_decimals(self, decimals: dict, cluster: str) -> None:
+        """
+        Store ``{<mint>: <decimals>}`` read from mint accounts of ``cluster``.
+        """
+        if decimals:
+            with self._connection() as connection:
+                connection.executemany('INSERT OR IGNORE INTO decimals (cluster, mint, decimals) VALUES (?, ?, ?)',
+                                       [(cluster, mint, value) for mint, value in decimals.items()])
+
+    def get_metadata(self, mint: str, cluster: str) -> bytes | None:
+        """
+        Returns the raw metadata account of ``mint`` (decode it with ``metadata.unpack_metadata_account``).
+        """
+        row = self._connection().execute(
+            'SELECT data FROM metadata WHERE cluster = ? AND mint = ?', (cluster, mint)
+        ).fetchone()
+        return row[0] if row else None
+
+    def get_metadata_many(self, mints: list[str], cluster: str) -> dict:
+        return self._select_many('metadata', 'data', mints, cluster)
+
+    def put_metadata(self, mint: str, data: bytes, cluster: str) -> None:
+        """
+        Store the raw metadata account of ``mint`` on ``cluster``. Only immutable metadata should be stored.
+        """
+        with self._connection() as connection:
+            connection.execute('INSERT OR IGNORE INTO metadata (cluster, mint, data) VALUES (?, ?, ?)',
+                               (cluster, mint, bytes(data)))
+
+    def preload(self, mints: list[str], client=None, cluster: str = None) -> dict:
+        """
+        Load stored facts about ``mints`` on ``cluster`` (``client.cluster`` by default) into the token cache,
+        e.g. at startup. With ``client`` (``SolClient``) decimals missing on disk are fetched in batches and stored.
+
+        :return: {"decimals": <loaded from disk>, "metadata": <loaded from disk>, "fetched": <fetched decimals>}
+        """
+        from .metadata import unpack_metadata_account
+
+        if cluster is None:
+            if client is None:
+                raise ValueError('MintStore.preload needs a client or a cluster')
+            cluster = client.cluster
+        cache = get_token_cache()
+        decimals = self.get_decimals_many(mints, cluster)
+        for mint, value in decimals.items():
+            cache.store('decimals', mint, value, cluster)
+        metadata = self.get_metadata_many(mints, cluster)
+        for mint, data in metadata.items():
+            cache.store('metadata', mint, unpack_metadata_account(data), cluster)
+
+        fetched = 0
+        missing = [mint for mint in dict.fromkeys(mints) if mint not in decimals]
+        if client is not None and missing:
+            loaded = client.get_token_decimals_many(missing)
+            fetched = sum(1 for value in loaded if not isinstance(value, Exception))
+        return {"decimals": len(decimals), "metadata": len(metadata), "fetched": fetched}
+
+    def stats(self) -> dict:
+        connection = self._connection()
+        return {
+            "decimals": connection.execute('SELECT COUNT(*) FROM decimals').fetchone()[0],
+            "metadata": connection.execute('SELECT COUNT(*) FROM metadata').fetchone()[0],
+        }
+
+    def close(self) -> None:
+        """
+        Close the connection of the calling thread.
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
@@ -0,0 +1,52 @@
+from typing import Tuple
+
+import httpx
+from solana.rpc.providers.async_http import AsyncHTTPProvider
+from solana.rpc.providers.core import _after_request_unparsed, _HTTPProviderCore
+from solana.rpc.providers.http import HTTPProvider
+from solders.rpc.requests import Body
+
+from .http_client import DEFAULT_TIMEOUT, get_async_client, get_client
+
+
+class PooledHTTPProvider(HTTPProvider):
+    """
+    ``solana`` HTTP provider that sends requests through the shared ``httpx.Client``
+    instead of opening a new connection for every call.
+    """
+
+    def make_request_unparsed(self, body: Body) -> str:
+        request_kwargs = self._before_request(body=body)
+        raw_response = get_client().post(**request_kwargs)
+        return _after_request_unparsed(raw_response)
+
+    def make_batch_request_unparsed(self, reqs: Tuple[Body, ...]) -> str:
+        request_kwargs = self._before_batch_request(reqs)
+        raw_response = get_client().post(**request_kwargs)
+        return _after_request_unparsed(raw_response)
+
+    def is_connected(self) -> bool:
+        try:
+            response = get_client().get(self.health_uri)
+            response.raise_for_status()
+        except (IOError, httpx.HTTPError) as err:
+            self.logger.error("Health check failed with error: %s", str(err))
+            return False
+        return response.status_code == httpx.codes.OK
+
+
+class AsyncPooledHTTPProvider(AsyncHTTPProvider):
+    """
+    ``solana`` async HTTP provider that sends requests through the shared ``httpx.AsyncClient``.
+    """
+
+    def __init__(self, endpoint: str = None, extra_headers: dict = None, timeout: float = DEFAULT_TIMEOUT):
+        _HTTPProviderCore.__init__(self, endpoint, extra_headers, timeout)
+
+    @property
+    def session(self) -> httpx.AsyncClient:
+        return get_async_client()
+
+    async def close(self) -> None:
+        # The session is shared between providers, use ``http_client.aclose()`` to close it.
+        pass
@@ -0,0 +1,304 @@
+import asyncio
+import contextlib
+import contextvars
+import heapq
+import itertools
+import random
+import threading
+import time
+
+# Priority classes, lower is served first when requests to a host have to wait.
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+# Requests per second and burst for APIs with published limits. Other third-party API hosts are not limited
+# until they answer HTTP 429, then they are held for ``Retry-After`` seconds.
+# DexScreener allows 300 requests per minute on its pair and token endpoints.
+DEFAULT_RATE_LIMITS = {
+    "api.dexscreener.com": (5.0, 5),
+}
+
+# Jupiter counts requests of a client across its APIs, so its hosts share one budget.
+BUDGET_GROUPS = {
+    host: 'jup.ag'
+    for host in ('jup.ag', 'quote-api.jup.ag', 'price.jup.ag', 'token.jup.ag', 'tokens.jup.ag', 'stats.jup.ag')
+}
+
+# Third-party APIs (and their subdomains) which get a limiter without a configured rate. Solana RPC endpoints
+# get one only from ``set_rate_limit``: ``rpc_pool.EndpointPool`` already moves calls off an endpoint
+# answering 429, holding the whole host here would also stall sends routed to it.
+API_DOMAINS = ('jup.ag', 'dexscreener.com', 'solana.fm')
+
+# Background lookups (prices, profiles, token lists) which wait behind swaps, sends and quotes.
+LOW_PRIORITY_HOSTS = ('price.jup.ag', 'token.jup.ag', 'tokens.jup.ag', 'stats.jup.ag', 'api.dexscreener.com',
+                      'api.solana.fm')
+
+# Idempotent requests are retried on these statuses and on connection errors.
+RETRY_METHODS = ('GET', 'HEAD', 'OPTIONS')
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_settings = {
+    "max_retries": 3,
+    "backoff": 0.25,
+    "max_backoff": 8.0,
+    "max_hold": 30.0,
+    # Share of the configured rate regained after every successful response once a 429 has lowered it.
+    "recovery": 0.05,
+}
+_rates = dict(DEFAULT_RATE_LIMITS)
+_limiters = {}
+_limiters_lock = threading.Lock()
+_priority = contextvars.ContextVar('ultimate_sol_priority', default=None)
+
+
+class _Waiter:
+    __slots__ = ('wake', 'granted', 'cancelled')
+
+    def __init__(self, wake):
+        self.wake = wake
+        self.granted = False
+        self.cancelled = False
+
+
+def _set_done(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class HostLimiter:
+    """
+    Thread-safe limiter of one host shared by sync and async callers: a token bucket of ``rate``
+    requests per second with bursts of up to ``burst`` (``rate=None`` - not limited) which serves
+    waiting requests in priority order.
+
+    It adapts to the server: HTTP 429 halves the rate (down to ``min_rate``) and holds every request
+    until ``Retry-After``, successful responses then raise it back to ``rate`` step by step.
+    """
+
+    def __init__(self, rate: float | None = None, burst: int = 1, min_rate: float = 0.2, clock=time.monotonic):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.rate_limited = 0
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._hold_until = 0.0
+        self._slowed_at = float('-inf')
+        self._waiters = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        if self.rate is not None:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _take(self, now: float) -> bool:
+        # Takes a token for a request which doesn't have to queue.
+        self._refill(now)
+        if self._waiters or now < self._hold_until:
+            return False
+        if self.rate is not None:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+        return True
+
+    def _dispatch(self) -> float:
+        # Grants tokens to the waiters in priority order and returns seconds until the next token.
+        now = self._clock()
+        self._refill(now)
+        if now < self._hold_until:
+            return self._hold_until - now
+        while self._waiters:
+            waiter = self._waiters[0][2]
+            if waiter.cancelled:
+                heapq.heappop(self._waiters)
+                continue
+            if self.rate is not None:
+                if self._tokens < 1:
+                    return (1 - self._tokens) / self.rate
+                self._tokens -= 1
+            heapq.heappop(self._waiters)
+            waiter.granted = True
+            waiter.wake()
+        return 0.0
+
+    def _enqueue(self, priority: int, wake) -> _Waiter:
+        waiter = _Waiter(wake)
+        heapq.heappush(self._waiters, (priority, next(self._seq), waiter))
+        return waiter
+
+    def acquire(self, priority: int = PRIORITY_NORMAL) -> None:
+        with self._lock:
+            if self._take(self._clock()):
+                return
+            event = threading.Event()
+            waiter = self._enqueue(priority, event.set)
+        while True:
+            with self._lock:
+                delay = self._dispatch()
+                if waiter.granted:
+                    return
+            event.wait(max(delay, 0.001))
+
+    async def acquire_async(self, priority: int = PRIORITY_NORMAL) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._take(self._clock()):
+                return
+            future = loop.create_future()
+            waiter = self._enqueue(priority, lambda: loop.call_soon_threadsafe(_set_done, future))
+        try:
+            while True:
+                with self._lock:
+                    delay = self._dispatch()
+                    if waiter.granted:
+                        return
+                try:
+                    await asyncio.wait_for(asyncio.shield(future), max(delay, 0.001))
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            with self._lock:
+                waiter.cancelled = True
+            raise
+
+    def on_response(self, status: int, retry_after: float | None = None) -> None:
+        """
+        Adapt to a response of the host.
+        """
+        with self._lock:
+            now = self._clock()
+            if status == 429:
+                self.rate_limited += 1
+                # Responses to requests sent before the slow-down don't slow it down again.
+                if self.rate is not None and now - self._slowed_at >= 1 / self.rate:
+                    self._refill(now)
+                    self.rate = max(self.min_rate, self.rate / 2)
+                    self._slowed_at = now
+                    self._tokens = min(self._tokens, 0.0)
+                if retry_after is None:
+                    retry_after = 1 / self.rate if self.rate else 1.0
+                self._hold_until = max(self._hold_until, now + min(retry_after, _settings["max_hold"]))
+            elif status < 400 and self.rate is not None and self.rate < self.max_rate:
+                self._refill(now)
+                self.rate = min(self.max_rate, self.rate + self.max_rate * _settings["recovery"])
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "rate": self.rate,
+                "max_rate": self.max_rate,
+                "waiting": sum(1 for _, _, waiter in self._waiters if not waiter.cancelled),
+                "held_for": max(self._hold_until - self._clock(), 0.0),
+                "rate_limited": self.rate_limited,
+            }
+
+
+def _budget(host: str) -> str:
+    return BUDGET_GROUPS.get(host, host)
+
+
+def _api_host(host: str) -> bool:
+    return any(host == domain or host.endswith('.' + domain) for domain in API_DOMAINS)
+
+
+def host_limiter(host: str) -> HostLimiter | None:
+    """
+    Returns the limiter shared by all requests to ``host`` (and the hosts in its budget group),
+    None for hosts which are not limited (RPC endpoints without ``set_rate_limit``).
+    """
+    budget = _budget(host)
+    limiter = _limiters.get(budget)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(budget)
+            if limiter is None:
+                if budget not in _rates and not _api_host(host):
+                    return None
+                limiter = _limiters[budget] = HostLimiter(*_rates.get(budget, (None,)))
+    return limiter
+
+
+def set_rate_limit(host: str, rate: float | None, burst: int = 1) -> None:
+    """
+    Limit requests to ``host`` to ``rate`` per second (e.g. for a paid plan), ``None`` removes the limit.
+    For Jupiter hosts the limit applies to the whole ``jup.ag`` budget.
+    """
+    budget = _budget(host)
+    with _limiters_lock:
+        _rates.pop(budget, None)
+        _limiters.pop(budget, None)
+        if rate is not None:
+            _rates[budget] = (rate, burst)
+
+
+def configure(
+        max_retries: int = None,
+        backoff: float = None,
+        max_backoff: float = None,
+        max_hold: float = None,
+) -> None:
+    """
+    Configure retries of idempotent requests: up to ``max_retries`` attempts after the first one,
+    waiting a random time up to ``backoff * 2 ** attempt`` (capped at ``max_backoff``) or ``Retry-After``.
+    ``max_hold`` caps how long a rate-limited host is held.
+    """
+    for key, value in (('max_retries', max_retries), ('backoff', backoff), ('max_backoff', max_backoff),
+                       ('max_hold', max_hold)):
+        if value is not None:
+            _settings[key] = value
+
+
+def stats() -> dict:
+    """
+    Returns ``{<host or budget>: {"rate", "max_rate", "waiting", "held_for", "rate_limited"}}``.
+    """
+    return {budget: limiter.stats() for budget, limiter in list(_limiters.items())}
+
+
+@contextlib.contextmanager
+def priority(level: int):
+    """
+    Send the requests made inside the block with this priority, e.g. ``with priority(PRIORITY_LOW):``
+    around a background refresh. Executor threads don't inherit it.
+    """
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def request_priority(host: str, path: str, content: bytes = b'') -> int:
+    """
+    Priority class of a request: swaps, limit orders and sent transactions are high,
+    background lookups are low, everything else (quotes, RPC reads) is normal.
+    """
+    level = _priority.get()
+    if level is not None:
+        return level
+    if path.endswith('/swap') or path.startswith('/api/limit/') or b'"sendTransaction"' in content:
+        return PRIORITY_HIGH
+    if host in LOW_PRIORITY_HOSTS:
+        return PRIORITY_LOW
+    return PRIORITY_NORMAL
+
+
+def max_retries() -> int:
+    return _settings["max_retries"]
+
+
+def retry_delay(attempt: int, retry_after: float | None = None) -> float:
+    """
+    Seconds to wait before retry number ``attempt + 1``: full jitter exponential backoff,
+    at least ``Retry-After``.
+    """
+    delay = random.uniform(0, min(_settings["max_backoff"], _settings["backoff"] * 2 ** attempt))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, _settings["max_hold"]))
+    return delay
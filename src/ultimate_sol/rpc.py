@@ -0,0 +1,107 @@
+import itertools
+import threading
+
+from .http_client import get_async_client, get_client
+
+HEADERS = {"Content-Type": "application/json"}
+
+_ids = itertools.count(1)
+
+
+def _request_data(method: str, params: list = None) -> dict:
+    data = {"jsonrpc": "2.0", "id": next(_ids), "method": method}
+    if params is not None:
+        data["params"] = params
+    return data
+
+
+def rpc_request(endpoint: str, method: str, params: list = None) -> dict:
+    """
+    Send raw JSON-RPC request through the shared connection pool and return the decoded response.
+    """
+    response = get_client().post(endpoint, headers=HEADERS, json=_request_data(method, params))
+    response.raise_for_status()
+    return response.json()
+
+
+async def rpc_request_async(endpoint: str, method: str, params: list = None) -> dict:
+    """
+    Async version of ``rpc_request``.
+    """
+    response = await get_async_client().post(endpoint, headers=HEADERS, json=_request_data(method, params))
+    response.raise_for_status()
+    return response.json()
+
+
+def _batch_data(calls: list[tuple[str, list]]) -> list[dict]:
+    return [_request_data(method, params) for method, params in calls]
+
+
+def _parse_batch(data: list[dict], response) -> list[dict]:
+    if not isinstance(response, list):
+        raise Exception(f'rpc.rpc_batch error: {response}')
+    by_id = {item.get('id'): item for item in response}
+    return [by_id.get(request['id'], {"error": "no response"}) for request in data]
+
+
+def rpc_batch(endpoint: str, calls: list[tuple[str, list]]) -> list[dict]:
+    """
+    Send several JSON-RPC calls (``[(method, params), ...]``) in one HTTP request.
+    Responses are returned in the order of ``calls``.
+    """
+    data = _batch_data(calls)
+    response = get_client().post(endpoint, headers=HEADERS, json=data)
+    response.raise_for_status()
+    return _parse_batch(data, response.json())
+
+
+async def rpc_batch_async(endpoint: str, calls: list[tuple[str, list]]) -> list[dict]:
+    """
+    Async version of ``rpc_batch``.
+    """
+    data = _batch_data(calls)
+    response = await get_async_client().post(endpoint, headers=HEADERS, json=data)
+    response.raise_for_status()
+    return _parse_batch(data, response.json())
+
+
+class EndpointStats:
+    """
+    Counters and accept latency (in seconds) of transactions sent to one endpoint.
+    """
+
+    def __init__(self):
+        self.sent = 0
+        self.accepted = 0
+        self.errors = 0
+        self.total_latency = 0.0
+        self.last_latency = None
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, accepted: bool) -> None:
+        with self._lock:
+            self.sent += 1
+            if accepted:
+                self.accepted += 1
+                self.total_latency += latency
+                self.last_latency = latency
+            else:
+                self.errors += 1
+
+    @property
+    def avg_latency(self) -> float | None:
+        if not self.accepted:
+            return None
+        return self.total_latency / self.accepted
+
+    def to_dict(self) -> dict:
+        return {
+            "sent": self.sent,
+            "accepted": self.accepted,
+            "errors": self.errors,
+            "avg_latency": self.avg_latency,
+            "last_latency": self.last_latency,
+        }
+
+    def __repr__(self) -> str:
+        return f'EndpointStats({self.to_dict()})'
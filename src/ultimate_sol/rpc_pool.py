@@ -0,0 +1,276 @@
+import asyncio
+import email.utils
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from . import metrics
+from .rpc import rpc_request
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+
+def _http_error(exc: BaseException) -> 'httpx.HTTPError | None':
+    # solana-py wraps httpx errors into SolanaRpcException, so look through the whole cause chain.
+    import httpx
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        if isinstance(exc, httpx.HTTPError):
+            return exc
+        seen.add(id(exc))
+        exc = exc.__cause__ or exc.__context__
+    return None
+
+
+def parse_retry_after(value: str | None, now: float = None) -> float | None:
+    """
+    Returns the number of seconds from a ``Retry-After`` header (delta-seconds or HTTP-date).
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(date.timestamp() - (now if now is not None else time.time()), 0.0)
+
+
+class EndpointState:
+    """
+    Rolling statistics of one RPC endpoint.
+    """
+
+    def __init__(self, url: str, index: int):
+        self.url = url
+        self.index = index
+        self.latency = None
+        self.calls = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.consecutive_failures = 0
+        self.down = False
+        self.available_at = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "latency": self.latency,
+            "calls": self.calls,
+            "errors": self.errors,
+            "rate_limited": self.rate_limited,
+            "consecutive_failures": self.consecutive_failures,
+            "down": self.down,
+        }
+
+    def __repr__(self) -> str:
+        return f'EndpointState({self.url!r}, {self.to_dict()})'
+
+
+class EndpointPool:
+    """
+    Routes every call to the fastest healthy endpoint (by exponentially weighted latency, endpoints
+    without measurements are tried first, ties go to the endpoint listed first).
+
+    Endpoints answering HTTP 429 are skipped for ``Retry-After`` seconds, endpoints failing
+    ``max_failures`` times in a row are taken out until a probe (``getHealth``) succeeds.
+    Failed calls are retried on the next best endpoint.
+    """
+
+    def __init__(
+            self,
+            endpoints: list[str],
+            max_failures: int = 3,
+            latency_alpha: float = 0.2,
+            rate_limit_backoff: float = 1.0,
+            max_wait: float = 10.0,
+            probe_interval: float | None = 5.0,
+            clock=time.monotonic,
+            sleep=time.sleep,
+            async_sleep=asyncio.sleep,
+    ):
+        """
+        :param rate_limit_backoff: seconds to skip a rate-limited endpoint which didn't send ``Retry-After``
+        :param max_wait: longest time a call sleeps when every endpoint is rate-limited
+        :param probe_interval: seconds between background probes of endpoints which are down
+            (None - no background thread, call ``probe`` yourself)
+        :param clock: time source of the pool, ``sleep`` and ``async_sleep`` wait with it (fakes make routing
+            deterministic in tests)
+        """
+        if not endpoints:
+            raise ValueError('EndpointPool needs at least one endpoint')
+        self.endpoints = list(dict.fromkeys(endpoints))
+        self.max_failures = max_failures
+        self.latency_alpha = latency_alpha
+        self.rate_limit_backoff = rate_limit_backoff
+        self.max_wait = max_wait
+        self.probe_interval = probe_interval
+        self._clock = clock
+        self._sleep = sleep
+        self._async_sleep = async_sleep
+        self._states = {url: EndpointState(url, i) for i, url in enumerate(self.endpoints)}
+        self._lock = threading.Lock()
+        self._prober = None
+        self._stop = threading.Event()
+
+    def stats(self) -> dict:
+        return {url: state.to_dict() for url, state in self._states.items()}
+
+    def _pick(self, tried: set) -> tuple[EndpointState, float]:
+        now = self._clock()
+        with self._lock:
+            candidates = [s for s in self._states.values() if s.url not in tried]
+            ready = [s for s in candidates if not s.down and s.available_at <= now]
+            if ready:
+                best = min(ready, key=lambda s: (s.latency is not None, s.latency or 0.0, s.index))
+                return best, 0.0
+            # Nothing is ready: wait for the first rate-limited endpoint, try endpoints which are down last.
+            best = min(candidates, key=lambda s: (s.down, s.available_at, s.index))
+            return best, min(max(best.available_at - now, 0.0), self.max_wait)
+
+    def pick(self) -> str:
+        """
+        Returns the endpoint the next call would be routed to.
+        """
+        return self._pick(set())[0].url
+
+    def report_success(self, url: str, latency: float) -> None:
+        with self._lock:
+            state = self._states[url]
+            state.calls += 1
+            state.consecutive_failures = 0
+            state.down = False
+            if state.latency is None:
+                state.latency = latency
+            else:
+                state.latency += self.latency_alpha * (latency - state.latency)
+
+    def report_failure(self, url: str, error: BaseException = None) -> None:
+        """
+        Record a failed call. HTTP 429 responses put the endpoint on hold for ``Retry-After`` seconds.
+        """
+        http_error = _http_error(error) if error is not None else None
+        response = getattr(http_error, 'response', None) if http_error is not None else None
+        start_prober = False
+        with self._lock:
+            state = self._states[url]
+            state.calls += 1
+            if response is not None and response.status_code == 429:
+                state.rate_limited += 1
+                delay = parse_retry_after(response.headers.get('Retry-After'))
+                state.available_at = self._clock() + (self.rate_limit_backoff if delay is None else delay)
+                return
+            state.errors += 1
+            state.consecutive_failures += 1
+            if state.consecutive_failures >= self.max_failures and not state.down:
+                state.down = True
+                logger.warning('RPC endpoint %s is down after %s failures', url, state.consecutive_failures)
+                start_prober = self.probe_interval is not None
+        if start_prober:
+            self._start_prober()
+
+    def _before_call(self, tried: set) -> tuple[EndpointState, float]:
+        state, wait = self._pick(tried)
+        tried.add(state.url)
+        return state, wait
+
+    def call(self, fn):
+        """
+        Call ``fn(endpoint_url)`` on the best endpoint, retrying on the next one if it fails with an HTTP error.
+        """
+        tried = set()
+        error = None
+        for attempt in range(len(self.endpoints)):
+            state, wait = self._before_call(tried)
+            if wait:
+                self._sleep(wait)
+            start = self._clock()
+            token = metrics.set_retries(attempt)
+            try:
+                result = fn(state.url)
+            except Exception as e:
+                if _http_error(e) is None:
+                    raise
+                self.report_failure(state.url, e)
+                error = e
+                continue
+            finally:
+                metrics.reset_retries(token)
+            self.report_success(state.url, self._clock() - start)
+            return result
+        raise error
+
+    async def call_async(self, fn):
+        """
+        Async version of ``call``, ``fn(endpoint_url)`` must return an awaitable.
+        """
+        tried = set()
+        error = None
+        for attempt in range(len(self.endpoints)):
+            state, wait = self._before_call(tried)
+            if wait:
+                await self._async_sleep(wait)
+            start = self._clock()
+            token = metrics.set_retries(attempt)
+            try:
+                result = await fn(state.url)
+            except Exception as e:
+                if _http_error(e) is None:
+                    raise
+                self.report_failure(state.url, e)
+                error = e
+                continue
+            finally:
+                metrics.reset_retries(token)
+            self.report_success(state.url, self._clock() - start)
+            return result
+        raise error
+
+    def _probe_endpoint(self, url: str) -> None:
+        response = rpc_request(url, 'getHealth')
+        if response.get('result') != 'ok':
+            raise Exception(f'rpc_pool.probe error: {response}')
+
+    def probe(self) -> list[str]:
+        """
+        Check endpoints which are down and bring back the ones that answer ``getHealth``.
+
+        :return: endpoints which were brought back
+        """
+        restored = []
+        for state in [s for s in self._states.values() if s.down]:
+            start = self._clock()
+            try:
+                self._probe_endpoint(state.url)
+            except Exception as e:
+                logger.debug('Probe of %s failed: %r', state.url, e)
+                continue
+            self.report_success(state.url, self._clock() - start)
+            restored.append(state.url)
+        return restored
+
+    def _start_prober(self) -> None:
+        with self._lock:
+            if self._prober is not None and self._prober.is_alive():
+                return
+            self._stop.clear()
+            self._prober = threading.Thread(target=self._probe_loop, name='rpc-pool-prober', daemon=True)
+            self._prober.start()
+
+    def _probe_loop(self) -> None:
+        while not self._stop.wait(self.probe_interval):
+            self.probe()
+            if not any(s.down for s in self._states.values()):
+                return
+
+    def close(self) -> None:
+        """
+        Stop background probes.
+        """
+        self._stop.set()
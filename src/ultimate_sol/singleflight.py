@@ -0,0 +1,142 @@
+import asyncio
+import threading
+import time
+
+# Expired results are swept once this many of them are stored.
+_SWEEP_SIZE = 1024
+
+
+class _Call:
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def _fresh(results: dict, key, now: float):
+    entry = results.get(key)
+    if entry is not None and entry[0] > now:
+        return entry
+    return None
+
+
+def _sweep(results: dict, now: float) -> None:
+    if len(results) > _SWEEP_SIZE:
+        for key in [key for key, (expires_at, _) in results.items() if expires_at <= now]:
+            del results[key]
+
+
+class SingleFlight:
+    """
+    Runs one call per key at a time: concurrent callers with the same key wait for the call
+    in flight and share its result (or exception). Results can be reused for ``ttl`` seconds.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._calls = {}
+        self._results = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key, fn, ttl: float = 0.0):
+        with self._lock:
+            if ttl:
+                entry = _fresh(self._results, key, self._clock())
+                if entry is not None:
+                    self.shared += 1
+                    return entry[1]
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                if ttl and call.error is None:
+                    now = self._clock()
+                    _sweep(self._results, now)
+                    self._results[key] = (now + ttl, call.result)
+            call.event.set()
+        return call.result
+
+
+class AsyncSingleFlight:
+    """
+    Async version of ``SingleFlight``, ``fn()`` must return an awaitable.
+
+    The call runs in its own task which every caller (the first one included) awaits, so a cancelled caller
+    doesn't cancel the call for the others. The call is cancelled once all its callers are cancelled.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._calls = {}
+        self._results = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def _run(self, key, fn, ttl: float):
+        result = await fn()
+        if ttl:
+            now = self._clock()
+            _sweep(self._results, now)
+            self._results[key] = (now + ttl, result)
+        return result
+
+    def _start(self, loop: asyncio.AbstractEventLoop, key, fn, ttl: float) -> list:
+        task = loop.create_task(self._run(key, fn, ttl))
+        call = self._calls[(loop, key)] = [task, 0]
+
+        def done(task: asyncio.Task) -> None:
+            if self._calls.get((loop, key)) is call:
+                del self._calls[(loop, key)]
+            if not task.cancelled():
+                # Mark the exception as retrieved in case every caller was cancelled.
+                task.exception()
+
+        task.add_done_callback(done)
+        return call
+
+    async def do(self, key, fn, ttl: float = 0.0):
+        if ttl:
+            entry = _fresh(self._results, key, self._clock())
+            if entry is not None:
+                self.shared += 1
+                return entry[1]
+
+        loop = asyncio.get_running_loop()
+        call = self._calls.get((loop, key))
+        if call is None:
+            call = self._start(loop, key, fn, ttl)
+            self.calls += 1
+        else:
+            self.shared += 1
+        task = call[0]
+        call[1] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if call[1] == 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            call[1] -= 1
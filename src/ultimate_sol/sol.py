@@ -1,150 +1,1257 @@
-import httpx
-import solders
-from solana.rpc.api import Client
-from solana.rpc.types import TokenAccountOpts
-from solders import message
-from solders.keypair import Keypair
+import asyncio
+import base64
+import inspect
+import json
+import logging
+import struct
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from functools import partial
+from typing import TYPE_CHECKING, AsyncIterator, Iterator
 
-from .metadata import *
-from .solana_fm import get_owner_token_accounts
+from .cache import cluster_id, get_mint_store, get_token_cache
+from .http_client import async_rpc_client, get_async_client, get_client, rpc_client
+# The metadata API stays importable from here, as it was when this module star-imported ``metadata``.
+from .metadata import (MAX_CREATOR_LENGTH, MAX_CREATOR_LIMIT, MAX_NAME_LENGTH, MAX_SYMBOL_LENGTH, MAX_URI_LENGTH,
+                       InstructionType, decode_metadata, derive_metadata_accounts, get_edition, get_metadata,
+                       get_metadata_account, unpack_metadata_account, update_metadata_instruction_data)
+from .rpc import HEADERS, EndpointStats, rpc_batch, rpc_batch_async, rpc_request, rpc_request_async
+from .rpc_pool import EndpointPool
+from .solana_fm import get_owner_token_accounts, get_owner_token_accounts_async
+
+# solana, solders and websockets are imported on first use, so that importing the module stays cheap.
+if TYPE_CHECKING:
+    from solders.keypair import Keypair
+    from solders.pubkey import Pubkey
+
+    from .subscriptions import PubSubClient
+
+logger = logging.getLogger(__name__)
+
+# getMultipleAccounts accepts at most 100 keys per call.
+MULTIPLE_ACCOUNTS_LIMIT = 100
+
+# Calls packed into one JSON-RPC batch request by ``get_token_balances``.
+RPC_BATCH_SIZE = 50
+
+# Owners of mint accounts, both keep ``decimals`` at byte 44 of the 82-byte mint layout (then ``is_initialized``).
+TOKEN_PROGRAM_IDS = ('TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA', 'TokenzQdBNbLqP5VEhdkAS6EPFLC1PHnBqCXEpPxuEb')
+MINT_SIZE = 82
+MINT_DECIMALS_OFFSET = 44
+# Token accounts and multisigs are owned by the same programs. Token-2022 accounts with extensions are longer
+# than both base layouts and keep their type (1 - mint) right after the 165 bytes of a token account,
+# so mints are requested with the first 166 bytes and told apart by length and type.
+MINT_SLICE_LENGTH = 166
+ACCOUNT_TYPE_MINT = 1
+MULTISIG_SIZE = 355
+
+# Token accounts are requested with the first 72 bytes of the 165-byte layout: mint, owner, amount (u64).
+TOKEN_ACCOUNT_SLICE_LENGTH = 72
+_TOKEN_ACCOUNT = struct.Struct('<32s32xQ')
+
+# Transactions signed together by ``send_many``.
+SIGN_BATCH_SIZE = 64
+
+# A blockhash is valid for 150 blocks (~60-90 seconds), rebroadcasting longer than that is pointless.
+REBROADCAST_TIMEOUT = 90
+
+_send_executor = None
+
+
+def __getattr__(name: str):
+    # Names which used to be imported with the module, now loaded on first access.
+    if name == 'METADATA_PROGRAM_ID':
+        from . import metadata
+        return metadata.METADATA_PROGRAM_ID
+    if name == 'Pubkey':
+        from solders.pubkey import Pubkey
+        return Pubkey
+    if name == 'Keypair':
+        from solders.keypair import Keypair
+        return Keypair
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def _get_send_executor() -> ThreadPoolExecutor:
+    global _send_executor
+    if _send_executor is None:
+        _send_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix='ultimate-sol-send')
+    return _send_executor
+
+
+def _pubkey(address: str) -> 'Pubkey':
+    from solders.pubkey import Pubkey
+    return Pubkey.from_string(address)
+
+
+def _sign_tx(tx: str, sender: 'Keypair') -> str:
+    from solders import message
+    from solders.transaction import VersionedTransaction
+
+    raw_tx = VersionedTransaction.from_bytes(
+        base64.b64decode(tx)
+    )
+    signed_txn = sender.sign_message(message.to_bytes_versioned(raw_tx.message))
+    s_signed_txn = VersionedTransaction.populate(
+        raw_tx.message, [signed_txn]
+    )
+    return base64.b64encode(bytes(s_signed_txn)).decode("utf-8")
+
+
+def _sign_txs(txs: list[str], sender: 'Keypair') -> list:
+    # Signed transactions of one batch, a transaction which couldn't be decoded is mapped to its exception.
+    signed = []
+    for tx in txs:
+        try:
+            signed.append(_sign_tx(tx, sender))
+        except Exception as e:
+            signed.append(e)
+    return signed
+
+
+def _timed_call(fn) -> tuple:
+    start = time.perf_counter()
+    return fn(), time.perf_counter() - start
+
+
+async def _timed_call_async(fn) -> tuple:
+    start = time.perf_counter()
+    result = fn()
+    if inspect.isawaitable(result):
+        result = await result
+    return result, time.perf_counter() - start
+
+
+def _send_result() -> dict:
+    return {"signature": None, "response": None, "error": None, "timings": {"build": 0.0, "sign": 0.0, "submit": 0.0}}
+
+
+def _finish_send(result: dict, response, elapsed: float) -> None:
+    result["timings"]["submit"] = elapsed
+    if isinstance(response, Exception):
+        result["error"] = response
+        return
+    result["response"] = response
+    if 'result' in response:
+        result["signature"] = response['result']
+    else:
+        result["error"] = Exception(f'sol.send_many error: {response.get("error", response)}')
+
+
+def _send_many_report(results: list[dict], start: float) -> dict:
+    timings = {
+        stage: sum((result["timings"][stage] for result in results), 0.0) for stage in ('build', 'sign', 'submit')
+    }
+    timings["total"] = time.perf_counter() - start
+    return {"results": results, "timings": timings}
+
+
+def _sign_batches(items: list[tuple[int, object]], results: list[dict]) -> list[list[tuple[int, str]]]:
+    # Record build errors and split the rest into batches of ``SIGN_BATCH_SIZE`` transactions.
+    ready = []
+    for i, tx in items:
+        if isinstance(tx, Exception):
+            results[i]["error"] = tx
+        else:
+            ready.append((i, tx))
+    return _chunks(ready, SIGN_BATCH_SIZE)
+
+
+def _send_tx_data(encoded_tx: str) -> dict:
+    return {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "sendTransaction",
+        "params": [
+            encoded_tx,
+            {
+                "skipPreflight": True,
+                "preflightCommitment": "finalized",
+                "encoding": "base64",
+                "maxRetries": None,
+                "minContextSlot": None,
+            },
+        ],
+    }
+
+
+def _record_send(stats: dict, endpoint: str, start: float, response) -> bool:
+    accepted = isinstance(response, dict) and 'result' in response
+    stats.setdefault(endpoint, EndpointStats()).record(time.perf_counter() - start, accepted)
+    return accepted
+
+
+def _post_tx(endpoint: str, data: dict, stats: dict) -> tuple[str, object, bool]:
+    start = time.perf_counter()
+    try:
+        response = get_client().post(endpoint, headers=HEADERS, json=data)
+        response.raise_for_status()
+        response = response.json()
+    except Exception as e:
+        response = e
+    return endpoint, response, _record_send(stats, endpoint, start, response)
+
+
+async def _post_tx_async(endpoint: str, data: dict, stats: dict) -> tuple[str, object, bool]:
+    start = time.perf_counter()
+    try:
+        response = await get_async_client().post(endpoint, headers=HEADERS, json=data)
+        response.raise_for_status()
+        response = response.json()
+    except Exception as e:
+        response = e
+    return endpoint, response, _record_send(stats, endpoint, start, response)
+
+
+def _tx_finished(status_response: dict) -> bool:
+    status = status_response['result']['value'][0]
+    return status is not None and (
+            status.get('err') is not None or status.get('confirmationStatus') in ('confirmed', 'finalized')
+    )
+
+
+def _parse_sol_balance(balance) -> float:
+    balance = json.loads(balance.to_json())
+    try:
+        balance = round(balance['result']['value'] / 1000000000, 5)
+        return balance
+    except:
+        raise Exception(f'sol.get_sol_balance error: {balance}')
+
+
+def _endpoint_pool(endpoint: str | list[str], pool: EndpointPool | None) -> EndpointPool:
+    if pool is not None:
+        return pool
+    return EndpointPool([endpoint] if isinstance(endpoint, str) else endpoint)
+
+
+def _chunks(items: list, size: int) -> list[list]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _batch_slots(addresses: list[str], batch_size: int, name: str) -> tuple[list, list[list[int]]]:
+    # Results with invalid addresses already mapped to an Exception and batches of indexes of the rest.
+    results = [None] * len(addresses)
+    valid = []
+    for i, address in enumerate(addresses):
+        try:
+            _pubkey(address)
+        except Exception:
+            results[i] = Exception(f'sol.{name} error: invalid address {address}')
+        else:
+            valid.append(i)
+    return results, _chunks(valid, batch_size)
+
+
+def _fill_batch(results: list, batch: list[int], values) -> None:
+    if isinstance(values, Exception):
+        for i in batch:
+            results[i] = values
+    else:
+        for i, value in zip(batch, values):
+            results[i] = value
+
+
+def _multiple_accounts_params(addresses: list[str], offset: int, length: int) -> list:
+    return [addresses, {"encoding": "base64", "dataSlice": {"offset": offset, "length": length}}]
+
+
+def _parse_sol_balances(response: dict) -> list[float]:
+    try:
+        accounts = response['result']['value']
+        return [round((account['lamports'] if account else 0) / 1000000000, 5) for account in accounts]
+    except:
+        raise Exception(f'sol.get_sol_balances error: {response}')
+
+
+def _token_balances_calls(owner: str, mints: list[str]) -> list[tuple[str, list]]:
+    return [("getTokenAccountsByOwner", [owner, {"mint": mint}, {"encoding": "jsonParsed"}]) for mint in mints]
+
+
+def _parse_token_balances(responses: list[dict]) -> list:
+    res = []
+    for response in responses:
+        try:
+            accounts = response['result']['value']
+            res.append(accounts[0]['account']['data']['parsed']['info']['tokenAmount']['uiAmount'] if accounts else 0)
+        except:
+            res.append(Exception(f'sol.get_token_balances error: {response}'))
+    return res
+
+
+def _parse_mints_decimals(response: dict) -> list[int | None]:
+    try:
+        accounts = response['result']['value']
+    except:
+        raise Exception(f'sol.get_token_decimals_many error: {response}')
+    return [None if account is None else _mint_decimals(account) for account in accounts]
+
+
+def _mint_decimals(account: dict) -> int | Exception:
+    # Decimals of an account requested with the first ``MINT_SLICE_LENGTH`` bytes, an Exception if it's not a mint.
+    try:
+        data = base64.b64decode(account['data'][0])
+        if account['owner'] in TOKEN_PROGRAM_IDS and data[MINT_DECIMALS_OFFSET + 1] == 1 and (
+                len(data) == MINT_SIZE or (
+                    account['owner'] == TOKEN_PROGRAM_IDS[1] and len(data) == MINT_SLICE_LENGTH
+                    and data[-1] == ACCOUNT_TYPE_MINT and account.get('space') != MULTISIG_SIZE
+                )
+        ):
+            return data[MINT_DECIMALS_OFFSET]
+    except Exception:
+        pass
+    return Exception(f'sol.get_token_decimals_many error: not an initialized mint account ({account["owner"]})')
+
+
+def _cached_decimals(mints: list[str], cluster: str) -> tuple[list, list[int]]:
+    # Results for mints found in the cache or the mint store and indexes of the mints to load.
+    cache = get_token_cache()
+    results = [None] * len(mints)
+    missing = []
+    for i, mint in enumerate(mints):
+        hit, decimals = cache.lookup('decimals', mint, cluster)
+        if hit:
+            results[i] = _decimals_result(decimals, mint)
+        else:
+            missing.append(i)
+    store = get_mint_store()
+    if store is not None and missing:
+        stored = store.get_decimals_many([mints[i] for i in missing], cluster)
+        for i in missing:
+            if mints[i] in stored:
+                cache.store('decimals', mints[i], stored[mints[i]], cluster)
+                results[i] = stored[mints[i]]
+        missing = [i for i in missing if mints[i] not in stored]
+    return results, missing
+
+
+def _store_decimals(results: list, mints: list[str], missing: list[int], loaded: list, cluster: str) -> list:
+    cache = get_token_cache()
+    found = {}
+    for i, decimals in zip(missing, loaded):
+        if not isinstance(decimals, Exception):
+            cache.store('decimals', mints[i], decimals, cluster)
+            if decimals is not None:
+                found[mints[i]] = decimals
+            decimals = _decimals_result(decimals, mints[i])
+        results[i] = decimals
+    store = get_mint_store()
+    if store is not None:
+        store.put_decimals(found, cluster)
+    return results
+
+
+def _stored_decimals(token_address: str, cluster: str) -> int | None:
+    store = get_mint_store()
+    return None if store is None else store.get_decimals(token_address, cluster)
+
+
+def _keep_decimals(token_address: str, decimals: int | None, cluster: str) -> int | None:
+    store = get_mint_store()
+    if store is not None and decimals is not None:
+        store.put_decimals({token_address: decimals}, cluster)
+    return decimals
+
+
+def _decimals_result(decimals: int | None, token_address: str):
+    try:
+        return _check_token_decimals(decimals, token_address)
+    except Exception as e:
+        return e
+
+
+def _token_accounts_params(owner: str, program_id: str) -> list:
+    return [owner, {"programId": program_id},
+            {"encoding": "base64", "dataSlice": {"offset": 0, "length": TOKEN_ACCOUNT_SLICE_LENGTH}}]
+
+
+def _token_accounts_buffer(responses: list[dict]) -> bytes:
+    # 72 bytes are 96 base64 characters without padding, so all accounts are decoded with one call.
+    data = []
+    for response in responses:
+        try:
+            data.extend(account['account']['data'][0] for account in response['result']['value'])
+        except:
+            raise Exception(f'sol.get_token_accounts error: {response}')
+    buffer = base64.b64decode(''.join(data))
+    if len(buffer) != len(data) * TOKEN_ACCOUNT_SLICE_LENGTH:
+        raise Exception(f'sol.get_token_accounts error: unexpected token account data length')
+    return buffer
+
+
+def _sum_token_amounts(buffer: bytes) -> dict[bytes, int]:
+    # Raw amounts summed per mint (a wallet may have several accounts of one mint), zero balances dropped.
+    amounts = {}
+    for mint, amount in _TOKEN_ACCOUNT.iter_unpack(buffer):
+        if amount:
+            amounts[mint] = amounts.get(mint, 0) + amount
+    return amounts
+
+
+def _token_amounts(responses: list[dict]) -> dict[str, int]:
+    from solders.pubkey import Pubkey
+    amounts = _sum_token_amounts(_token_accounts_buffer(responses))
+    return {str(Pubkey.from_bytes(mint)): amount for mint, amount in amounts.items()}
+
+
+def _token_account_rows(amounts: dict[str, int], decimals: list) -> list[list[str, float, int]]:
+    rows = []
+    for (mint, amount), mint_decimals in zip(amounts.items(), decimals):
+        if isinstance(mint_decimals, Exception):
+            # One unreadable mint (closed, not a mint, RPC error of its batch) must not hide the other tokens.
+            logger.warning('Skipping token %s with amount %d: %r', mint, amount, mint_decimals)
+            continue
+        rows.append([mint, amount / 10 ** mint_decimals, mint_decimals])
+    return rows
+
+
+def _portfolio_chunks(tokens: list, chunk_size: int) -> tuple[dict, list[list]]:
+    balances = {token[0]: token[1] for token in tokens}
+    metadata_accounts = derive_metadata_accounts(list(balances))
+    return balances, _chunks(metadata_accounts, min(chunk_size, MULTIPLE_ACCOUNTS_LIMIT))
+
+
+def _parse_token_portfolio(balances: dict, accounts) -> list[list[str, str, float]]:
+    accounts = json.loads(accounts.to_json())['result']['value']
+    res = []
+    for acc in accounts:
+        # Mints without a metadata account are skipped.
+        if acc is None:
+            continue
+        metadata = decode_metadata(base64.b64decode(acc['data'][0]))
+        mint = metadata.mint
+        res.append([mint, metadata.symbol, balances.get(mint, 0)])
+    return res
+
+
+def _parse_token_symbol(account) -> str | None:
+    if not account.value:
+        return None
+    try:
+        account = json.loads(account.to_json())
+        account = account['result']['value']
+        data = base64.b64decode(account['data'][0])
+        return decode_metadata(data).symbol
+    except:
+        raise Exception(f'error in sol.get_token_symbol: {account}')
+
+
+def _parse_token_decimals(info) -> int | None:
+    if info.value is None:
+        return None
+    try:
+        parsed = info.value.data.parsed
+        if parsed['type'] != 'mint':
+            # Token accounts carry decimals too, only the mint's are the token's.
+            raise ValueError(parsed['type'])
+        return parsed['info']['decimals']
+    except:
+        raise Exception(f'sol.get_token_decimals error: {info.to_json()}')
+
+
+def _check_token_symbol(symbol: str | None) -> str:
+    if symbol is None:
+        raise Exception(f'error in sol.get_token_symbol: incorrect token_address')
+    return symbol
+
+
+def _check_token_decimals(decimals: int | None, token_address: str) -> int:
+    if decimals is None:
+        raise Exception(f'sol.get_token_decimals error: account {token_address} not found')
+    return decimals
 
 
 class SolClient:
     ENDPOINT = 'https://api.mainnet-beta.solana.com/'
     WEBSOCKET_ENDPOINT = 'wss://api.mainnet-beta.solana.com/'
-    _C = Client(ENDPOINT)
-    _W_C = Client(WEBSOCKET_ENDPOINT)
 
     def __init__(
             self,
-            endpoint: str = 'https://api.mainnet-beta.solana.com/',
+            endpoint: str | list[str] = 'https://api.mainnet-beta.solana.com/',
             websocket_endpoint: str = 'wss://api.mainnet-beta.solana.com/',
+            send_endpoints: list[str] = None,
+            pool: EndpointPool = None,
+            cluster: str = None,
     ):
-        self.ENDPOINT = endpoint
-        self.WEBSOCKET_ENDPOINT = endpoint
-        self._C = Client(endpoint)
-        self._W_C = Client(websocket_endpoint)
+        """
+        :param endpoint: RPC endpoint or a list of endpoints, every call goes to the fastest healthy one
+        :param send_endpoints: RPC endpoints used by ``broadcast_tx`` (all ``endpoint``s if None)
+        :param pool: ``EndpointPool`` to use instead of a new one built from ``endpoint``
+        :param cluster: name of the cluster (e.g. its genesis hash) the token cache and the mint store keep facts
+            under, clients with the same ``cluster`` share them. Defaults to the first endpoint (host and path).
+        """
+        self.pool = _endpoint_pool(endpoint, pool)
+        self.ENDPOINT = self.pool.endpoints[0]
+        self.cluster = cluster or cluster_id(self.ENDPOINT)
+        self.WEBSOCKET_ENDPOINT = websocket_endpoint
+        self.send_endpoints = send_endpoints or self.pool.endpoints
+        self.send_stats = {}
+        self._clients = {}
+        self._pubsub = None
+
+    def _client(self, endpoint: str):
+        # ``solana.rpc.api.Client`` objects are created on first use.
+        client = self._clients.get(endpoint)
+        if client is None:
+            client = self._clients.setdefault(endpoint, rpc_client(endpoint))
+        return client
+
+    @property
+    def _C(self):
+        return self._client(self.ENDPOINT)
+
+    def _call(self, method: str, *args):
+        # Call ``solana.rpc.api.Client`` method on the best endpoint of the pool.
+        return self.pool.call(lambda endpoint: getattr(self._client(endpoint), method)(*args))
+
+    def _rpc(self, method: str, params: list = None) -> dict:
+        return self.pool.call(lambda endpoint: rpc_request(endpoint, method, params))
+
+    @property
+    def pubsub(self) -> 'PubSubClient':
+        """
+        PubSub client for ``WEBSOCKET_ENDPOINT``, its subscriptions are async iterators:
 
-    @staticmethod
-    def send_tx(tx: str, sender: Keypair) -> dict:
+            sub = await client.pubsub.account_subscribe(address)
+            async for notification in sub: ...
+        """
+        if self._pubsub is None:
+            from .subscriptions import PubSubClient
+            self._pubsub = PubSubClient(self.WEBSOCKET_ENDPOINT)
+        return self._pubsub
+
+    def send_tx(self, tx: str, sender: 'Keypair') -> dict:
         """
         Send (perform) transaction.
         """
-        raw_tx = solders.transaction.VersionedTransaction.from_bytes(
-            base64.b64decode(tx)
-        )
-        signed_txn = sender.sign_message(message.to_bytes_versioned(raw_tx.message))
-        s_signed_txn = solders.transaction.VersionedTransaction.populate(
-            raw_tx.message, [signed_txn]
-        )
-        encoded_tx = base64.b64encode(bytes(s_signed_txn)).decode("utf-8")
-
-        headers = {"Content-Type": "application/json"}
-        data = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "sendTransaction",
-            "params": [
-                encoded_tx,
-                {
-                    "skipPreflight": True,
-                    "preflightCommitment": "finalized",
-                    "encoding": "base64",
-                    "maxRetries": None,
-                    "minContextSlot": None,
-                },
-            ],
-        }
-
-        response = httpx.post(
-            "https://api.mainnet-beta.solana.com",
-            headers=headers,
-            json=data,
-        )
-        return response.json()
+        return self._send_data(_send_tx_data(_sign_tx(tx, sender)))
+
+    def _send_data(self, data: dict) -> dict:
+        def send(endpoint: str) -> dict:
+            _, response, _ = _post_tx(endpoint, data, self.send_stats)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        return self.pool.call(send)
+
+    def _send_signed(self, result: dict, encoded_tx: str) -> None:
+        start = time.perf_counter()
+        try:
+            response = self._send_data(_send_tx_data(encoded_tx))
+        except Exception as e:
+            response = e
+        _finish_send(result, response, time.perf_counter() - start)
+
+    def send_many(
+            self,
+            transactions: list,
+            sender: 'Keypair',
+            max_workers: int = 16,
+            sign_processes: int = None,
+    ) -> dict:
+        """
+        Build, sign and send many transactions with overlapping stages. Items of ``transactions`` are base64
+        transactions or callables returning one (e.g. ``functools.partial(jupiter.swap, input_mint, output_mint,
+        amount)``), which are called concurrently. Transactions are signed in batches as soon as they are built
+        and each one is sent over the shared connection pool as soon as it is signed.
+
+        :param max_workers: builds and submissions in flight
+        :param sign_processes: sign in this many worker processes (worth it for thousands of transactions)
+        :return: {"results": [{"signature", "response", "error", "timings": {"build", "sign", "submit"}}, ...]
+            in the order of ``transactions``, "timings": {"build", "sign", "submit", "total"}} in seconds,
+            stage timings are summed over all transactions
+        """
+        start = time.perf_counter()
+        results = [_send_result() for _ in transactions]
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        sign_pool = ProcessPoolExecutor(max_workers=sign_processes) if sign_processes else None
+        building = {}
+        signing = {}
+        sending = []
+
+        def submit(batch: list[tuple[int, str]], signed: list, elapsed: float) -> None:
+            for (i, _), tx in zip(batch, signed):
+                results[i]["timings"]["sign"] = elapsed / len(batch)
+                if isinstance(tx, Exception):
+                    results[i]["error"] = tx
+                else:
+                    sending.append(executor.submit(self._send_signed, results[i], tx))
+
+        try:
+            ready = []
+            for i, tx in enumerate(transactions):
+                if callable(tx):
+                    building[executor.submit(_timed_call, tx)] = i
+                else:
+                    ready.append((i, tx))
+            while True:
+                for batch in _sign_batches(ready, results):
+                    txs = [tx for _, tx in batch]
+                    if sign_pool is None:
+                        submit(batch, *_timed_call(partial(_sign_txs, txs, sender)))
+                    else:
+                        signing[sign_pool.submit(_timed_call, partial(_sign_txs, txs, sender))] = batch
+                ready = []
+                if not building and not signing:
+                    break
+                done, _ = wait(list(building) + list(signing), return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in building:
+                        i = building.pop(future)
+                        try:
+                            tx, results[i]["timings"]["build"] = future.result()
+                        except Exception as e:
+                            tx = e
+                        ready.append((i, tx))
+                    else:
+                        batch = signing.pop(future)
+                        try:
+                            submit(batch, *future.result())
+                        except Exception as e:
+                            submit(batch, [e] * len(batch), 0.0)
+            wait(sending)
+        finally:
+            executor.shutdown()
+            if sign_pool is not None:
+                sign_pool.shutdown()
+        return _send_many_report(results, start)
+
+    def broadcast_tx(
+            self,
+            tx: str,
+            sender: 'Keypair',
+            endpoints: list[str] = None,
+            rebroadcast_interval: float = None,
+            last_valid_block_height: int = None,
+    ) -> dict:
+        """
+        Sign transaction once and send it to all ``endpoints`` (``send_endpoints`` by default) at the same time.
+        Returns the first response with a signature, accept latency of every endpoint is kept in ``send_stats``.
+
+        :param rebroadcast_interval: if set, keep resending the transaction every ``rebroadcast_interval`` seconds
+            in background until it is confirmed or its blockhash expires
+        :param last_valid_block_height: block height after which the blockhash expires
+            (without it rebroadcasting stops after ``REBROADCAST_TIMEOUT`` seconds)
+        """
+        endpoints = endpoints or self.send_endpoints
+        data = _send_tx_data(_sign_tx(tx, sender))
+        executor = _get_send_executor()
+        futures = [executor.submit(_post_tx, endpoint, data, self.send_stats) for endpoint in endpoints]
+        errors = {}
+        for future in as_completed(futures):
+            endpoint, response, accepted = future.result()
+            if accepted:
+                if rebroadcast_interval:
+                    threading.Thread(
+                        target=self._rebroadcast,
+                        args=(endpoints, data, response['result'], rebroadcast_interval, last_valid_block_height),
+                        daemon=True,
+                    ).start()
+                return response
+            errors[endpoint] = response
+        raise Exception(f'sol.broadcast_tx error: {errors}')
+
+    def _rebroadcast(
+            self,
+            endpoints: list[str],
+            data: dict,
+            signature: str,
+            interval: float,
+            last_valid_block_height: int = None,
+    ) -> None:
+        deadline = time.monotonic() + REBROADCAST_TIMEOUT
+        while True:
+            time.sleep(interval)
+            if time.monotonic() > deadline:
+                return
+            try:
+                if _tx_finished(self._rpc('getSignatureStatuses', [[signature]])):
+                    return
+                if last_valid_block_height is not None:
+                    if self._rpc('getBlockHeight')['result'] > last_valid_block_height:
+                        return
+            except Exception:
+                pass
+            executor = _get_send_executor()
+            for endpoint in endpoints:
+                executor.submit(_post_tx, endpoint, data, self.send_stats)
 
     def get_sol_balance(self, account: str) -> float:
         """
         Returns SOL account balance.
         """
-        client = self._C
-        account = Pubkey.from_string(account)
-        balance = client.get_balance(account)
-        balance = json.loads(balance.to_json())
-        try:
-            balance = round(balance['result']['value'] / 1000000000, 5)
-            return balance
-        except:
-            raise Exception(f'sol.get_sol_balance error: {balance}')
+        account = _pubkey(account)
+        balance = self._call('get_balance', account)
+        return _parse_sol_balance(balance)
+
+    def _batched(self, name: str, fn, addresses: list[str], batch_size: int, max_workers: int) -> list:
+        # Call ``fn(endpoint, batch_addresses)`` for every batch concurrently and spread the results back
+        # in the order of ``addresses``, a failed batch is mapped to its exception.
+        results, batches = _batch_slots(addresses, batch_size, name)
+        if not batches:
+            return results
+
+        def run(batch: list[int]):
+            try:
+                return self.pool.call(lambda endpoint: fn(endpoint, [addresses[i] for i in batch]))
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
+            for batch, values in zip(batches, executor.map(run, batches)):
+                _fill_batch(results, batch, values)
+        return results
+
+    def get_sol_balances(
+            self,
+            accounts: list[str],
+            batch_size: int = MULTIPLE_ACCOUNTS_LIMIT,
+            max_workers: int = 8,
+    ) -> list[float | Exception]:
+        """
+        Returns SOL balances of many accounts in the order of ``accounts``. Accounts are requested with
+        ``getMultipleAccounts`` in batches of ``batch_size`` (at most 100) by up to ``max_workers`` concurrent
+        requests, an account which couldn't be fetched is mapped to an ``Exception``.
+        """
+        return self._batched(
+            'get_sol_balances',
+            lambda endpoint, batch: _parse_sol_balances(
+                rpc_request(endpoint, 'getMultipleAccounts', _multiple_accounts_params(batch, 0, 0))
+            ),
+            accounts, min(batch_size, MULTIPLE_ACCOUNTS_LIMIT), max_workers,
+        )
 
-    def get_token_portfolio(self, account: str) -> list[list[str, str, float]]:
+    def get_token_accounts(self, account: str) -> list[list[str, float, int]]:
         """
-        Returns account token portfolio.
+        Returns balances of all SPL Token and Token-2022 tokens of ``account``, summed per mint.
+        Both programs are queried concurrently with ``getTokenAccountsByOwner`` and raw account data
+        is decoded in bulk from one buffer; decimals come from ``get_token_decimals_many``,
+        tokens whose decimals can't be read are skipped (and logged).
+        :return: [[<token1_address>, <token1_balance>, <token1_decimals>], ...], zero balances are skipped
+        """
+        with ThreadPoolExecutor(max_workers=len(TOKEN_PROGRAM_IDS)) as executor:
+            responses = list(executor.map(
+                lambda program_id: self._rpc('getTokenAccountsByOwner', _token_accounts_params(account, program_id)),
+                TOKEN_PROGRAM_IDS,
+            ))
+        amounts = _token_amounts(responses)
+        return _token_account_rows(amounts, self.get_token_decimals_many(list(amounts)))
+
+    def _portfolio_tokens(self, account: str, source: str) -> list:
+        if source == 'rpc':
+            return self.get_token_accounts(account)
+        if source == 'solana_fm':
+            return get_owner_token_accounts(account)
+        raise Exception(f'sol.get_token_portfolio error: unknown source {source}')
+
+    def get_token_portfolio(
+            self,
+            account: str,
+            chunk_size: int = MULTIPLE_ACCOUNTS_LIMIT,
+            max_workers: int = 8,
+            source: str = 'rpc',
+    ) -> list[list[str, str, float]]:
+        """
+        Returns account token portfolio. Metadata accounts are fetched in chunks of ``chunk_size``
+        (at most 100) by up to ``max_workers`` concurrent requests.
+        :param source: where balances come from - ``"rpc"`` (``get_token_accounts``) or ``"solana_fm"``
         :return: [[<token1_address>, <token1_symbol>, <token1_account_balance>], ...]
         """
-        client = self._C
-        tokens = get_owner_token_accounts(account)
-        metadata_accounts = []
-        for token in tokens:
-            m = get_metadata_account(token[0])
-            metadata_accounts.append(m)
-        accounts = json.loads(client.get_multiple_accounts(metadata_accounts).to_json())['result']['value']
+        balances, chunks = _portfolio_chunks(self._portfolio_tokens(account, source), chunk_size)
+        if not chunks:
+            return []
         res = []
-        for acc in accounts:
-            data = base64.b64decode(acc['data'][0])
-            metadata = unpack_metadata_account(data)
-            balance = 0
-            for i in tokens:
-                if i[0] == metadata['mint'].decode('utf-8'):
-                    balance = i[1]
-            res.append([metadata['mint'].decode('utf-8'), metadata['data']['symbol'], balance])
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+            for accounts in executor.map(lambda chunk: self._call('get_multiple_accounts', chunk), chunks):
+                res.extend(_parse_token_portfolio(balances, accounts))
         return res
 
+    def iter_token_portfolio(
+            self,
+            account: str,
+            chunk_size: int = MULTIPLE_ACCOUNTS_LIMIT,
+            max_workers: int = 8,
+            source: str = 'rpc',
+    ) -> Iterator[list[str, str, float]]:
+        """
+        Same as ``get_token_portfolio``, but yields rows as soon as each chunk arrives
+        (in completion order).
+        """
+        balances, chunks = _portfolio_chunks(self._portfolio_tokens(account, source), chunk_size)
+        if not chunks:
+            return
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+            futures = [executor.submit(self._call, 'get_multiple_accounts', chunk) for chunk in chunks]
+            try:
+                for future in as_completed(futures):
+                    yield from _parse_token_portfolio(balances, future.result())
+            finally:
+                for future in futures:
+                    future.cancel()
+
     def get_token_symbol(self, token_address: str) -> str:
         """
         Return token symbol.
         """
-        client = self._C
+        symbol = get_token_cache().get_or_load(
+            'symbol', token_address, lambda: self._load_token_symbol(token_address), self.cluster
+        )
+        return _check_token_symbol(symbol)
+
+    def _load_token_symbol(self, token_address: str) -> str | None:
         account = get_metadata_account(token_address)
-        account = client.get_account_info(account)
-        if not account.value:
-            raise Exception(f'error in sol.get_token_symbol: incorrect token_address')
-        try:
-            account = json.loads(account.to_json())
-            account = account['result']['value']
-            data = base64.b64decode(account['data'][0])
-            metadata = unpack_metadata_account(data)
-            return metadata['data']['symbol']
-        except:
-            raise Exception(f'error in sol.get_token_symbol: {account}')
+        account = self._call('get_account_info', account)
+        return _parse_token_symbol(account)
 
     def get_token_balance(self, account: str, token_address: str) -> float:
         """
         Returns account token balance.
         """
-        client = self._C
-        token_address = Pubkey.from_string(token_address)
-        account = Pubkey.from_string(account)
+        from solana.rpc.types import TokenAccountOpts
+
+        token_address = _pubkey(token_address)
+        account = _pubkey(account)
         opts = TokenAccountOpts(mint=token_address)
-        token_accounts = client.get_token_accounts_by_owner(account, opts)
+        token_accounts = self._call('get_token_accounts_by_owner', account, opts)
         token_accounts = json.loads(token_accounts.to_json())
         try:
             if token_accounts['result']['value']:
-                token_account = Pubkey.from_string(token_accounts['result']['value'][0]['pubkey'])
-                balance = client.get_token_account_balance(token_account)
+                token_account = _pubkey(token_accounts['result']['value'][0]['pubkey'])
+                balance = self._call('get_token_account_balance', token_account)
                 return balance.value.ui_amount
             else:
                 return 0
         except:
             raise Exception(f'sol.get_token_balance error: {token_accounts}')
 
+    def get_token_balances(
+            self,
+            account: str,
+            token_addresses: list[str],
+            batch_size: int = RPC_BATCH_SIZE,
+            max_workers: int = 8,
+    ) -> list[float | Exception]:
+        """
+        Returns account balances of many tokens in the order of ``token_addresses``. ``getTokenAccountsByOwner``
+        calls are packed into JSON-RPC batch requests of ``batch_size`` calls, sent concurrently.
+        A token which couldn't be fetched is mapped to an ``Exception``.
+        """
+        return self._batched(
+            'get_token_balances',
+            lambda endpoint, batch: _parse_token_balances(rpc_batch(endpoint, _token_balances_calls(account, batch))),
+            token_addresses, batch_size, max_workers,
+        )
+
     def get_token_decimals(self, token_address: str) -> int:
         """
         Returns token decimals.
         """
-        client = self._C
-        info = client.get_account_info_json_parsed(Pubkey.from_string(token_address))
+        decimals = get_token_cache().get_or_load(
+            'decimals', token_address, lambda: self._load_token_decimals(token_address), self.cluster
+        )
+        return _check_token_decimals(decimals, token_address)
+
+    def _load_token_decimals(self, token_address: str) -> int | None:
+        decimals = _stored_decimals(token_address, self.cluster)
+        if decimals is not None:
+            return decimals
+        info = self._call('get_account_info_json_parsed', _pubkey(token_address))
+        return _keep_decimals(token_address, _parse_token_decimals(info), self.cluster)
+
+    def get_token_decimals_many(
+            self,
+            token_addresses: list[str],
+            batch_size: int = MULTIPLE_ACCOUNTS_LIMIT,
+            max_workers: int = 8,
+    ) -> list[int | Exception]:
+        """
+        Returns decimals of many tokens in the order of ``token_addresses``. Tokens missing in the cache are
+        requested with ``getMultipleAccounts`` (the mint layout of every account) in batches of ``batch_size``.
+        A token which couldn't be fetched or isn't a mint account is mapped to an ``Exception``.
+        """
+        results, missing = _cached_decimals(token_addresses, self.cluster)
+        loaded = self._batched(
+            'get_token_decimals_many',
+            lambda endpoint, batch: _parse_mints_decimals(rpc_request(
+                endpoint, 'getMultipleAccounts', _multiple_accounts_params(batch, 0, MINT_SLICE_LENGTH)
+            )),
+            [token_addresses[i] for i in missing], min(batch_size, MULTIPLE_ACCOUNTS_LIMIT), max_workers,
+        )
+        return _store_decimals(results, token_addresses, missing, loaded, self.cluster)
+
+
+class AsyncSolClient:
+    """
+    Async version of ``SolClient``. All requests share one keep-alive ``httpx.AsyncClient``.
+    """
+
+    def __init__(
+            self,
+            endpoint: str | list[str] = 'https://api.mainnet-beta.solana.com/',
+            websocket_endpoint: str = 'wss://api.mainnet-beta.solana.com/',
+            send_endpoints: list[str] = None,
+            pool: EndpointPool = None,
+            cluster: str = None,
+    ):
+        self.pool = _endpoint_pool(endpoint, pool)
+        self.ENDPOINT = self.pool.endpoints[0]
+        self.cluster = cluster or cluster_id(self.ENDPOINT)
+        self.WEBSOCKET_ENDPOINT = websocket_endpoint
+        self.send_endpoints = send_endpoints or self.pool.endpoints
+        self.send_stats = {}
+        self._clients = {}
+        self._background = set()
+        self._pubsub = None
+
+    def _client(self, endpoint: str):
+        client = self._clients.get(endpoint)
+        if client is None:
+            client = self._clients.setdefault(endpoint, async_rpc_client(endpoint))
+        return client
+
+    @property
+    def _C(self):
+        return self._client(self.ENDPOINT)
+
+    async def _call(self, method: str, *args):
+        return await self.pool.call_async(lambda endpoint: getattr(self._client(endpoint), method)(*args))
+
+    async def _rpc(self, method: str, params: list = None) -> dict:
+        return await self.pool.call_async(lambda endpoint: rpc_request_async(endpoint, method, params))
+
+    @property
+    def pubsub(self) -> 'PubSubClient':
+        """
+        PubSub client for ``WEBSOCKET_ENDPOINT``, see ``SolClient.pubsub``.
+        """
+        if self._pubsub is None:
+            from .subscriptions import PubSubClient
+            self._pubsub = PubSubClient(self.WEBSOCKET_ENDPOINT)
+        return self._pubsub
+
+    async def send_tx(self, tx: str, sender: 'Keypair') -> dict:
+        """
+        Send (perform) transaction.
+        """
+        return await self._send_data(_send_tx_data(_sign_tx(tx, sender)))
+
+    async def _send_data(self, data: dict) -> dict:
+        async def send(endpoint: str) -> dict:
+            _, response, _ = await _post_tx_async(endpoint, data, self.send_stats)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        return await self.pool.call_async(send)
+
+    async def _send_signed(self, result: dict, encoded_tx: str) -> None:
+        start = time.perf_counter()
+        try:
+            response = await self._send_data(_send_tx_data(encoded_tx))
+        except Exception as e:
+            response = e
+        _finish_send(result, response, time.perf_counter() - start)
+
+    async def send_many(
+            self,
+            transactions: list,
+            sender: 'Keypair',
+            max_workers: int = 16,
+            sign_processes: int = None,
+    ) -> dict:
+        """
+        Async version of ``SolClient.send_many``, callables may return awaitables
+        (e.g. ``functools.partial(async_jupiter.swap, input_mint, output_mint, amount)``).
+        """
+        start = time.perf_counter()
+        results = [_send_result() for _ in transactions]
+        semaphore = asyncio.Semaphore(max_workers)
+        ready = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        sign_pool = ProcessPoolExecutor(max_workers=sign_processes) if sign_processes else None
+
+        async def build(i: int, fn) -> None:
+            async with semaphore:
+                try:
+                    tx, results[i]["timings"]["build"] = await _timed_call_async(fn)
+                except Exception as e:
+                    tx = e
+            ready.put_nowait((i, tx))
+
+        async def send(i: int, tx: str) -> None:
+            async with semaphore:
+                await self._send_signed(results[i], tx)
+
+        tasks = []
+        for i, tx in enumerate(transactions):
+            if callable(tx):
+                tasks.append(asyncio.ensure_future(build(i, tx)))
+            else:
+                ready.put_nowait((i, tx))
+        try:
+            remaining = len(transactions)
+            while remaining:
+                # Sign everything built so far as one batch.
+                items = [await ready.get()]
+                while not ready.empty():
+                    items.append(ready.get_nowait())
+                remaining -= len(items)
+                for batch in _sign_batches(items, results):
+                    sign = partial(_sign_txs, [tx for _, tx in batch], sender)
+                    try:
+                        if sign_pool is None:
+                            signed, elapsed = _timed_call(sign)
+                        else:
+                            signed, elapsed = await loop.run_in_executor(sign_pool, _timed_call, sign)
+                    except Exception as e:
+                        signed, elapsed = [e] * len(batch), 0.0
+                    for (i, _), tx in zip(batch, signed):
+                        results[i]["timings"]["sign"] = elapsed / len(batch)
+                        if isinstance(tx, Exception):
+                            results[i]["error"] = tx
+                        else:
+                            tasks.append(asyncio.ensure_future(send(i, tx)))
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            if sign_pool is not None:
+                sign_pool.shutdown()
+        return _send_many_report(results, start)
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.ensure_future(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def broadcast_tx(
+            self,
+            tx: str,
+            sender: 'Keypair',
+            endpoints: list[str] = None,
+            rebroadcast_interval: float = None,
+            last_valid_block_height: int = None,
+    ) -> dict:
+        """
+        Async version of ``SolClient.broadcast_tx``.
+        """
+        endpoints = endpoints or self.send_endpoints
+        data = _send_tx_data(_sign_tx(tx, sender))
+        tasks = [asyncio.ensure_future(_post_tx_async(endpoint, data, self.send_stats)) for endpoint in endpoints]
+        errors = {}
+        for task in asyncio.as_completed(tasks):
+            endpoint, response, accepted = await task
+            if accepted:
+                # Slower endpoints keep running in background to record their stats.
+                for other in tasks:
+                    if not other.done():
+                        self._spawn(other)
+                if rebroadcast_interval:
+                    self._spawn(self._rebroadcast(
+                        endpoints, data, response['result'], rebroadcast_interval, last_valid_block_height
+                    ))
+                return response
+            errors[endpoint] = response
+        raise Exception(f'sol.broadcast_tx error: {errors}')
+
+    async def _rebroadcast(
+            self,
+            endpoints: list[str],
+            data: dict,
+            signature: str,
+            interval: float,
+            last_valid_block_height: int = None,
+    ) -> None:
+        deadline = time.monotonic() + REBROADCAST_TIMEOUT
+        while True:
+            await asyncio.sleep(interval)
+            if time.monotonic() > deadline:
+                return
+            try:
+                if _tx_finished(await self._rpc('getSignatureStatuses', [[signature]])):
+                    return
+                if last_valid_block_height is not None:
+                    height = (await self._rpc('getBlockHeight'))['result']
+                    if height > last_valid_block_height:
+                        return
+            except Exception:
+                pass
+            await asyncio.gather(*[_post_tx_async(endpoint, data, self.send_stats) for endpoint in endpoints])
+
+    async def get_sol_balance(self, account: str) -> float:
+        """
+        Returns SOL account balance.
+        """
+        balance = await self._call('get_balance', _pubkey(account))
+        return _parse_sol_balance(balance)
+
+    async def _batched(self, name: str, fn, addresses: list[str], batch_size: int) -> list:
+        results, batches = _batch_slots(addresses, batch_size, name)
+        responses = await asyncio.gather(*[
+            self.pool.call_async(lambda endpoint, batch=batch: fn(endpoint, [addresses[i] for i in batch]))
+            for batch in batches
+        ], return_exceptions=True)
+        for batch, values in zip(batches, responses):
+            _fill_batch(results, batch, values)
+        return results
+
+    async def get_sol_balances(
+            self,
+            accounts: list[str],
+            batch_size: int = MULTIPLE_ACCOUNTS_LIMIT,
+    ) -> list[float | Exception]:
+        """
+        Async version of ``SolClient.get_sol_balances``, all batches are sent concurrently.
+        """
+
+        async def fetch(endpoint: str, batch: list[str]) -> list[float]:
+            response = await rpc_request_async(endpoint, 'getMultipleAccounts', _multiple_accounts_params(batch, 0, 0))
+            return _parse_sol_balances(response)
+
+        return await self._batched('get_sol_balances', fetch, accounts, min(batch_size, MULTIPLE_ACCOUNTS_LIMIT))
+
+    async def get_token_accounts(self, account: str) -> list[list[str, float, int]]:
+        """
+        Async version of ``SolClient.get_token_accounts``.
+        """
+        responses = await asyncio.gather(*[
+            self._rpc('getTokenAccountsByOwner', _token_accounts_params(account, program_id))
+            for program_id in TOKEN_PROGRAM_IDS
+        ])
+        amounts = _token_amounts(responses)
+        return _token_account_rows(amounts, await self.get_token_decimals_many(list(amounts)))
+
+    async def _portfolio_tokens(self, account: str, source: str) -> list:
+        if source == 'rpc':
+            return await self.get_token_accounts(account)
+        if source == 'solana_fm':
+            return await get_owner_token_accounts_async(account)
+        raise Exception(f'sol.get_token_portfolio error: unknown source {source}')
+
+    async def get_token_portfolio(
+            self,
+            account: str,
+            chunk_size: int = MULTIPLE_ACCOUNTS_LIMIT,
+            source: str = 'rpc',
+    ) -> list[list[str, str, float]]:
+        """
+        Returns account token portfolio. Metadata accounts are fetched concurrently
+        in chunks of ``chunk_size`` (at most 100).
+        :param source: where balances come from - ``"rpc"`` (``get_token_accounts``) or ``"solana_fm"``
+        :return: [[<token1_address>, <token1_symbol>, <token1_account_balance>], ...]
+        """
+        tokens = await self._portfolio_tokens(account, source)
+        balances, chunks = _portfolio_chunks(tokens, chunk_size)
+        responses = await asyncio.gather(*[self._call('get_multiple_accounts', chunk) for chunk in chunks])
+        res = []
+        for accounts in responses:
+            res.extend(_parse_token_portfolio(balances, accounts))
+        return res
+
+    async def iter_token_portfolio(
+            self,
+            account: str,
+            chunk_size: int = MULTIPLE_ACCOUNTS_LIMIT,
+            source: str = 'rpc',
+    ) -> AsyncIterator[list[str, str, float]]:
+        """
+        Same as ``get_token_portfolio``, but yields rows as soon as each chunk arrives
+        (in completion order).
+        """
+        tokens = await self._portfolio_tokens(account, source)
+        balances, chunks = _portfolio_chunks(tokens, chunk_size)
+        tasks = [asyncio.ensure_future(self._call('get_multiple_accounts', chunk)) for chunk in chunks]
+        try:
+            for task in asyncio.as_completed(tasks):
+                for row in _parse_token_portfolio(balances, await task):
+                    yield row
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def get_token_symbol(self, token_address: str) -> str:
+        """
+        Return token symbol.
+        """
+        symbol = await get_token_cache().get_or_load_async(
+            'symbol', token_address, lambda: self._load_token_symbol(token_address), self.cluster
+        )
+        return _check_token_symbol(symbol)
+
+    async def _load_token_symbol(self, token_address: str) -> str | None:
+        account = await self._call('get_account_info', get_metadata_account(token_address))
+        return _parse_token_symbol(account)
+
+    async def get_token_balance(self, account: str, token_address: str) -> float:
+        """
+        Returns account token balance.
+        """
+        from solana.rpc.types import TokenAccountOpts
+
+        opts = TokenAccountOpts(mint=_pubkey(token_address))
+        token_accounts = await self._call('get_token_accounts_by_owner', _pubkey(account), opts)
+        token_accounts = json.loads(token_accounts.to_json())
         try:
-            return info.value.data.parsed['info']['decimals']
+            if token_accounts['result']['value']:
+                token_account = _pubkey(token_accounts['result']['value'][0]['pubkey'])
+                balance = await self._call('get_token_account_balance', token_account)
+                return balance.value.ui_amount
+            else:
+                return 0
         except:
-            raise Exception(f'sol.get_token_decimals error: {info.to_json()}')
+            raise Exception(f'sol.get_token_balance error: {token_accounts}')
+
+    async def get_token_balances(
+            self,
+            account: str,
+            token_addresses: list[str],
+            batch_size: int = RPC_BATCH_SIZE,
+    ) -> list[float | Exception]:
+        """
+        Async version of ``SolClient.get_token_balances``.
+        """
+
+        async def fetch(endpoint: str, batch: list[str]) -> list:
+            return _parse_token_balances(await rpc_batch_async(endpoint, _token_balances_calls(account, batch)))
+
+        return await self._batched('get_token_balances', fetch, token_addresses, batch_size)
+
+    async def get_token_decimals(self, token_address: str) -> int:
+        """
+        Returns token decimals.
+        """
+        decimals = await get_token_cache().get_or_load_async(
+            'decimals', token_address, lambda: self._load_token_decimals(token_address), self.cluster
+        )
+        return _check_token_decimals(decimals, token_address)
+
+    async def _load_token_decimals(self, token_address: str) -> int | None:
+        decimals = _stored_decimals(token_address, self.cluster)
+        if decimals is not None:
+            return decimals
+        info = await self._call('get_account_info_json_parsed', _pubkey(token_address))
+        return _keep_decimals(token_address, _parse_token_decimals(info), self.cluster)
+
+    async def get_token_decimals_many(
+            self,
+            token_addresses: list[str],
+            batch_size: int = MULTIPLE_ACCOUNTS_LIMIT,
+    ) -> list[int | Exception]:
+        """
+        Async version of ``SolClient.get_token_decimals_many``.
+        """
+
+        async def fetch(endpoint: str, batch: list[str]) -> list:
+            response = await rpc_request_async(
+                endpoint, 'getMultipleAccounts', _multiple_accounts_params(batch, 0, MINT_SLICE_LENGTH)
+            )
+            return _parse_mints_decimals(response)
+
+        results, missing = _cached_decimals(token_addresses, self.cluster)
+        loaded = await self._batched(
+            'get_token_decimals_many', fetch,
+            [token_addresses[i] for i in missing], min(batch_size, MULTIPLE_ACCOUNTS_LIMIT),
+        )
+        return _store_decimals(results, token_addresses, missing, loaded, self.cluster)
@@ -1,19 +1,32 @@
-import httpx
+from .http_client import get_async_client, get_client
 
+HEADERS = {"accept": "application/json"}
 
-def get_owner_token_accounts(account: str) -> list:
-    """
-    Returns a list with addresses and balances of all account tokens.
-    Docs: https://docs.solana.fm/reference/get_tokens_owned_by_account_handler
-    """
-    headers = {"accept": "application/json"}
-    tokens = httpx.get(f"https://api.solana.fm/v1/addresses/{account}/tokens", headers=headers)
+
+def _parse_owner_token_accounts(tokens) -> list:
     if tokens.status_code == 200:
         tokens = tokens.json()['tokens']
         res = []
         for token in tokens:
             if tokens[token]['balance']:
-                res.append([token, tokens[token]['balance'], 4])
+                res.append([token, tokens[token]['balance'], tokens[token].get('decimals')])
         return res
     else:
         raise Exception(f'solana_fm.get_owner_token_accounts error: {tokens.json()}')
+
+
+def get_owner_token_accounts(account: str) -> list:
+    """
+    Returns a list with addresses and balances of all account tokens.
+    Docs: https://docs.solana.fm/reference/get_tokens_owned_by_account_handler
+    """
+    tokens = get_client().get(f"https://api.solana.fm/v1/addresses/{account}/tokens", headers=HEADERS)
+    return _parse_owner_token_accounts(tokens)
+
+
+async def get_owner_token_accounts_async(account: str) -> list:
+    """
+    Async version of ``get_owner_token_accounts``.
+    """
+    tokens = await get_async_client().get(f"https://api.solana.fm/v1/addresses/{account}/tokens", headers=HEADERS)
+    return _parse_owner_token_accounts(tokens)
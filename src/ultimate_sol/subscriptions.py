@@ -0,0 +1,322 @@
+import asyncio
+import itertools
+import json
+import logging
+
+import websockets
+
+logger = logging.getLogger(__name__)
+
+_CLOSED = object()
+
+# What to do with a new notification when the queue of a subscription is full:
+# "drop_oldest" - drop the oldest queued notification, "drop_newest" - drop the new notification,
+# "block" - stop reading the socket until there is free space. This is backpressure for the whole connection:
+# notifications of other subscriptions and responses to ``subscribe`` wait too (closing a subscription doesn't).
+OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "block")
+
+
+class Subscription:
+    """
+    One PubSub subscription. Iterate over it with ``async for`` to receive notifications
+    (``params.result`` of each message), call ``close`` to unsubscribe.
+    """
+
+    def __init__(self, client: 'PubSubClient', method: str, params: list, maxsize: int, overflow: str):
+        self.method = method
+        self.params = params
+        self.overflow = overflow
+        self.server_id = None
+        self.dropped = 0
+        self.closed = False
+        self._pending = False
+        self._client = client
+        self._queue = asyncio.Queue(maxsize)
+        self._space = asyncio.Event()
+
+    @property
+    def unsubscribe_method(self) -> str:
+        return self.method.replace('Subscribe', 'Unsubscribe')
+
+    async def _put(self, item) -> None:
+        if self.overflow == "block":
+            # Wait for the consumer, unless the subscription gets closed meanwhile.
+            while self._queue.full() and not self.closed:
+                self._space.clear()
+                await self._space.wait()
+            if not self.closed:
+                self._queue.put_nowait(item)
+            return
+        if self._queue.full():
+            self.dropped += 1
+            if self.overflow == "drop_newest":
+                return
+            self._queue.get_nowait()
+        self._queue.put_nowait(item)
+
+    def _finish(self) -> None:
+        self.closed = True
+        self._space.set()
+        while self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(_CLOSED)
+
+    def __aiter__(self) -> 'Subscription':
+        return self
+
+    async def __anext__(self):
+        if self.closed and self._queue.empty():
+            raise StopAsyncIteration
+        item = await self._queue.get()
+        self._space.set()
+        if item is _CLOSED:
+            raise StopAsyncIteration
+        return item
+
+    async def close(self) -> None:
+        await self._client._unsubscribe(self)
+
+    def __repr__(self) -> str:
+        return f'Subscription({self.method}, {self.params}, server_id={self.server_id})'
+
+
+class PubSubClient:
+    """
+    Solana PubSub (WebSocket) client. All subscriptions share one connection, which is
+    re-established automatically (with exponential backoff) and resubscribed after a disconnect.
+    Docs: https://solana.com/docs/rpc/websocket
+    """
+
+    def __init__(
+            self,
+            endpoint: str = 'wss://api.mainnet-beta.solana.com/',
+            queue_size: int = 1000,
+            overflow: str = "drop_oldest",
+            reconnect_delay: float = 0.5,
+            max_reconnect_delay: float = 30.0,
+            ping_interval: float = 20,
+            connect_timeout: float = 10.0,
+    ):
+        """
+        :param connect_timeout: seconds a ``subscribe`` call waits for the connection before raising
+            ``TimeoutError`` (``None`` - wait forever)
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f'overflow must be one of {OVERFLOW_POLICIES}')
+        self.endpoint = endpoint
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.ping_interval = ping_interval
+        self.connect_timeout = connect_timeout
+        self.reconnects = 0
+        self._ids = itertools.count(1)
+        self._ws = None
+        self._connected = asyncio.Event()
+        self._requests = {}
+        self._subscriptions = []
+        self._by_server_id = {}
+        self._runner = None
+
+    async def __aenter__(self) -> 'PubSubClient':
+        return self
+
+    async def __aexit__(self, _exc_type, _exc, _tb):
+        await self.close()
+
+    def _ensure_running(self) -> None:
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.ensure_future(self._run())
+
+    async def close(self) -> None:
+        """
+        Close the connection and finish all subscriptions.
+        """
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+        for subscription in self._subscriptions:
+            subscription._finish()
+        self._subscriptions.clear()
+        self._by_server_id.clear()
+
+    async def _run(self) -> None:
+        delay = self.reconnect_delay
+        while True:
+            try:
+                async with websockets.connect(self.endpoint, ping_interval=self.ping_interval,
+                                              max_size=None) as ws:
+                    self._ws = ws
+                    self._connected.set()
+                    delay = self.reconnect_delay
+                    resubscribe = asyncio.ensure_future(self._resubscribe())
+                    try:
+                        async for message in ws:
+                            await self._dispatch(json.loads(message))
+                    finally:
+                        resubscribe.cancel()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning('PubSub connection to %s failed: %r', self.endpoint, e)
+            finally:
+                self._ws = None
+                self._connected.clear()
+                self._by_server_id.clear()
+                for future in self._requests.values():
+                    if not future.done():
+                        future.set_exception(ConnectionError('PubSub connection closed'))
+                self._requests.clear()
+            self.reconnects += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def _dispatch(self, message: dict) -> None:
+        if 'id' in message:
+            future = self._requests.pop(message['id'], None)
+            if future is not None and not future.done():
+                if 'error' in message:
+                    future.set_exception(Exception(f'subscriptions error: {message["error"]}'))
+                else:
+                    future.set_result(message.get('result'))
+            return
+        params = message.get('params')
+        if not params:
+            return
+        subscription = self._by_server_id.get(params.get('subscription'))
+        if subscription is None:
+            return
+        await subscription._put(params.get('result'))
+        if subscription.method == 'signatureSubscribe':
+            # Signature subscriptions are cancelled by the server after the first notification.
+            self._forget(subscription)
+            subscription._finish()
+
+    def _forget(self, subscription: Subscription) -> None:
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+        self._by_server_id.pop(subscription.server_id, None)
+
+    async def _send(self, ws, request_id: int, method: str, params: list) -> None:
+        try:
+            await ws.send(json.dumps({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}))
+        except websockets.ConnectionClosed as e:
+            raise ConnectionError('PubSub connection closed') from e
+
+    async def _request(self, method: str, params: list):
+        try:
+            await asyncio.wait_for(self._connected.wait(), self.connect_timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(
+                f'subscriptions error: no connection to {self.endpoint} within {self.connect_timeout} s'
+            ) from None
+        ws = self._ws
+        if ws is None:
+            raise ConnectionError('PubSub connection closed')
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._requests[request_id] = future
+        try:
+            await self._send(ws, request_id, method, params)
+        except ConnectionError:
+            self._requests.pop(request_id, None)
+            raise
+        return await future
+
+    async def _activate(self, subscription: Subscription) -> None:
+        subscription._pending = True
+        try:
+            subscription.server_id = await self._request(subscription.method, subscription.params)
+            self._by_server_id[subscription.server_id] = subscription
+        finally:
+            subscription._pending = False
+
+    async def _resubscribe(self) -> None:
+        subscriptions = [subscription for subscription in self._subscriptions if not subscription._pending]
+        results = await asyncio.gather(
+            *[self._activate(subscription) for subscription in subscriptions], return_exceptions=True
+        )
+        for subscription, result in zip(subscriptions, results):
+            if isinstance(result, Exception):
+                logger.warning('PubSub resubscribe of %r failed: %r', subscription, result)
+
+    async def _unsubscribe(self, subscription: Subscription) -> None:
+        if subscription.closed:
+            return
+        self._forget(subscription)
+        subscription._finish()
+        ws = self._ws
+        if ws is not None and subscription.server_id is not None:
+            # The response is not awaited: the reader may be blocked on a full queue of another subscription.
+            try:
+                await self._send(ws, next(self._ids), subscription.unsubscribe_method, [subscription.server_id])
+            except ConnectionError:
+                pass
+
+    async def subscribe(self, method: str, params: list, queue_size: int = None, overflow: str = None) -> Subscription:
+        """
+        Create a subscription with any PubSub ``method`` (e.g. "slotSubscribe").
+        """
+        self._ensure_running()
+        subscription = Subscription(
+            self, method, params, queue_size or self.queue_size, overflow or self.overflow
+        )
+        self._subscriptions.append(subscription)
+        try:
+            await self._activate(subscription)
+        except ConnectionError:
+            # Disconnected before the response, the subscription is sent again after reconnect.
+            pass
+        except Exception:
+            self._forget(subscription)
+            raise
+        return subscription
+
+    async def account_subscribe(
+            self,
+            account: str,
+            commitment: str = "confirmed",
+            encoding: str = "base64",
+            **kwargs,
+    ) -> Subscription:
+        """
+        Notifications on every change of account lamports or data.
+        """
+        return await self.subscribe(
+            "accountSubscribe", [account, {"commitment": commitment, "encoding": encoding}], **kwargs
+        )
+
+    async def signature_subscribe(self, signature: str, commitment: str = "confirmed", **kwargs) -> Subscription:
+        """
+        One notification when the transaction reaches ``commitment``, then the subscription ends.
+        """
+        return await self.subscribe("signatureSubscribe", [signature, {"commitment": commitment}], **kwargs)
+
+    async def logs_subscribe(self, mentions: str = None, commitment: str = "confirmed", **kwargs) -> Subscription:
+        """
+        Transaction logs of all transactions (``mentions`` is None) or of transactions mentioning an address.
+        """
+        log_filter = {"mentions": [mentions]} if mentions else "all"
+        return await self.subscribe("logsSubscribe", [log_filter, {"commitment": commitment}], **kwargs)
+
+    async def program_subscribe(
+            self,
+            program_id: str,
+            commitment: str = "confirmed",
+            encoding: str = "base64",
+            filters: list = None,
+            **kwargs,
+    ) -> Subscription:
+        """
+        Notifications on changes of accounts owned by the program.
+        """
+        config = {"commitment": commitment, "encoding": encoding}
+        if filters:
+            config["filters"] = filters
+        return await self.subscribe("programSubscribe", [program_id, config], **kwargs)
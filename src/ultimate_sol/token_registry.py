@@ -0,0 +1,187 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+from .jupiter import iter_tokens_list
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tokens (address TEXT PRIMARY KEY, symbol TEXT, data TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS tokens_symbol ON tokens (symbol);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+# Changed tokens are written to the snapshot in batches of this size while the list downloads.
+WRITE_BATCH_SIZE = 1000
+
+
+def _write_tokens(connection: sqlite3.Connection, tokens: list[dict]) -> None:
+    connection.executemany(
+        'INSERT OR REPLACE INTO tokens (address, symbol, data) VALUES (?, ?, ?)',
+        [(t['address'], (t.get('symbol') or '').upper(), json.dumps(t, separators=(',', ':'))) for t in tokens]
+    )
+
+
+class TokenRegistry:
+    """
+    Local index of the Jupiter token list with lookups by mint and by symbol.
+
+    The list is downloaded once and kept in an SQLite snapshot (if ``path`` is set), so a restarted
+    process loads it from disk instead of downloading it again. ``refresh`` only writes changed tokens.
+    """
+
+    def __init__(
+            self,
+            path: str = None,
+            list_type: str = "all",
+            banned_tokens: bool = False,
+            max_age: float = 3600,
+    ):
+        self.path = path
+        self.list_type = list_type
+        self.banned_tokens = banned_tokens
+        self.max_age = max_age
+        self.updated_at = None
+        self.last_error = None
+        self._by_mint = {}
+        self._by_symbol = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.executescript(_SCHEMA)
+        return connection
+
+    def _index(self, token: dict) -> None:
+        mint = token['address']
+        old = self._by_mint.get(mint)
+        if old is not None:
+            self._unindex_symbol(old)
+        self._by_mint[mint] = token
+        symbol = (token.get('symbol') or '').upper()
+        self._by_symbol.setdefault(symbol, []).append(token)
+
+    def _unindex_symbol(self, token: dict) -> None:
+        symbol = (token.get('symbol') or '').upper()
+        tokens = [t for t in self._by_symbol.get(symbol, []) if t['address'] != token['address']]
+        if tokens:
+            self._by_symbol[symbol] = tokens
+        else:
+            self._by_symbol.pop(symbol, None)
+
+    def load(self) -> 'TokenRegistry':
+        """
+        Load the snapshot from disk, or download the list if there is no snapshot yet.
+        """
+        if self.path and os.path.exists(self.path):
+            with closing(self._connect()) as connection, connection:
+                rows = connection.execute('SELECT data FROM tokens').fetchall()
+                updated_at = connection.execute("SELECT value FROM meta WHERE key = 'updated_at'").fetchone()
+            with self._lock:
+                self._by_mint = {}
+                self._by_symbol = {}
+                for (data,) in rows:
+                    self._index(json.loads(data))
+                self.updated_at = float(updated_at[0]) if updated_at else None
+        if not self._by_mint or self.is_stale():
+            self.refresh()
+        return self
+
+    def is_stale(self) -> bool:
+        return self.updated_at is None or time.time() - self.updated_at > self.max_age
+
+    def refresh(self) -> int:
+        """
+        Download the token list and apply the difference to the index and the snapshot as tokens arrive,
+        the snapshot is committed once the whole list is read.
+
+        :return: number of added, changed and removed tokens
+        """
+        connection = self._connect() if self.path else None
+        try:
+            seen = set()
+            changed = []
+            count = 0
+            for token in iter_tokens_list(self.list_type, self.banned_tokens):
+                seen.add(token['address'])
+                if self._by_mint.get(token['address']) == token:
+                    continue
+                with self._lock:
+                    self._index(token)
+                count += 1
+                if connection is not None:
+                    changed.append(token)
+                    if len(changed) >= WRITE_BATCH_SIZE:
+                        _write_tokens(connection, changed)
+                        changed = []
+            with self._lock:
+                removed = [mint for mint in self._by_mint if mint not in seen]
+                for mint in removed:
+                    self._unindex_symbol(self._by_mint.pop(mint))
+                self.updated_at = time.time()
+
+            if connection is not None:
+                _write_tokens(connection, changed)
+                connection.executemany('DELETE FROM tokens WHERE address = ?', [(mint,) for mint in removed])
+                connection.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('updated_at', ?)", (str(self.updated_at),)
+                )
+                connection.commit()
+        finally:
+            if connection is not None:
+                connection.close()
+        return count + len(removed)
+
+    def start_background_refresh(self, interval: float = None) -> None:
+        """
+        Refresh the registry every ``interval`` seconds (``max_age`` by default) in a daemon thread.
+        A failed refresh is logged and kept in ``last_error`` until a refresh succeeds.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        interval = interval or self.max_age
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    self.refresh()
+                except Exception as e:
+                    self.last_error = e
+                    logger.warning('Token registry refresh failed: %r', e)
+                else:
+                    self.last_error = None
+
+        self._thread = threading.Thread(target=run, name='token-registry-refresh', daemon=True)
+        self._thread.start()
+
+    def stop_background_refresh(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def get(self, mint: str) -> dict | None:
+        """
+        Returns token info by mint address.
+        """
+        return self._by_mint.get(mint)
+
+    def find_by_symbol(self, symbol: str) -> list[dict]:
+        """
+        Returns all tokens with the symbol (case-insensitive).
+        """
+        return list(self._by_symbol.get(symbol.upper(), []))
+
+    def __len__(self) -> int:
+        return len(self._by_mint)
+
+    def __contains__(self, mint: str) -> bool:
+        return mint in self._by_mint
@@ -0,0 +1,257 @@
+import asyncio
+import json
+import time
+
+import httpx
+
+from . import metrics, ratelimit
+from .rpc_pool import parse_retry_after
+
+# Hosts of the third-party APIs, everything else is a Solana RPC endpoint.
+UPSTREAM_HOSTS = (
+    ('jup.ag', 'jupiter'),
+    ('dexscreener.com', 'dexscreener'),
+    ('solana.fm', 'solana_fm'),
+)
+
+
+def _upstream(host: str) -> str:
+    for suffix, name in UPSTREAM_HOSTS:
+        if host == suffix or host.endswith('.' + suffix):
+            return name
+    return 'rpc'
+
+
+def _rpc_method(request: httpx.Request) -> str:
+    try:
+        body = json.loads(request.content)
+    except (ValueError, httpx.RequestNotRead):
+        return f'{request.method} {request.url.path}'
+    if isinstance(body, list):
+        methods = sorted({call.get('method') for call in body})
+        return 'batch:' + ','.join(methods)
+    return body.get('method', 'unknown')
+
+
+def _start_record(request: httpx.Request) -> metrics.CallRecord:
+    upstream = _upstream(request.url.host)
+    if upstream == 'rpc' and request.method == 'POST':
+        method = _rpc_method(request)
+    else:
+        method = f'{request.method} {request.url.path}'
+    return metrics.CallRecord(
+        upstream,
+        f'{request.url.scheme}://{request.url.netloc.decode("ascii")}',
+        method,
+        bytes_sent=int(request.headers.get('content-length') or 0),
+        retries=metrics.get_retries(),
+    )
+
+
+class _CountingStream(httpx.SyncByteStream):
+    def __init__(self, stream, record: metrics.CallRecord, start: float):
+        self._stream = stream
+        self._record = record
+        self._start = start
+
+    def __iter__(self):
+        for chunk in self._stream:
+            self._record.bytes_received += len(chunk)
+            yield chunk
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            self._record.duration = time.perf_counter() - self._start
+            metrics.emit(self._record)
+
+
+class _AsyncCountingStream(httpx.AsyncByteStream):
+    def __init__(self, stream, record: metrics.CallRecord, start: float):
+        self._stream = stream
+        self._record = record
+        self._start = start
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            self._record.bytes_received += len(chunk)
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._record.duration = time.perf_counter() - self._start
+            metrics.emit(self._record)
+
+
+def _emit_read(response: httpx.Response, record: metrics.CallRecord, start: float) -> bool:
+    # Responses built from bytes (e.g. by ``httpx.MockTransport``) are read before they are returned,
+    # their stream is never iterated or closed again.
+    if not response.is_stream_consumed:
+        return False
+    record.bytes_received = len(response.content)
+    record.duration = time.perf_counter() - start
+    metrics.emit(record)
+    return True
+
+
+class InstrumentedTransport(httpx.BaseTransport):
+    """
+    Wraps an httpx transport and reports every request to the sinks. The SDK's shared client uses it,
+    wrap the transport of your own client (``http_client.set_client``) to instrument it too.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport):
+        self.transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if not metrics.enabled():
+            return self.transport.handle_request(request)
+        record = _start_record(request)
+        start = time.perf_counter()
+        try:
+            response = self.transport.handle_request(request)
+        except Exception as e:
+            record.duration = time.perf_counter() - start
+            record.error = type(e).__name__
+            metrics.emit(record)
+            raise
+        record.status = response.status_code
+        if not _emit_read(response, record, start):
+            response.stream = _CountingStream(response.stream, record, start)
+        return response
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+class AsyncInstrumentedTransport(httpx.AsyncBaseTransport):
+    """
+    Async version of ``InstrumentedTransport``.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if not metrics.enabled():
+            return await self.transport.handle_async_request(request)
+        record = _start_record(request)
+        start = time.perf_counter()
+        try:
+            response = await self.transport.handle_async_request(request)
+        except Exception as e:
+            record.duration = time.perf_counter() - start
+            record.error = type(e).__name__
+            metrics.emit(record)
+            raise
+        record.status = response.status_code
+        if not _emit_read(response, record, start):
+            response.stream = _AsyncCountingStream(response.stream, record, start)
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def _request_priority(request: httpx.Request) -> int:
+    try:
+        content = request.content if request.method == 'POST' else b''
+    except httpx.RequestNotRead:
+        content = b''
+    return ratelimit.request_priority(request.url.host, request.url.path, content)
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    if response.status_code != 429 and response.status_code != 503:
+        return None
+    return parse_retry_after(response.headers.get('Retry-After'))
+
+
+class SchedulingTransport(httpx.BaseTransport):
+    """
+    Wraps an httpx transport and sends every request through the limiter of its host
+    (``ratelimit.host_limiter``, if the host has one) in its priority class. Responses adapt the limiter,
+    idempotent requests failing with a connection error, HTTP 429 or 5xx are retried with jittered backoff.
+    The SDK's shared client uses it.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport):
+        self.transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        limiter = ratelimit.host_limiter(request.url.host)
+        priority = _request_priority(request)
+        retry = request.method in ratelimit.RETRY_METHODS
+        attempt = 0
+        while True:
+            if limiter is not None:
+                limiter.acquire(priority)
+            token = metrics.set_retries(metrics.get_retries() + attempt) if attempt else None
+            try:
+                response = self.transport.handle_request(request)
+            except httpx.TransportError:
+                if not retry or attempt >= ratelimit.max_retries():
+                    raise
+                delay = ratelimit.retry_delay(attempt)
+            else:
+                retry_after = _retry_after(response)
+                if limiter is not None:
+                    limiter.on_response(response.status_code, retry_after)
+                if not retry or attempt >= ratelimit.max_retries() or \
+                        response.status_code not in ratelimit.RETRY_STATUSES:
+                    return response
+                response.close()
+                delay = ratelimit.retry_delay(attempt, retry_after)
+            finally:
+                if token is not None:
+                    metrics.reset_retries(token)
+            time.sleep(delay)
+            attempt += 1
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+class AsyncSchedulingTransport(httpx.AsyncBaseTransport):
+    """
+    Async version of ``SchedulingTransport``.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        limiter = ratelimit.host_limiter(request.url.host)
+        priority = _request_priority(request)
+        retry = request.method in ratelimit.RETRY_METHODS
+        attempt = 0
+        while True:
+            if limiter is not None:
+                await limiter.acquire_async(priority)
+            token = metrics.set_retries(metrics.get_retries() + attempt) if attempt else None
+            try:
+                response = await self.transport.handle_async_request(request)
+            except httpx.TransportError:
+                if not retry or attempt >= ratelimit.max_retries():
+                    raise
+                delay = ratelimit.retry_delay(attempt)
+            else:
+                retry_after = _retry_after(response)
+                if limiter is not None:
+                    limiter.on_response(response.status_code, retry_after)
+                if not retry or attempt >= ratelimit.max_retries() or \
+                        response.status_code not in ratelimit.RETRY_STATUSES:
+                    return response
+                await response.aclose()
+                delay = ratelimit.retry_delay(attempt, retry_after)
+            finally:
+                if token is not None:
+                    metrics.reset_retries(token)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
@@ -0,0 +1,219 @@
+import base64
+import json
+import struct
+
+import httpx
+import pytest
+from solders.keypair import Keypair
+from solders.pubkey import Pubkey
+
+from ultimate_sol import http_client
+from ultimate_sol.cache import TTLCache, get_token_cache, set_token_cache
+
+
+class FakeClock:
+    """
+    Time source for ``EndpointPool``: it only moves when something sleeps or advances it.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    async def async_sleep(self, seconds: float) -> None:
+        self.sleep(seconds)
+
+
+class RpcServers:
+    """
+    Mock JSON-RPC servers keyed by host: ``servers.add('a.rpc', handler)`` where ``handler(method, params)``
+    returns the ``result`` or an ``httpx.Response``. Every received call is kept in ``calls``.
+    """
+
+    def __init__(self):
+        self.handlers = {}
+        self.calls = []
+
+    def add(self, host: str, handler) -> str:
+        self.handlers[host] = handler
+        return f'http://{host}/'
+
+    def _call(self, host: str, body: dict):
+        self.calls.append((host, body['method']))
+        result = self.handlers[host](body['method'], body.get('params'))
+        if isinstance(result, httpx.Response):
+            return result
+        return {"jsonrpc": "2.0", "id": body['id'], "result": result}
+
+    def _respond(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        if isinstance(body, list):
+            # Batch answers come back in reverse order, servers don't have to keep the order of the calls.
+            return httpx.Response(200, json=[self._call(request.url.host, call) for call in reversed(body)])
+        result = self._call(request.url.host, body)
+        return result if isinstance(result, httpx.Response) else httpx.Response(200, json=result)
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        return self._respond(request)
+
+    async def handle_async(self, request: httpx.Request) -> httpx.Response:
+        return self._respond(request)
+
+    def install_async(self) -> None:
+        # Call from inside the running event loop, the shared async client is bound to it.
+        http_client.set_async_client(httpx.AsyncClient(transport=httpx.MockTransport(self.handle_async)))
+
+    def hosts(self) -> list[str]:
+        return [host for host, _ in self.calls]
+
+
+class ApiServers:
+    """
+    Mock HTTP APIs keyed by host: ``servers.add('api.jup.ag', handler)`` where ``handler(request)`` returns
+    the JSON body or an ``httpx.Response``. Every received request is kept in ``requests``.
+    """
+
+    def __init__(self):
+        self.handlers = {}
+        self.requests = []
+
+    def add(self, host: str, handler) -> None:
+        self.handlers[host] = handler
+
+    def _respond(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        result = self.handlers[request.url.host](request)
+        return result if isinstance(result, httpx.Response) else httpx.Response(200, json=result)
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        return self._respond(request)
+
+    async def handle_async(self, request: httpx.Request) -> httpx.Response:
+        return self._respond(request)
+
+    def install_async(self) -> None:
+        http_client.set_async_client(httpx.AsyncClient(transport=httpx.MockTransport(self.handle_async)))
+
+
+TOKEN_PROGRAM = 'TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA'
+TOKEN_2022_PROGRAM = 'TokenzQdBNbLqP5VEhdkAS6EPFLC1PHnBqCXEpPxuEb'
+METADATA_PROGRAM = 'metaqbxxUerdq28cj1RbAWkYQm3ybzjb6a8bt518x1s'
+
+
+class FakeChain:
+    """
+    Accounts of a fake cluster: ``servers.add('main.rpc', chain.handle)`` serves them with
+    ``getAccountInfo``, ``getMultipleAccounts`` and ``getTokenAccountsByOwner`` (base64, with ``dataSlice``).
+    """
+
+    def __init__(self):
+        self.accounts = {}
+
+    @staticmethod
+    def address() -> str:
+        return str(Keypair().pubkey())
+
+    @staticmethod
+    def mint_data(decimals: int, initialized: bool = True) -> bytes:
+        return bytes(36) + (10 ** 9).to_bytes(8, 'little') + bytes([decimals, initialized]) + bytes(36)
+
+    @staticmethod
+    def token_account_data(mint: str, owner: str, amount: int) -> bytes:
+        return bytes(Pubkey.from_string(mint)) + bytes(Pubkey.from_string(owner)) + amount.to_bytes(8, 'little') \
+            + bytes([0] * 36) + bytes([1]) + bytes(56)
+
+    @staticmethod
+    def metadata_data(mint: str, symbol: str, name: str = '', is_mutable: bool = True) -> bytes:
+        data = bytes([4]) + bytes(32) + bytes(Pubkey.from_string(mint))
+        for value in (name, symbol, ''):
+            data += struct.pack('<I', len(value)) + value.encode()
+        return data + struct.pack('<H', 0) + bytes([0, 0, is_mutable])
+
+    def add(self, owner: str, data: bytes, address: str = None) -> str:
+        address = address or self.address()
+        self.accounts[address] = (owner, data)
+        return address
+
+    def add_mint(self, decimals: int = 6, symbol: str = None, program: str = TOKEN_PROGRAM) -> str:
+        mint = self.add(program, self.mint_data(decimals))
+        if symbol is not None:
+            from ultimate_sol.metadata import get_metadata_account
+            self.add(METADATA_PROGRAM, self.metadata_data(mint, symbol), str(get_metadata_account(mint)))
+        return mint
+
+    def add_token_account(self, owner: str, mint: str, amount: int, program: str = TOKEN_PROGRAM) -> str:
+        return self.add(program, self.token_account_data(mint, owner, amount))
+
+    def _account(self, address: str, config: dict) -> dict | None:
+        if address not in self.accounts:
+            return None
+        owner, data = self.accounts[address]
+        data_slice = config.get('dataSlice')
+        if data_slice:
+            data = data[data_slice['offset']:][:data_slice['length']]
+        return {"data": [base64.b64encode(data).decode(), 'base64'], "owner": owner, "lamports": 1461600,
+                "executable": False, "rentEpoch": 0, "space": len(self.accounts[address][1])}
+
+    def handle(self, method: str, params: list):
+        config = (params[1:] or [{}])[-1]
+        context = {"slot": 1}
+        if method == 'getAccountInfo':
+            return {"context": context, "value": self._account(params[0], config)}
+        if method == 'getMultipleAccounts':
+            return {"context": context, "value": [self._account(address, config) for address in params[0]]}
+        if method == 'getTokenAccountsByOwner':
+            owner = bytes(Pubkey.from_string(params[0]))
+            return {"context": context, "value": [
+                {"pubkey": address, "account": self._account(address, config)}
+                for address, (program, data) in self.accounts.items()
+                if program == params[1]['programId'] and data[32:64] == owner
+            ]}
+        raise AssertionError(f'unexpected RPC method {method}')
+
+
+@pytest.fixture
+def chain() -> FakeChain:
+    return FakeChain()
+
+
+@pytest.fixture(autouse=True)
+def token_cache() -> TTLCache:
+    # Every test starts with an empty token cache, so warm entries of one test can't hide misses in another.
+    saved = get_token_cache()
+    cache = TTLCache()
+    set_token_cache(cache)
+    yield cache
+    set_token_cache(saved)
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+def _serve(servers):
+    saved = http_client._client, http_client._unbound_async_client
+    http_client.set_client(httpx.Client(transport=httpx.MockTransport(servers.handle)))
+    yield servers
+    http_client._client.close()
+    http_client._client, http_client._unbound_async_client = saved
+
+
+@pytest.fixture
+def rpc_servers():
+    yield from _serve(RpcServers())
+
+
+@pytest.fixture
+def api_servers():
+    yield from _serve(ApiServers())
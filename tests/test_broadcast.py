@@ -0,0 +1,174 @@
+import asyncio
+import base64
+import threading
+
+import httpx
+import pytest
+from solders.hash import Hash
+from solders.keypair import Keypair
+from solders.message import MessageV0
+from solders.transaction import VersionedTransaction
+
+from ultimate_sol import http_client
+from ultimate_sol.sol import AsyncSolClient, SolClient
+
+
+@pytest.fixture
+def sender() -> Keypair:
+    return Keypair()
+
+
+@pytest.fixture
+def tx(sender) -> str:
+    msg = MessageV0.try_compile(sender.pubkey(), [], [], Hash.default())
+    return base64.b64encode(bytes(VersionedTransaction(msg, [sender]))).decode()
+
+
+def _signature(params: list) -> str:
+    return str(VersionedTransaction.from_bytes(base64.b64decode(params[0])).signatures[0])
+
+
+def _signed_by(tx: str) -> str:
+    # ``tx`` is already signed by the sender, signing it again gives the same signature.
+    return _signature([tx])
+
+
+def _accept(method, params):
+    return _signature(params)
+
+
+def _reject(method, params):
+    return httpx.Response(200, json={"jsonrpc": "2.0", "id": 1, "error": {"code": -32002, "message": "rejected"}})
+
+
+def test_broadcast_returns_first_accepted_response(rpc_servers, sender, tx):
+    sent = []
+    rejected = threading.Event()
+
+    def reject(method, params):
+        sent.append(params[0])
+        rejected.set()
+        return httpx.Response(503)
+
+    def accept(method, params):
+        # Answer after the other endpoint, its error must not end the broadcast.
+        rejected.wait(5)
+        sent.append(params[0])
+        return _signature(params)
+
+    endpoints = [rpc_servers.add('a.rpc', reject), rpc_servers.add('b.rpc', accept)]
+    client = SolClient(endpoints)
+
+    response = client.broadcast_tx(tx, sender)
+
+    # The transaction is signed once and the same bytes go to every endpoint.
+    assert len(sent) == 2 and sent[0] == sent[1]
+    assert response["result"] == _signature(sent) == _signed_by(tx)
+    assert all(method == 'sendTransaction' for _, method in rpc_servers.calls)
+    stats = client.send_stats[endpoints[1]]
+    assert (stats.sent, stats.accepted, stats.errors) == (1, 1, 0)
+    assert stats.last_latency is not None
+
+
+def test_broadcast_maps_errors_of_every_endpoint(rpc_servers, sender, tx):
+    endpoints = [rpc_servers.add('a.rpc', _reject), rpc_servers.add('b.rpc', lambda m, p: httpx.Response(500))]
+    client = SolClient(endpoints[:1], send_endpoints=endpoints)
+
+    with pytest.raises(Exception, match='sol.broadcast_tx error') as error:
+        client.broadcast_tx(tx, sender)
+
+    assert 'rejected' in str(error.value) and '500' in str(error.value)
+    assert {url: stats.errors for url, stats in client.send_stats.items()} == {endpoints[0]: 1, endpoints[1]: 1}
+    assert all(stats.avg_latency is None for stats in client.send_stats.values())
+
+
+def test_send_tx_fails_over_to_the_next_endpoint(rpc_servers, sender, tx):
+    endpoints = [rpc_servers.add('a.rpc', lambda m, p: httpx.Response(429)), rpc_servers.add('b.rpc', _accept)]
+    client = SolClient(endpoints)
+
+    response = client.send_tx(tx, sender)
+
+    assert rpc_servers.hosts() == ['a.rpc', 'b.rpc']
+    assert response["result"] == _signed_by(tx)
+    assert client.send_stats[endpoints[0]].errors == 1
+    assert client.send_stats[endpoints[1]].accepted == 1
+    assert client.pool.stats()[endpoints[0]]["rate_limited"] == 1
+
+
+def test_async_broadcast_returns_first_accepted_response(rpc_servers, sender, tx):
+    endpoints = [rpc_servers.add('a.rpc', _reject), rpc_servers.add('b.rpc', _accept)]
+
+    async def main():
+        rpc_servers.install_async()
+        try:
+            client = AsyncSolClient(endpoints)
+            response = await client.broadcast_tx(tx, sender)
+            await asyncio.sleep(0)
+            return client, response
+        finally:
+            await http_client.aclose()
+
+    client, response = asyncio.run(main())
+
+    assert response["result"] == _signed_by(tx)
+    assert client.send_stats[endpoints[1]].accepted == 1
+
+
+def _new_tx(sender: Keypair) -> str:
+    msg = MessageV0.try_compile(sender.pubkey(), [], [], Hash.new_unique())
+    return base64.b64encode(bytes(VersionedTransaction(msg, [sender]))).decode()
+
+
+def _fail_build():
+    raise Exception('no route')
+
+
+def _send_many_api(rejected: str):
+    def handle(method, params):
+        if _signature(params) == _signed_by(rejected):
+            return _reject(method, params)
+        return _signature(params)
+    return handle
+
+
+@pytest.mark.parametrize('sign_processes', [None, 2])
+def test_send_many_keeps_order_and_maps_errors(rpc_servers, sender, sign_processes):
+    txs = [_new_tx(sender) for _ in range(4)]
+    client = SolClient(rpc_servers.add('a.rpc', _send_many_api(txs[3])))
+
+    report = client.send_many([txs[0], lambda: txs[1], _fail_build, 'bm90IGEgdHg=', txs[2], txs[3]], sender,
+                              max_workers=4, sign_processes=sign_processes)
+
+    results = report["results"]
+    assert [result["signature"] for result in results] == [_signed_by(txs[0]), _signed_by(txs[1]), None, None,
+                                                           _signed_by(txs[2]), None]
+    assert str(results[2]["error"]) == 'no route'
+    assert results[3]["error"] is not None and results[3]["response"] is None
+    assert 'rejected' in str(results[5]["error"]) and results[5]["response"]["error"]["code"] == -32002
+    assert results[1]["timings"]["build"] > 0 and results[0]["timings"]["submit"] > 0
+    assert set(report["timings"]) == {"build", "sign", "submit", "total"}
+    assert rpc_servers.calls == [('a.rpc', 'sendTransaction')] * 4
+
+
+def test_async_send_many_awaits_builders(rpc_servers, sender):
+    txs = [_new_tx(sender) for _ in range(3)]
+
+    async def build(tx: str) -> str:
+        await asyncio.sleep(0)
+        return tx
+
+    async def fail_build():
+        raise Exception('no route')
+
+    async def main():
+        rpc_servers.install_async()
+        client = AsyncSolClient(rpc_servers.add('a.rpc', _send_many_api(txs[2])))
+        try:
+            return await client.send_many([lambda: build(txs[0]), fail_build, txs[1], txs[2]], sender, max_workers=2)
+        finally:
+            await http_client.aclose()
+
+    results = asyncio.run(main())["results"]
+
+    assert [result["signature"] for result in results] == [_signed_by(txs[0]), None, _signed_by(txs[1]), None]
+    assert str(results[1]["error"]) == 'no route' and 'rejected' in str(results[3]["error"])
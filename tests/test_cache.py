@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from ultimate_sol.cache import LRUCache, TTLCache
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+
+    assert 'b' not in cache
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.get('b', 'missing') == 'missing'
+    assert cache.stats() == {"hits": 3, "misses": 1, "hit_rate": 0.75, "size": 2, "maxsize": 2}
+
+    cache.invalidate('a')
+    assert len(cache) == 1
+    cache.clear()
+    assert len(cache) == 0 and cache.stats()["hits"] == 0
+
+
+def test_ttl_cache_expires_entries_per_kind(clock):
+    cache = TTLCache(maxsize=10, ttls={"symbol": 10}, negative_ttl=5, clock=clock)
+    cache.store('symbol', 'A', 'USDC')
+    cache.store('symbol', 'B', None)
+    cache.store('decimals', 'A', 6)
+    cache.store('decimals', 'A', 9, scope='devnet')
+
+    clock.advance(5)
+    assert cache.lookup('symbol', 'A') == (True, 'USDC')
+    assert cache.lookup('symbol', 'B') == (False, None)
+    clock.advance(5)
+    assert cache.lookup('symbol', 'A') == (False, None)
+    clock.advance(10 ** 6)
+    assert cache.lookup('decimals', 'A') == (True, 6)
+    assert cache.lookup('decimals', 'A', 'devnet') == (True, 9)
+
+    cache.invalidate('decimals', scope='devnet')
+    assert cache.lookup('decimals', 'A', 'devnet') == (False, None)
+    assert len(cache) == 1
+    stats = cache.stats()
+    assert stats["kinds"]["symbol"] == {"hits": 1, "misses": 2, "hit_rate": 1 / 3}
+    assert (stats["hits"], stats["misses"], stats["size"]) == (3, 3, 1)
+
+
+def test_ttl_cache_is_bounded_and_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2)
+    cache.store('symbol', 'A', 'a')
+    cache.store('symbol', 'B', 'b')
+    cache.lookup('symbol', 'A')
+    cache.store('symbol', 'C', 'c')
+    assert [cache.lookup('symbol', key)[0] for key in 'ABC'] == [True, False, True]
+
+
+def test_ttl_cache_loads_once_and_does_not_cache_errors():
+    cache = TTLCache()
+    loads = []
+
+    def load():
+        loads.append(1)
+        if len(loads) == 1:
+            raise Exception('boom')
+        return 'USDC'
+
+    with pytest.raises(Exception):
+        cache.get_or_load('symbol', 'A', load)
+    assert cache.get_or_load('symbol', 'A', load) == 'USDC'
+    assert cache.get_or_load('symbol', 'A', load) == 'USDC'
+
+    async def load_async():
+        loads.append(1)
+        return 'BONK'
+
+    assert asyncio.run(cache.get_or_load_async('symbol', 'B', load_async)) == 'BONK'
+    assert asyncio.run(cache.get_or_load_async('symbol', 'B', load_async)) == 'BONK'
+    assert len(loads) == 3
@@ -0,0 +1,93 @@
+import asyncio
+
+import httpx
+
+from ultimate_sol.confirmation import ConfirmationTracker
+
+
+def _status(confirmation_status: str, err=None) -> dict:
+    return {"slot": 7, "confirmations": None, "err": err, "confirmationStatus": confirmation_status}
+
+
+class FakeCluster:
+    def __init__(self):
+        self.statuses = {}
+        self.block_height = 100
+        self.failing = False
+
+    def handle(self, method: str, params: list):
+        if self.failing:
+            return httpx.Response(503)
+        if method == 'getBlockHeight':
+            return self.block_height
+        return {"context": {"slot": 7}, "value": [self.statuses.get(signature) for signature in params[0]]}
+
+
+def _tracker(rpc_servers, cluster: FakeCluster, **kwargs) -> ConfirmationTracker:
+    return ConfirmationTracker(rpc_servers.add('main.rpc', cluster.handle), min_interval=0.001,
+                               max_interval=0.001, **kwargs)
+
+
+def test_transactions_resolve_by_status_and_block_height(rpc_servers):
+    cluster = FakeCluster()
+    cluster.statuses = {'ok': _status('processed'), 'bad': _status('confirmed', {"InstructionError": [0, 1]})}
+    resolved = []
+
+    async def main():
+        rpc_servers.install_async()
+        tracker = _tracker(rpc_servers, cluster)
+        futures = [
+            tracker.track('ok', callback=resolved.append),
+            tracker.track('bad'),
+            tracker.track('lost', last_valid_block_height=150),
+        ]
+        bad = await asyncio.wait_for(futures[1], 1)
+        assert not futures[0].done() and not futures[2].done()
+        cluster.statuses['ok'] = _status('confirmed')
+        cluster.block_height = 151
+        results = await asyncio.wait_for(asyncio.gather(*futures), 1)
+        await tracker.close()
+        return bad, results, len(tracker)
+
+    bad, (ok, _, lost), pending = asyncio.run(main())
+
+    assert (bad.status, bad.err) == ('failed', {"InstructionError": [0, 1]})
+    assert (ok.status, ok.commitment, ok.slot) == ('confirmed', 'confirmed', 7)
+    assert lost.status == 'expired'
+    assert resolved == [ok] and pending == 0
+
+
+def test_deadline_expires_transactions_while_rpc_fails(rpc_servers, clock):
+    cluster = FakeCluster()
+    cluster.failing = True
+
+    async def main():
+        rpc_servers.install_async()
+        tracker = _tracker(rpc_servers, cluster, timeout=5, clock=clock)
+        future = tracker.track('sig')
+        await asyncio.sleep(0.02)
+        assert not future.done()
+        clock.advance(6)
+        return await asyncio.wait_for(future, 1)
+
+    assert asyncio.run(main()).status == 'expired'
+    assert len(rpc_servers.calls) > 1
+
+
+def test_tracking_a_signature_twice_calls_both_callbacks(rpc_servers):
+    cluster = FakeCluster()
+    first, second = [], []
+
+    async def main():
+        rpc_servers.install_async()
+        tracker = _tracker(rpc_servers, cluster)
+        future = tracker.track('sig', callback=first.append)
+        assert tracker.track('sig', callback=second.append) is future
+        assert tracker.track('sig') is future and len(tracker) == 1
+        cluster.statuses['sig'] = _status('finalized')
+        return await asyncio.wait_for(future, 1)
+
+    confirmation = asyncio.run(main())
+
+    assert confirmation.status == 'confirmed'
+    assert first == second == [confirmation]
@@ -0,0 +1,63 @@
+import asyncio
+
+import httpx
+
+from ultimate_sol import dexscreener
+from ultimate_sol.dexscreener import SOL_ADDRESS
+
+
+def _pair(base: str, quote: str) -> dict:
+    return {"baseToken": {"address": base}, "quoteToken": {"address": quote}, "priceUsd": '1.5', "labels": ['v4']}
+
+
+def _tokens_api(request: httpx.Request):
+    addresses = request.url.path.rsplit('/', 1)[-1].split(',')
+    if 'broken' in addresses:
+        return httpx.Response(500, json={"error": 'internal'})
+    pairs = [_pair(address, SOL_ADDRESS) for address in addresses if address.startswith('T')]
+    pairs += [_pair(SOL_ADDRESS, address) for address in addresses if address.startswith('Q')]
+    return {"schemaVersion": '1.0.0', "pairs": pairs}
+
+
+def _chunks(api_servers) -> list[list[str]]:
+    return [request.url.path.rsplit('/', 1)[-1].split(',') for request in api_servers.requests]
+
+
+def test_profiles_are_requested_in_chunks_of_30_and_cached(api_servers):
+    api_servers.add('api.dexscreener.com', _tokens_api)
+    addresses = [f'T{i}' for i in range(20)] + ['broken'] + [f'T{i}' for i in range(20, 58)] + ['Q0', 'unknown', 'T0']
+
+    profiles = dexscreener.get_token_profiles(addresses)
+
+    assert sorted(len(chunk) for chunk in _chunks(api_servers)) == [1, 30, 30]
+    assert list(profiles) == addresses[:-1]
+    assert profiles['T45']["baseToken"]["address"] == 'T45'
+    assert profiles['Q0']["quoteToken"]["address"] == 'Q0'
+    assert profiles['unknown'] is None
+    # Only the chunk with the failed request is mapped to the error.
+    chunk = next(chunk for chunk in _chunks(api_servers) if 'broken' in chunk)
+    assert all(isinstance(profiles[address], Exception) for address in chunk)
+    assert sum(isinstance(profile, Exception) for profile in profiles.values()) == 30
+    assert 'dexscreener.get_token_profiles error' in str(profiles['broken'])
+
+    # Profiles (and unknown tokens) are served from the cache, failed addresses are requested again.
+    dexscreener.get_token_profiles(addresses)
+    assert sorted(_chunks(api_servers)[3]) == sorted(chunk)
+
+
+def test_cached_profiles_are_copied_for_every_caller(api_servers, token_cache):
+    api_servers.add('api.dexscreener.com', _tokens_api)
+
+    dexscreener.get_token_profiles(['T1'])['T1']["labels"].append('evil')
+
+    async def main():
+        api_servers.install_async()
+        profiles = await dexscreener.get_token_profiles_async(['T1', 'T2'])
+        profiles['T2']["priceUsd"] = '0'
+        return await dexscreener.get_token_profiles_async(['T1', 'T2'])
+
+    profiles = asyncio.run(main())
+
+    assert profiles['T1'] == _pair('T1', SOL_ADDRESS) and profiles['T2'] == _pair('T2', SOL_ADDRESS)
+    assert _chunks(api_servers) == [['T1'], ['T2']]
+    assert token_cache.stats()["kinds"]["dexscreener_profile"]["hits"] == 3
@@ -0,0 +1,32 @@
+import asyncio
+
+import httpx
+
+from ultimate_sol import http_client
+
+
+async def _shared_client() -> httpx.AsyncClient:
+    client = http_client.get_async_client()
+    assert http_client.get_async_client() is client
+    return client
+
+
+def test_every_event_loop_gets_a_client_closed_with_the_loop():
+    clients = [asyncio.run(_shared_client()) for _ in range(3)]
+
+    assert len({id(client) for client in clients}) == 3
+    assert all(client.is_closed for client in clients)
+    assert len(http_client._async_clients) == 0
+
+
+def test_set_async_client_is_used_on_its_loop_and_closed_with_it():
+    own = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, json=1)))
+
+    async def main():
+        http_client.set_async_client(own)
+        replaced = http_client.get_async_client()
+        assert replaced is own
+        return (await replaced.get('http://rpc.example/')).json()
+
+    assert asyncio.run(main()) == 1
+    assert own.is_closed
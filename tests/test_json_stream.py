@@ -0,0 +1,60 @@
+import asyncio
+import json
+
+import pytest
+
+from ultimate_sol.json_stream import ArrayParser, iter_array, iter_array_async
+
+BODY = '[ {"symbol": "BONK", "tags": ["a,b", "]"]}, 12.5, -3e2, "caf\\u00e9 ☕", [], {}, true, null,\n 7 ]'.encode()
+
+
+def _parse(chunks) -> list:
+    parser = ArrayParser()
+    items = []
+    for chunk in chunks:
+        items.extend(parser.feed(chunk))
+    return items + parser.close()
+
+
+def _split(body: bytes, size: int) -> list[bytes]:
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 7, len(BODY)])
+def test_elements_split_across_chunks(size):
+    assert _parse(_split(BODY, size)) == json.loads(BODY)
+
+
+def test_every_split_point():
+    for i in range(len(BODY)):
+        assert _parse([BODY[:i], BODY[i:]]) == json.loads(BODY), i
+
+
+def test_numbers_are_complete_only_after_a_delimiter():
+    parser = ArrayParser()
+    assert parser.feed(b'[1, 12') == [1]
+    items = [item for chunk in (b'.', b'5', b' ,', b'3') for item in parser.feed(chunk)]
+    assert items + parser.feed(b']') + parser.close() == [12.5, 3]
+
+
+@pytest.mark.parametrize('body', [
+    '[{"a": 1}{"b": 2}]', '[1,,2]', '[1,]', '[,1]', '[1 2]', '[,]', '["a" "b"]',
+    '[1, 2', '[1] 2', '{"error": "rate limited"}', '',
+])
+@pytest.mark.parametrize('size', [1, 100])
+def test_malformed_arrays_are_rejected(body, size):
+    with pytest.raises(ValueError):
+        _parse(_split(body.encode(), size))
+
+
+def test_iter_array_selects_fields():
+    chunks = _split(b'[{"a": 1, "b": 2}, {"a": 3}, {"a": 5, "b": 6}]', 4)
+    assert list(iter_array(chunks, fields=('b',), where=lambda item: item['a'] > 1)) == [{"b": None}, {"b": 6}]
+
+    async def read():
+        async def stream():
+            for chunk in chunks:
+                yield chunk
+        return [item async for item in iter_array_async(stream(), fields=('a',))]
+
+    assert asyncio.run(read()) == [{"a": 1}, {"a": 3}, {"a": 5}]
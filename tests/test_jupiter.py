@@ -0,0 +1,213 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+from solders.keypair import Keypair
+
+from ultimate_sol import jupiter
+from ultimate_sol.singleflight import AsyncSingleFlight, SingleFlight
+
+SOL = 'So11111111111111111111111111111111111111112'
+USDC = 'EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v'
+
+
+def test_token_info_is_copied_for_every_caller(api_servers, token_cache):
+    api_servers.add('tokens.jup.ag', lambda request: {"address": 'A', "symbol": 'USDC', "tags": ['verified']})
+
+    info = jupiter.get_token_info('A')
+    info["symbol"] = 'EVIL'
+    info["tags"].append('strict')
+
+    assert jupiter.get_token_info('A') == {"address": 'A', "symbol": 'USDC', "tags": ['verified']}
+
+    async def main():
+        api_servers.install_async()
+        cached = await jupiter.get_token_info_async('A')
+        cached["tags"].clear()
+        return await jupiter.get_token_info_async('A')
+
+    assert asyncio.run(main())["tags"] == ['verified']
+    assert len(api_servers.requests) == 1
+    assert token_cache.stats()["kinds"]["token_info"]["hits"] == 3
+
+
+def test_registry_token_info_is_copied(monkeypatch):
+    token = {"address": 'A', "symbol": 'USDC', "tags": ['verified']}
+    monkeypatch.setattr(jupiter, '_token_registry', {'A': token})
+
+    jupiter.get_token_info('A')["tags"].append('strict')
+    asyncio.run(jupiter.get_token_info_async('A'))["symbol"] = 'EVIL'
+
+    assert token == {"address": 'A', "symbol": 'USDC', "tags": ['verified']}
+
+
+def _price_api(prices: dict, failing: set = frozenset()):
+    def handler(request):
+        ids = request.url.params['ids'].split(',')
+        if failing & set(ids):
+            return httpx.Response(500, json={"error": 'internal'})
+        return {"data": {mint: {"id": mint, "price": str(prices[mint])} for mint in ids if mint in prices}}
+    return handler
+
+
+def _ids(api_servers) -> list[list[str]]:
+    return [request.url.params['ids'].split(',') for request in api_servers.requests]
+
+
+def test_token_prices_map_failed_batches_and_missing_prices_to_errors(api_servers):
+    api_servers.add('price.jup.ag', _price_api({'A': 1.5, 'B': 2, 'D': 4, 'E': 5}, failing={'C'}))
+
+    prices = jupiter.get_token_prices(['A', 'B', 'A', 'C', 'D', 'E', 'F'], batch_size=2)
+
+    assert sorted(_ids(api_servers)) == [['A', 'B'], ['C', 'D'], ['E', 'F']]
+    assert {mint: prices[mint] for mint in 'ABE'} == {'A': 1.5, 'B': 2.0, 'E': 5.0}
+    assert '500' in str(prices['C']) and prices['C'] is prices['D']
+    assert str(prices['F']) == 'jupiter.get_token_prices error: no price for F'
+    assert jupiter.get_token_prices([]) == {}
+
+    async def main():
+        api_servers.install_async()
+        return await jupiter.get_token_prices_async(['A', 'C', 'E'], batch_size=500)
+
+    prices = asyncio.run(main())
+    assert _ids(api_servers)[-1] == ['A', 'C', 'E']
+    assert all(isinstance(price, Exception) for price in prices.values())
+
+
+def test_price_batcher_answers_concurrent_requests_with_one_call(api_servers):
+    api_servers.add('price.jup.ag', _price_api({'A': 1, 'B': 2, 'C': 3}))
+
+    async def main():
+        api_servers.install_async()
+        batcher = jupiter.PriceBatcher(vs_token='USDC', delay=0.01)
+        first = await asyncio.gather(
+            batcher.get_price('A'), batcher.get_price('B'), batcher.get_price('A'), batcher.get_price('X'),
+            return_exceptions=True,
+        )
+        full = jupiter.PriceBatcher(delay=60, batch_size=2)
+        second = await asyncio.wait_for(asyncio.gather(full.get_price('B'), full.get_price('C')), 1)
+        return first, second
+
+    first, second = asyncio.run(main())
+
+    assert first[:3] == [1.0, 2.0, 1.0]
+    assert str(first[3]) == 'jupiter.get_token_prices error: no price for X'
+    assert second == [2.0, 3.0]
+    assert _ids(api_servers) == [['A', 'B', 'X'], ['B', 'C']]
+    assert api_servers.requests[0].url.params['vsToken'] == 'USDC'
+
+
+@pytest.fixture
+def quotes(monkeypatch, clock):
+    flights = SingleFlight(clock=clock), AsyncSingleFlight(clock=clock)
+    monkeypatch.setattr(jupiter, '_quotes', flights[0])
+    monkeypatch.setattr(jupiter, '_quotes_async', flights[1])
+    return flights
+
+
+def _quote_api(impacts: dict = None, wait=None):
+    def handler(request):
+        if wait is not None:
+            wait()
+        amount = int(request.url.params['amount'])
+        impact = (impacts or {}).get(amount, 0.001)
+        if isinstance(impact, httpx.Response):
+            return impact
+        return {"inAmount": str(amount), "outAmount": str(amount * 150), "priceImpactPct": str(impact),
+                "routePlan": [{"swapInfo": {"label": 'Raydium'}}, {"swapInfo": {"label": 'Orca'}}]}
+    return handler
+
+
+def test_coalesced_quotes_are_copied_for_every_caller(api_servers, quotes, clock):
+    flight, flight_async = quotes
+
+    def wait_for_followers():
+        deadline = time.monotonic() + 5
+        while flight.shared < 2 and time.monotonic() < deadline:
+            time.sleep(0.001)
+
+    api_servers.add('quote-api.jup.ag', _quote_api(wait=wait_for_followers))
+    jup = jupiter.Jupiter(Keypair(), quote_ttl=5)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(jup.quote(SOL, USDC, 10))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(api_servers.requests) == 1 and flight.shared == 2
+    assert results[0] == results[1] == results[2]
+    assert len({id(quote) for quote in results}) == 3
+    results[0]["routePlan"].clear()
+    assert len(results[1]["routePlan"]) == 2
+
+    # Within the TTL later calls reuse the quote, each one getting its own copy.
+    cached = jup.quote(SOL, USDC, 10)
+    assert cached == results[1] and len(api_servers.requests) == 1
+    cached["outAmount"] = '0'
+    clock.advance(5)
+    assert jup.quote(SOL, USDC, 10)["outAmount"] == '1500'
+    assert len(api_servers.requests) == 2
+
+
+def test_coalesced_async_quotes_are_copied_for_every_caller(api_servers, quotes, clock):
+    _, flight = quotes
+    api_servers.add('quote-api.jup.ag', _quote_api())
+    jup = jupiter.AsyncJupiter(Keypair(), quote_ttl=5)
+
+    async def main():
+        api_servers.install_async()
+        first = await asyncio.gather(*[jup.quote(SOL, USDC, 10) for _ in range(3)])
+        first[0]["routePlan"][0]["swapInfo"]["label"] = 'Evil'
+        cached = await jup.quote(SOL, USDC, 10)
+        clock.advance(5)
+        return first, cached, await jup.quote(SOL, USDC, 10)
+
+    first, cached, fresh = asyncio.run(main())
+
+    assert (flight.calls, flight.shared) == (2, 3)
+    assert first[1] == first[2] == cached == fresh
+    assert first[1] is not first[2] and cached["routePlan"][0]["swapInfo"]["label"] == 'Raydium'
+    assert len(api_servers.requests) == 2
+
+
+def test_quote_ladder_stops_at_price_impact(api_servers, quotes):
+    impacts = {2: httpx.Response(400, json={"error": 'no route'}), 3: 0.05}
+    # Slow enough quotes for the ladder to cancel the ones which haven't started yet.
+    api_servers.add('quote-api.jup.ag', _quote_api(impacts, wait=lambda: time.sleep(0.01)))
+    jup = jupiter.Jupiter(Keypair())
+
+    ladder = jup.quote_ladder(SOL, USDC, list(range(10, 0, -1)) + [1], max_price_impact=0.02, concurrency=1)
+
+    assert list(ladder.amounts) == [1, 2, 3] and ladder.stopped
+    assert ladder[0] == (1, 150, 150.0, 0.001, 'Raydium > Orca')
+    assert list(ladder.errors) == [2] and 'jupiter.quote_ladder error' in str(ladder.errors[2])
+    assert ladder.price_impacts[2] == 0.05
+    assert len(api_servers.requests) < 10
+
+    full = jup.quote_ladder(SOL, USDC, [1, 3], concurrency=8)
+    assert list(full.amounts) == [1, 3] and not full.stopped
+
+
+def test_async_quote_ladder_stops_at_price_impact(api_servers, quotes):
+    api_servers.add('quote-api.jup.ag', _quote_api({3: 0.05}))
+    jup = jupiter.AsyncJupiter(Keypair())
+
+    async def main():
+        api_servers.install_async()
+        return await jup.quote_ladder(SOL, USDC, list(range(1, 11)), max_price_impact=0.02, concurrency=2)
+
+    ladder = asyncio.run(main())
+
+    assert list(ladder.amounts) == [1, 2, 3] and ladder.stopped and not ladder.errors
+    assert ladder.to_dict()["out_amounts"] == [150, 300, 450]
+    assert len(api_servers.requests) <= 5
+
+
+def test_quote_ladder_needs_concurrency():
+    with pytest.raises(ValueError, match='concurrency must be at least 1'):
+        jupiter.Jupiter(Keypair()).quote_ladder(SOL, USDC, [1], concurrency=0)
+    with pytest.raises(ValueError, match='concurrency must be at least 1'):
+        asyncio.run(jupiter.AsyncJupiter(Keypair()).quote_ladder(SOL, USDC, [1], concurrency=0))
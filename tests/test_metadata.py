@@ -0,0 +1,95 @@
+import base64
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from ultimate_sol import metadata
+from ultimate_sol.cache import LRUCache
+from ultimate_sol.metadata import (
+    decode_metadata,
+    decode_metadata_many,
+    derive_metadata_accounts,
+    get_edition,
+    get_metadata_account,
+    unpack_metadata_account,
+)
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+from bench_metadata import check_accounts, legacy_unpack_metadata_account, load_fixtures, make_fixture  # noqa: E402
+
+
+@pytest.mark.parametrize('account', load_fixtures(), ids=lambda account: account['name'])
+def test_decoders_agree_on_recorded_accounts(account):
+    check_accounts([account])
+
+
+def test_decoders_agree_on_generated_accounts():
+    rnd = random.Random(0)
+    fixtures = [make_fixture(rnd) for _ in range(500)]
+    for data, decoded in zip(fixtures, decode_metadata_many(fixtures)):
+        legacy = legacy_unpack_metadata_account(data)
+        assert unpack_metadata_account(data) == decoded.to_dict() == legacy
+        assert decoded.mint == legacy['mint'].decode()
+        assert decoded.creators == [creator.decode() for creator in legacy['data']['creators']]
+
+
+def test_token_2022_fixtures_use_the_token_2022_program():
+    programs = {account['token_program'] for account in load_fixtures() if 'token_2022' in account['name']}
+    assert programs == {'TokenzQdBNbLqP5VEhdkAS6EPFLC1PHnBqCXEpPxuEb'}
+
+
+def test_decode_accepts_memoryview():
+    data = base64.b64decode(load_fixtures()[0]['data'])
+    assert decode_metadata(memoryview(data)).to_dict() == legacy_unpack_metadata_account(data)
+
+
+@pytest.fixture
+def pda_cache(monkeypatch):
+    cache = LRUCache(maxsize=100)
+    monkeypatch.setattr(metadata, 'pda_cache', cache)
+    return cache
+
+
+def test_pdas_are_derived_once(pda_cache, chain, monkeypatch):
+    mint = chain.address()
+    derived = []
+    find_pda = metadata._find_pda
+    monkeypatch.setattr(metadata, '_find_pda', lambda mint_key, kind: derived.append(kind) or find_pda(mint_key, kind))
+
+    account = get_metadata_account(mint)
+    assert get_metadata_account(mint) == account
+    assert get_edition(mint) == get_edition(mint) != account
+    assert derived == ['metadata', 'edition']
+    assert derive_metadata_accounts([mint]) == [account]
+    assert derived == ['metadata', 'edition']
+
+
+def test_derive_metadata_accounts_in_process_pool(pda_cache, chain, monkeypatch):
+    pools = []
+
+    class RecordingPool(ProcessPoolExecutor):
+        def __init__(self, max_workers=None):
+            pools.append(max_workers)
+            super().__init__(max_workers=max_workers)
+
+    monkeypatch.setattr(metadata, 'ProcessPoolExecutor', RecordingPool)
+    monkeypatch.setattr(metadata, 'PROCESS_POOL_THRESHOLD', 4)
+    cached = chain.address()
+    cached_account = get_metadata_account(cached)
+    mints = [chain.address() for _ in range(6)]
+    mints.insert(2, mints[0])
+    mints.append(cached)
+
+    accounts = derive_metadata_accounts(mints, processes=2)
+
+    assert pools == [2]
+    assert accounts == [metadata._find_pda(mint, 'metadata') for mint in mints]
+    assert accounts[-1] == cached_account
+    assert pda_cache.get((mints[1], 'metadata')) == accounts[1]
+    # Below the threshold, and with ``processes=0``, everything is derived in this process.
+    assert derive_metadata_accounts([chain.address() for _ in range(3)], processes=2)
+    assert derive_metadata_accounts([chain.address() for _ in range(5)], processes=0)
+    assert pools == [2]
@@ -0,0 +1,129 @@
+import asyncio
+
+import httpx
+import pytest
+
+from ultimate_sol import metrics
+from ultimate_sol.metrics import CallRecord, Histogram, HistogramSink, PrometheusSink
+from ultimate_sol.transport import AsyncInstrumentedTransport, InstrumentedTransport
+
+
+@pytest.fixture
+def records():
+    records = []
+    metrics.add_sink(records.append)
+    yield records
+    metrics.remove_sink(records.append)
+
+
+def _server(request: httpx.Request) -> httpx.Response:
+    if request.url.host == 'down.rpc':
+        raise httpx.ConnectError('refused', request=request)
+    if request.url.host == 'price.jup.ag':
+        return httpx.Response(429, content=b'slow down')
+    return httpx.Response(200, content=b'{"jsonrpc":"2.0","id":1,"result":1}')
+
+
+def test_instrumented_transport_reports_every_call(records):
+    client = httpx.Client(transport=InstrumentedTransport(httpx.MockTransport(_server)))
+
+    client.post('https://main.rpc/secret-key?api-key=1', json={"jsonrpc": "2.0", "id": 1, "method": 'getSlot'})
+    client.post('https://main.rpc/', json=[{"method": 'getSlot'}, {"method": 'getBalance'}, {"method": 'getSlot'}])
+    client.get('https://price.jup.ag/v6/price?ids=A')
+    with pytest.raises(httpx.ConnectError):
+        client.post('http://down.rpc:8899/', json={"method": 'getSlot'})
+    metrics.remove_sink(records.append)
+    client.post('https://main.rpc/', json={"method": 'getSlot'})
+
+    single, batch, price, down = records
+    assert (single.upstream, single.endpoint, single.method, single.status) == \
+        ('rpc', 'https://main.rpc', 'getSlot', 200)
+    assert single.bytes_received == 35 and single.bytes_sent > 0 and single.duration > 0
+    assert batch.method == 'batch:getBalance,getSlot'
+    assert (price.upstream, price.method, price.status, price.bytes_received) == \
+        ('jupiter', 'GET /v6/price', 429, 9)
+    assert (down.endpoint, down.status, down.error) == ('http://down.rpc:8899', None, 'ConnectError')
+
+
+def test_async_instrumented_transport_reports_retries(records):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return _server(request)
+
+    async def main():
+        async with httpx.AsyncClient(transport=AsyncInstrumentedTransport(httpx.MockTransport(handler))) as client:
+            token = metrics.set_retries(2)
+            try:
+                await client.post('https://main.rpc/', json={"method": 'getBalance'})
+            finally:
+                metrics.reset_retries(token)
+            await client.get('https://api.dexscreener.com/latest/dex/tokens/A')
+
+    asyncio.run(main())
+
+    rpc, dexscreener = records
+    assert (rpc.method, rpc.retries, rpc.bytes_received) == ('getBalance', 2, 35)
+    assert (dexscreener.upstream, dexscreener.method, dexscreener.retries) == \
+        ('dexscreener', 'GET /latest/dex/tokens/A', 0)
+
+
+def test_broken_sink_does_not_break_calls(records):
+    def broken(record):
+        raise RuntimeError('sink down')
+
+    metrics.add_sink(broken)
+    try:
+        metrics.record_cache_hit('decimals')
+    finally:
+        metrics.remove_sink(broken)
+    assert [(r.upstream, r.method, r.cache_hit) for r in records] == [('cache', 'decimals', True)]
+
+
+def test_histogram_percentiles_keep_relative_error():
+    histogram = Histogram(precision=7)
+    for micros in range(1, 100001):
+        histogram.record(micros / 1e6)
+
+    assert histogram.count == 100000 and histogram.min == 1e-6 and histogram.max == 0.1
+    for q in (0.5, 0.9, 0.99, 0.999):
+        assert histogram.percentile(q) == pytest.approx(q * 0.1, rel=2 ** -7)
+    assert Histogram().percentile(0.5) is None
+
+
+def test_histogram_sink_aggregates_per_method():
+    sink = HistogramSink()
+    sink(CallRecord('rpc', 'https://main.rpc', 'getSlot', 0.01, 50, 100, 200))
+    sink(CallRecord('rpc', 'https://main.rpc', 'getSlot', 0.03, 50, 0, 503, retries=1))
+    sink(CallRecord('rpc', 'https://main.rpc', 'getSlot', 0.02, error='ConnectError'))
+    sink(CallRecord('cache', None, 'decimals', cache_hit=True))
+
+    summary = sink.summary()
+
+    row = summary['rpc getSlot']
+    assert (row["count"], row["errors"], row["retries"], row["bytes_sent"], row["bytes_received"]) == \
+        (3, 2, 1, 100, 100)
+    assert row["min"] == 0.01 and row["max"] == 0.03 and row["mean"] == pytest.approx(0.02)
+    assert summary['cache decimals']["cache_hits"] == 1 and summary['cache decimals']["count"] == 0
+    assert sink.histogram('rpc', 'getSlot').count == 3
+    sink.reset()
+    assert sink.summary() == {}
+
+
+def test_prometheus_sink_exposition():
+    sink = PrometheusSink(prefix='sol', buckets=(0.1, 0.01))
+    sink(CallRecord('rpc', 'https://main.rpc', 'getSlot', 0.005, 10, 20, 200))
+    sink(CallRecord('rpc', 'https://main.rpc', 'getSlot', 0.05, 10, 0, status=None, error='ReadTimeout', retries=1))
+    sink(CallRecord('jupiter', 'https://price.jup.ag', 'GET /v6/"price"', 0.5, 0, 5, 429))
+    sink(CallRecord('cache', None, 'symbol', cache_hit=True))
+
+    lines = sink.exposition().splitlines()
+
+    assert 'sol_requests_total{upstream="rpc",method="getSlot",status="200"} 1' in lines
+    assert 'sol_requests_total{upstream="rpc",method="getSlot",status="ReadTimeout"} 1' in lines
+    assert 'sol_requests_total{upstream="jupiter",method="GET /v6/\\"price\\"",status="429"} 1' in lines
+    assert 'sol_request_duration_seconds_bucket{upstream="rpc",method="getSlot",le="0.01"} 1' in lines
+    assert 'sol_request_duration_seconds_bucket{upstream="rpc",method="getSlot",le="0.1"} 2' in lines
+    assert 'sol_request_duration_seconds_bucket{upstream="rpc",method="getSlot",le="+Inf"} 2' in lines
+    assert 'sol_request_duration_seconds_count{upstream="rpc",method="getSlot"} 2' in lines
+    assert 'sol_bytes_received_total{upstream="rpc",method="getSlot"} 20' in lines
+    assert 'sol_retries_total{upstream="rpc",method="getSlot"} 1' in lines
+    assert 'sol_cache_hits_total{kind="symbol"} 1' in lines
@@ -0,0 +1,93 @@
+import sqlite3
+
+import pytest
+from conftest import FakeChain, TOKEN_PROGRAM
+
+from ultimate_sol.cache import set_mint_store
+from ultimate_sol.mint_store import APPLICATION_ID, MintStore
+from ultimate_sol.sol import SolClient
+
+
+def test_decimals_are_stored_per_cluster(rpc_servers, chain, token_cache, tmp_path):
+    store = MintStore(str(tmp_path / 'mints.db'))
+    set_mint_store(store)
+    try:
+        mint = chain.add_mint(6)
+        token_account = chain.add(TOKEN_PROGRAM, bytes(165))
+        devnet = FakeChain()
+        devnet.add(TOKEN_PROGRAM, devnet.mint_data(9), mint)
+        main = SolClient(rpc_servers.add('main.rpc', chain.handle))
+        dev = SolClient(rpc_servers.add('dev.rpc', devnet.handle))
+
+        assert main.get_token_decimals_many([mint, token_account])[0] == 6
+        assert dev.get_token_decimals_many([mint]) == [9]
+        assert store.get_decimals_many([mint, token_account], main.cluster) == {mint: 6}
+        assert store.get_decimals(mint, dev.cluster) == 9
+
+        # A restarted worker reads every cluster's decimals from disk.
+        token_cache.clear()
+        assert store.preload([mint], client=dev)["decimals"] == 1
+        assert dev.get_token_decimals_many([mint]) == [9]
+        assert main.get_token_decimals_many([mint]) == [6]
+        assert rpc_servers.hosts() == ['main.rpc', 'dev.rpc']
+    finally:
+        set_mint_store(None)
+        store.close()
+
+
+def test_unscoped_store_is_dropped(tmp_path):
+    path = str(tmp_path / 'mints.db')
+    connection = sqlite3.connect(path)
+    connection.execute('CREATE TABLE decimals (mint TEXT PRIMARY KEY, decimals INTEGER NOT NULL) WITHOUT ROWID')
+    connection.execute("INSERT INTO decimals VALUES ('mint', 200)")
+    connection.commit()
+    connection.close()
+
+    store = MintStore(path)
+    assert store.stats() == {"decimals": 0, "metadata": 0}
+    store.put_decimals({'mint': 6}, 'main')
+    store.close()
+    assert MintStore(path).get_decimals('mint', 'main') == 6
+
+
+@pytest.mark.parametrize('tables', [
+    ['CREATE TABLE users (name TEXT)'],
+    ['CREATE TABLE decimals (mint TEXT PRIMARY KEY, decimals INTEGER NOT NULL) WITHOUT ROWID',
+     'CREATE TABLE users (name TEXT)'],
+    ['CREATE TABLE decimals (mint TEXT PRIMARY KEY, decimals INTEGER NOT NULL, note TEXT) WITHOUT ROWID'],
+    ['CREATE TABLE decimals (mint TEXT PRIMARY KEY, decimals INTEGER NOT NULL) WITHOUT ROWID',
+     'CREATE VIEW mints AS SELECT mint FROM decimals'],
+])
+def test_foreign_database_is_refused_and_left_alone(tmp_path, tables):
+    path = str(tmp_path / 'app.db')
+    connection = sqlite3.connect(path)
+    for table in tables:
+        connection.execute(table)
+    connection.commit()
+    schema = connection.execute('SELECT sql FROM sqlite_master').fetchall()
+    connection.close()
+
+    with pytest.raises(Exception, match='is not a mint store database'):
+        MintStore(path)
+
+    connection = sqlite3.connect(path)
+    assert connection.execute('SELECT sql FROM sqlite_master').fetchall() == schema
+    assert connection.execute('PRAGMA journal_mode').fetchone()[0] == 'delete'
+    assert connection.execute('PRAGMA application_id').fetchone()[0] == 0
+    connection.close()
+
+
+def test_store_marks_its_files(tmp_path):
+    path = str(tmp_path / 'mints.db')
+    MintStore(path).close()
+    connection = sqlite3.connect(path)
+    assert connection.execute('PRAGMA application_id').fetchone()[0] == APPLICATION_ID
+    # Marked files are migrated whatever their version.
+    connection.execute('PRAGMA user_version = 0')
+    connection.execute("INSERT INTO decimals VALUES ('main', 'mint', 6)")
+    connection.commit()
+    connection.close()
+
+    store = MintStore(path)
+    assert store.get_decimals('mint', 'main') is None
+    store.close()
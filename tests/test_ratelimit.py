@@ -0,0 +1,44 @@
+import httpx
+import pytest
+
+from ultimate_sol import ratelimit
+from ultimate_sol.transport import SchedulingTransport
+
+
+@pytest.fixture
+def limiters(monkeypatch):
+    monkeypatch.setattr(ratelimit, '_limiters', {})
+    monkeypatch.setattr(ratelimit, '_rates', dict(ratelimit.DEFAULT_RATE_LIMITS))
+    return ratelimit._limiters
+
+
+def _client(statuses: list[int]) -> httpx.Client:
+    def handler(request):
+        return httpx.Response(statuses.pop(0) if statuses else 200, headers={"Retry-After": "20"})
+
+    return httpx.Client(transport=SchedulingTransport(httpx.MockTransport(handler)))
+
+
+def test_rpc_hosts_are_left_to_the_endpoint_pool(limiters):
+    client = _client([429])
+    assert client.post('http://rpc.example/', json={"method": "sendTransaction"}).status_code == 429
+    # Not held: the next send to the host goes out right away.
+    assert client.post('http://rpc.example/', json={"method": "sendTransaction"}).status_code == 200
+    for i in range(100):
+        client.post(f'http://rpc{i}.example/', json={"method": "getSlot"})
+    assert ratelimit.host_limiter('rpc.example') is None
+    assert limiters == {}
+
+
+def test_api_hosts_are_held_after_429(limiters):
+    client = _client([429])
+    assert client.post('https://quote-api.jup.ag/v6/swap', json={}).status_code == 429
+    stats = ratelimit.stats()["jup.ag"]
+    assert stats["rate_limited"] == 1 and stats["held_for"] > 19
+
+
+def test_rpc_host_with_a_rate_limit_gets_a_limiter(limiters):
+    ratelimit.set_rate_limit('rpc.example', 10, burst=2)
+    limiter = ratelimit.host_limiter('rpc.example')
+    assert limiter is not None and limiter.rate == 10
+    assert list(limiters) == ['rpc.example']
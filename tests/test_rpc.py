@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from ultimate_sol import http_client
+from ultimate_sol.rpc import _parse_batch, rpc_batch, rpc_batch_async
+from ultimate_sol.sol import AsyncSolClient, SolClient
+
+
+def _echo(method, params):
+    return [method, params]
+
+
+def test_batch_answers_are_returned_in_call_order(rpc_servers):
+    endpoint = rpc_servers.add('a.rpc', _echo)
+
+    responses = rpc_batch(endpoint, [('getSlot', []), ('getBalance', ['x']), ('getHealth', None)])
+
+    assert [response['result'] for response in responses] == [['getSlot', []], ['getBalance', ['x']],
+                                                              ['getHealth', None]]
+    assert len({response['id'] for response in responses}) == 3
+    assert rpc_servers.calls == [('a.rpc', 'getHealth'), ('a.rpc', 'getBalance'), ('a.rpc', 'getSlot')]
+
+
+def test_batch_async(rpc_servers):
+    endpoint = rpc_servers.add('a.rpc', _echo)
+
+    async def main():
+        rpc_servers.install_async()
+        return await rpc_batch_async(endpoint, [('getSlot', []), ('getHealth', [])])
+
+    assert [response['result'][0] for response in asyncio.run(main())] == ['getSlot', 'getHealth']
+
+
+def test_batch_missing_answers_and_errors():
+    data = [{"id": 1, "method": "getSlot"}, {"id": 2, "method": "getHealth"}]
+    assert _parse_batch(data, [{"id": 2, "result": "ok"}]) == [{"error": "no response"}, {"id": 2, "result": "ok"}]
+    # A server without batch support answers with one error object.
+    with pytest.raises(Exception, match='rpc.rpc_batch error'):
+        _parse_batch(data, {"error": {"code": -32600, "message": "batch requests are disabled"}})
+
+
+def _wallet(chain, owner: str) -> dict:
+    # Five tokens with metadata, one without, all held by ``owner``.
+    balances = {}
+    for i in range(6):
+        mint = chain.add_mint(decimals=i, symbol=f'T{i}' if i < 5 else None)
+        chain.add_token_account(owner, mint, 10 ** i * (i + 1))
+        balances[mint] = i + 1
+    return balances
+
+
+def test_portfolio_is_fetched_in_chunks(rpc_servers, chain):
+    owner = chain.address()
+    balances = _wallet(chain, owner)
+    client = SolClient(rpc_servers.add('main.rpc', chain.handle))
+
+    rows = client.get_token_portfolio(owner, chunk_size=2)
+
+    assert sorted(rows) == sorted([mint, f'T{i}', balances[mint]] for i, mint in enumerate(list(balances)[:5]))
+    # Two token programs, one decimals batch and three metadata chunks of two accounts.
+    assert rpc_servers.calls.count(('main.rpc', 'getMultipleAccounts')) == 4
+    assert sorted(client.iter_token_portfolio(owner, chunk_size=2)) == sorted(rows)
+
+
+def test_portfolio_async(rpc_servers, chain):
+    owner = chain.address()
+    balances = _wallet(chain, owner)
+    endpoint = rpc_servers.add('main.rpc', chain.handle)
+
+    async def main():
+        rpc_servers.install_async()
+        client = AsyncSolClient(endpoint)
+        try:
+            return await client.get_token_portfolio(owner, chunk_size=2)
+        finally:
+            await http_client.aclose()
+
+    assert {row[0]: row[2] for row in asyncio.run(main())} == {mint: balances[mint] for mint in list(balances)[:5]}
+
+
+def test_token_without_readable_mint_is_skipped(rpc_servers, chain, caplog):
+    owner = chain.address()
+    balances = _wallet(chain, owner)
+    closed_mint = chain.address()
+    chain.add_token_account(owner, closed_mint, 500)
+    endpoint = rpc_servers.add('main.rpc', chain.handle)
+
+    rows = SolClient(endpoint).get_token_accounts(owner)
+    portfolio = SolClient(endpoint).get_token_portfolio(owner)
+
+    assert sorted(row[0] for row in rows) == sorted(balances)
+    assert {row[0]: row[1] for row in rows} == balances
+    assert len(portfolio) == 5
+    assert any(closed_mint in record.getMessage() for record in caplog.records)
+
+    async def main():
+        rpc_servers.install_async()
+        client = AsyncSolClient(endpoint)
+        try:
+            return await client.get_token_accounts(owner)
+        finally:
+            await http_client.aclose()
+
+    assert sorted(asyncio.run(main())) == sorted(rows)
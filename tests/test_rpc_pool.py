@@ -0,0 +1,126 @@
+import asyncio
+
+import httpx
+import pytest
+
+from ultimate_sol import http_client
+from ultimate_sol.rpc import rpc_request, rpc_request_async
+from ultimate_sol.rpc_pool import EndpointPool
+
+
+def _pool(endpoints: list[str], clock, **kwargs) -> EndpointPool:
+    return EndpointPool(endpoints, clock=clock, sleep=clock.sleep, async_sleep=clock.async_sleep,
+                        probe_interval=None, **kwargs)
+
+
+def _slot(pool: EndpointPool) -> int:
+    return pool.call(lambda endpoint: rpc_request(endpoint, 'getSlot'))['result']
+
+
+def test_routes_to_fastest_endpoint(rpc_servers, clock):
+    def server(latency: float, slot: int):
+        def handler(method, params):
+            clock.advance(latency)
+            return slot
+        return handler
+
+    slow = rpc_servers.add('slow.rpc', server(0.05, 1))
+    fast = rpc_servers.add('fast.rpc', server(0.01, 2))
+    pool = _pool([slow, fast], clock)
+
+    # Endpoints without measurements are tried first, then every call goes to the fastest one.
+    assert [_slot(pool) for _ in range(4)] == [1, 2, 2, 2]
+    assert rpc_servers.hosts() == ['slow.rpc', 'fast.rpc', 'fast.rpc', 'fast.rpc']
+    assert pool.pick() == fast
+    assert pool.stats()[slow]["latency"] == pytest.approx(0.05)
+
+
+def test_rate_limited_endpoint_fails_over_and_waits_retry_after(rpc_servers, clock):
+    limited = {"until": 2.0}
+
+    def handler(method, params):
+        if clock() < limited["until"]:
+            return httpx.Response(429, headers={"Retry-After": "2"})
+        return 7
+
+    first = rpc_servers.add('a.rpc', handler)
+    second = rpc_servers.add('b.rpc', handler)
+    pool = _pool([first, second], clock)
+
+    # Both endpoints answer 429, the second one is tried right away and the error of the last one is raised.
+    with pytest.raises(httpx.HTTPStatusError):
+        _slot(pool)
+    assert rpc_servers.hosts() == ['a.rpc', 'b.rpc']
+    assert pool.stats()[first]["rate_limited"] == 1
+    assert not pool.stats()[first]["down"]
+
+    # Nothing is ready, so the next call sleeps until ``Retry-After`` of the first endpoint ends.
+    assert _slot(pool) == 7
+    assert clock.sleeps == [2.0]
+    assert rpc_servers.hosts()[-1] == 'a.rpc'
+
+
+def test_failing_endpoint_is_taken_out_until_probe(rpc_servers, clock):
+    health = {"ok": False}
+
+    def broken(method, params):
+        if method == 'getHealth' and health["ok"]:
+            return 'ok'
+        return httpx.Response(503)
+
+    def healthy(method, params):
+        clock.advance(0.5)
+        return 3
+
+    bad = rpc_servers.add('bad.rpc', broken)
+    good = rpc_servers.add('good.rpc', healthy)
+    pool = _pool([bad, good], clock, max_failures=2)
+
+    assert [_slot(pool) for _ in range(2)] == [3, 3]
+    assert pool.stats()[bad]["down"]
+    # The fast but broken endpoint is not tried any more.
+    assert _slot(pool) == 3
+    assert rpc_servers.hosts() == ['bad.rpc', 'good.rpc', 'bad.rpc', 'good.rpc', 'good.rpc']
+
+    assert pool.probe() == []
+    health["ok"] = True
+    assert pool.probe() == [bad]
+    assert not pool.stats()[bad]["down"]
+    assert pool.pick() == bad
+
+
+def test_other_errors_are_not_retried(rpc_servers, clock):
+    first = rpc_servers.add('a.rpc', lambda method, params: 1)
+    second = rpc_servers.add('b.rpc', lambda method, params: 2)
+    pool = _pool([first, second], clock)
+    calls = []
+
+    def fn(endpoint):
+        calls.append(endpoint)
+        raise ValueError('bad params')
+
+    with pytest.raises(ValueError):
+        pool.call(fn)
+    assert calls == [first]
+
+
+def test_call_async_waits_with_async_sleep(rpc_servers, clock):
+    def handler(method, params):
+        if clock() < 1.5:
+            return httpx.Response(429, headers={"Retry-After": "1.5"})
+        return 9
+
+    endpoint = rpc_servers.add('a.rpc', handler)
+    pool = _pool([endpoint], clock)
+
+    async def main():
+        rpc_servers.install_async()
+        try:
+            with pytest.raises(httpx.HTTPStatusError):
+                await pool.call_async(lambda url: rpc_request_async(url, 'getSlot'))
+            return await pool.call_async(lambda url: rpc_request_async(url, 'getSlot'))
+        finally:
+            await http_client.aclose()
+
+    assert asyncio.run(main())['result'] == 9
+    assert clock.sleeps == [1.5]
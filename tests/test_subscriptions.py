@@ -0,0 +1,136 @@
+import asyncio
+import itertools
+import json
+
+import pytest
+
+from ultimate_sol import subscriptions
+from ultimate_sol.subscriptions import PubSubClient
+
+_DISCONNECT = object()
+
+
+class FakeSocket:
+    """
+    Server side of one connection: answers every request with a new subscription id and
+    sends what the test puts with ``notify``.
+    """
+
+    def __init__(self, server: 'FakeServer'):
+        self.server = server
+        self.sent = []
+        self._incoming = asyncio.Queue()
+
+    async def __aenter__(self) -> 'FakeSocket':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    async def send(self, text: str) -> None:
+        message = json.loads(text)
+        self.sent.append(message)
+        if message['method'].endswith('Subscribe'):
+            server_id = next(self.server.ids)
+            self.server.subscribed[server_id] = message['params']
+            self._incoming.put_nowait({"jsonrpc": "2.0", "id": message['id'], "result": server_id})
+
+    def notify(self, server_id: int, result) -> None:
+        self._incoming.put_nowait({"jsonrpc": "2.0", "method": "accountNotification",
+                                   "params": {"subscription": server_id, "result": result}})
+
+    def disconnect(self) -> None:
+        self._incoming.put_nowait(_DISCONNECT)
+
+    def __aiter__(self) -> 'FakeSocket':
+        return self
+
+    async def __anext__(self) -> str:
+        message = await self._incoming.get()
+        if message is _DISCONNECT:
+            raise StopAsyncIteration
+        return json.dumps(message)
+
+
+class FakeServer:
+    def __init__(self):
+        self.accepting = True
+        self.sockets = []
+        self.subscribed = {}
+        self.ids = itertools.count(1)
+
+    def connect(self, endpoint: str, **kwargs) -> FakeSocket:
+        if not self.accepting:
+            raise OSError(f'connection to {endpoint} refused')
+        socket = FakeSocket(self)
+        self.sockets.append(socket)
+        return socket
+
+
+@pytest.fixture
+def server(monkeypatch) -> FakeServer:
+    server = FakeServer()
+    monkeypatch.setattr(subscriptions.websockets, 'connect', server.connect)
+    return server
+
+
+async def _until(condition) -> None:
+    for _ in range(1000):
+        if condition():
+            return
+        await asyncio.sleep(0.001)
+    raise AssertionError('condition not reached')
+
+
+def test_notifications_are_dispatched_by_subscription(server):
+    async def main():
+        async with PubSubClient('wss://fake/') as client:
+            first = await client.account_subscribe('A')
+            second = await client.logs_subscribe('B')
+            socket = server.sockets[0]
+            socket.notify(second.server_id, {"logs": []})
+            socket.notify(first.server_id, {"lamports": 1})
+            socket.notify(99, {"lamports": 2})
+            return first, second, await anext(first), await anext(second)
+
+    first, second, account, logs = asyncio.run(main())
+
+    assert (first.server_id, second.server_id) == (1, 2)
+    assert server.subscribed[1][0] == 'A' and server.subscribed[2][0] == {"mentions": ['B']}
+    assert account == {"lamports": 1} and logs == {"logs": []}
+    assert first.closed and second.closed
+
+
+def test_subscriptions_are_resubscribed_after_reconnect(server):
+    async def main():
+        async with PubSubClient('wss://fake/', reconnect_delay=0.001) as client:
+            subscription = await client.account_subscribe('A')
+            server.sockets[0].disconnect()
+            await _until(lambda: subscription.server_id == 2)
+            socket = server.sockets[1]
+            socket.notify(1, {"lamports": 1})
+            socket.notify(2, {"lamports": 2})
+            received = await anext(subscription)
+            await subscription.close()
+            return client, received, socket.sent[-1]
+
+    client, received, unsubscribe = asyncio.run(main())
+
+    assert client.reconnects == 1 and len(server.sockets) == 2
+    assert server.subscribed[2] == server.subscribed[1]
+    assert received == {"lamports": 2}
+    assert unsubscribe['method'] == 'accountUnsubscribe' and unsubscribe['params'] == [2]
+
+
+def test_subscribe_times_out_without_connection(server):
+    server.accepting = False
+
+    async def main():
+        async with PubSubClient('wss://fake/', reconnect_delay=0.001, connect_timeout=0.05) as client:
+            with pytest.raises(TimeoutError, match='no connection to wss://fake/'):
+                await client.account_subscribe('A')
+            assert client._subscriptions == []
+            server.accepting = True
+            return await client.account_subscribe('A')
+
+    assert asyncio.run(main()).server_id == 1
@@ -0,0 +1,38 @@
+from conftest import TOKEN_2022_PROGRAM, TOKEN_PROGRAM
+
+from ultimate_sol.sol import SolClient
+
+
+def _token_account(account_type: int = None) -> bytes:
+    # mint, owner, amount and the rest of the 165-byte layout, Token-2022 extensions follow the account type.
+    data = bytes(32) + bytes([1] * 32) + (5).to_bytes(8, 'little') + bytes(range(1, 94))
+    return data if account_type is None else data + bytes([account_type]) + bytes(68)
+
+
+def _mint_2022(chain, decimals: int) -> bytes:
+    # Mint layout padded to the token account size, then the account type and a metadata pointer extension.
+    return chain.mint_data(decimals) + bytes(83) + bytes([1]) + bytes(68)
+
+
+def test_decimals_are_read_only_from_mint_layouts(rpc_servers, chain):
+    mints = [
+        chain.add(TOKEN_PROGRAM, chain.mint_data(6)),
+        chain.add(TOKEN_PROGRAM, _token_account()),
+        chain.add(TOKEN_2022_PROGRAM, _mint_2022(chain, 9)),
+        chain.add(TOKEN_2022_PROGRAM, chain.mint_data(2)),
+        chain.add(TOKEN_2022_PROGRAM, _token_account(account_type=2)),
+        chain.add(TOKEN_PROGRAM, chain.mint_data(8, initialized=False)),
+        chain.add('11111111111111111111111111111111', chain.mint_data(3)),
+    ]
+    client = SolClient(rpc_servers.add('mints.rpc', chain.handle))
+
+    results = client.get_token_decimals_many(mints)
+
+    assert results[0] == 6 and results[2] == 9 and results[3] == 2
+    for i in (1, 4, 5, 6):
+        assert isinstance(results[i], Exception), i
+    # Accounts which aren't mints are not cached, so they are requested again.
+    client.get_token_decimals_many(mints)
+    assert rpc_servers.calls == [('mints.rpc', 'getMultipleAccounts')] * 2
+    assert client.get_token_decimals_many(mints[:1]) == [6]
+    assert len(rpc_servers.calls) == 2
@@ -0,0 +1,54 @@
+import json
+
+import httpx
+import pytest
+
+from ultimate_sol import http_client
+from ultimate_sol.token_registry import TokenRegistry
+
+
+@pytest.fixture
+def token_list():
+    saved = http_client._client
+    body = {"content": b'[]'}
+    http_client.set_client(httpx.Client(transport=httpx.MockTransport(lambda request: httpx.Response(200, **body))))
+    yield body
+    http_client._client.close()
+    http_client._client = saved
+
+
+def _tokens(*tokens: tuple) -> bytes:
+    return json.dumps([{"address": address, "symbol": symbol, "decimals": 6} for address, symbol in tokens]).encode()
+
+
+def test_refresh_applies_the_difference_to_index_and_snapshot(token_list, tmp_path):
+    path = str(tmp_path / 'tokens.sqlite')
+    token_list["content"] = _tokens(('A', 'usdc'), ('B', 'bonk'), ('C', 'usdc'))
+    registry = TokenRegistry(path).load()
+    assert len(registry) == 3
+    assert {t['address'] for t in registry.find_by_symbol('USDC')} == {'A', 'C'}
+
+    token_list["content"] = _tokens(('A', 'usdc'), ('B', 'bonk2'), ('D', 'wif'))
+    assert registry.refresh() == 3
+    assert registry.find_by_symbol('bonk') == [] and registry.get('B')['symbol'] == 'bonk2'
+    assert 'C' not in registry and 'D' in registry
+
+    restored = TokenRegistry(path, max_age=float('inf')).load()
+    assert {mint: restored.get(mint) for mint in 'ABCD'} == {mint: registry.get(mint) for mint in 'ABCD'}
+    assert restored.updated_at == registry.updated_at
+
+
+def test_failed_download_keeps_the_snapshot(token_list, tmp_path):
+    path = str(tmp_path / 'tokens.sqlite')
+    token_list["content"] = _tokens(('A', 'usdc'), ('B', 'bonk'))
+    registry = TokenRegistry(path).load()
+    updated_at = registry.updated_at
+
+    # The list breaks off after a changed token.
+    token_list["content"] = _tokens(('A', 'usdc2'), ('E', 'jup'))[:-20]
+    with pytest.raises(Exception):
+        registry.refresh()
+    assert 'B' in registry and registry.updated_at == updated_at
+
+    restored = TokenRegistry(path, max_age=float('inf')).load()
+    assert restored.get('A')['symbol'] == 'usdc' and 'B' in restored